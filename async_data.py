@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+
+from config import REPORT_FETCH_CONCURRENCY
+import tracing
+
+logger = logging.getLogger(__name__)
+
+
+def _traced_call(method, *args, **kwargs):
+    # Opened on the worker thread, so concurrent sections do not overlap on the event loop's thread
+    with tracing.span(method.__name__):
+        return method(*args, **kwargs)
+
+
+class _AsyncFacade:
+    """Runs blocking handler calls in worker threads under a shared concurrency limit."""
+
+    def __init__(self, handler, limiter: asyncio.Semaphore):
+        self._handler = handler
+        self._limiter = limiter
+
+    async def _call(self, method_name, *args, **kwargs):
+        method = getattr(self._handler, method_name)
+        async with self._limiter:
+            return await asyncio.to_thread(_traced_call, method, *args, **kwargs)
+
+
+class AsyncJiraHandler(_AsyncFacade):
+    """Async equivalents of the JiraHandler query methods."""
+
+    async def get_all_tickets(self):
+        return await self._call('get_all_tickets')
+
+    async def get_p1_tickets(self):
+        return await self._call('get_p1_tickets')
+
+    async def get_unclassified_tickets(self):
+        return await self._call('get_unclassified_tickets')
+
+    async def get_priority_distribution(self):
+        return await self._call('get_priority_distribution')
+
+    async def get_cluster_distribution(self):
+        return await self._call('get_cluster_distribution')
+
+    async def get_namespace_distribution(self):
+        return await self._call('get_namespace_distribution')
+
+    async def get_initial_troubleshooting_metrics(self):
+        return await self._call('get_initial_troubleshooting_metrics')
+
+    async def get_cluster_alert_counts(self):
+        return await self._call('get_cluster_alert_counts')
+
+    async def get_namespace_alert_counts(self):
+        return await self._call('get_namespace_alert_counts')
+
+    async def get_source_alert_counts(self):
+        return await self._call('get_source_alert_counts')
+
+    async def get_alert_term_counts(self):
+        return await self._call('get_alert_term_counts')
+
+    async def get_weekly_trend(self, weeks=5):
+        return await self._call('get_weekly_trend', weeks)
+
+    async def get_weekly_cluster_matrices(self, weeks=5):
+        return await self._call('get_weekly_cluster_matrices', weeks)
+
+    async def get_weekly_valid_alerts_by_cluster(self, weeks=5):
+        return await self._call('get_weekly_valid_alerts_by_cluster', weeks)
+
+    async def get_weekly_canceled_alerts_by_cluster(self, weeks=5):
+        return await self._call('get_weekly_canceled_alerts_by_cluster', weeks)
+
+
+class AsyncConfluenceHandler(_AsyncFacade):
+    """Async equivalent of ConfluenceHandler."""
+
+    async def get_recent_postmortems(self):
+        return await self._call('get_recent_postmortems')
+
+
+async def _timed(name, coro):
+    started = time.monotonic()
+    result = await coro
+    logger.debug(f"Report section '{name}' fetched in {time.monotonic() - started:.2f}s")
+    return result
+
+
+async def gather_report_data(jira_handler, conf_handler, concurrency: int = REPORT_FETCH_CONCURRENCY) -> dict:
+    """
+    Fetch the independent report sections concurrently.
+    Returns a dict keyed by section name; wall time is bounded by the slowest section.
+    """
+    limiter = asyncio.Semaphore(concurrency)
+    jira = AsyncJiraHandler(jira_handler, limiter)
+    confluence = AsyncConfluenceHandler(conf_handler, limiter)
+
+    sections = {
+        'tickets': jira.get_all_tickets(),
+        'troubleshooting': jira.get_initial_troubleshooting_metrics(),
+        # One fetch of the triaged tickets answers the cluster, namespace and source counts
+        'alert_counts': jira.get_alert_term_counts(),
+        'postmortems': confluence.get_recent_postmortems(),
+    }
+    results = await asyncio.gather(*(_timed(name, coro) for name, coro in sections.items()))
+    data = dict(zip(sections, results))
+    data.update(data.pop('alert_counts'))
+    return data
+
+
+def fetch_report_data(jira_handler, conf_handler, concurrency: int = REPORT_FETCH_CONCURRENCY) -> dict:
+    """Blocking entry point for gather_report_data (for callers without an event loop)."""
+    return asyncio.run(gather_report_data(jira_handler, conf_handler, concurrency))
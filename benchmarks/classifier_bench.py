@@ -0,0 +1,97 @@
+"""
+Benchmark the compiled legacy alert classifier against the original rule loop.
+
+Generates synthetic summaries, classifies them with the per-row re.search loop
+that script_old/classification.py used before and with AlertClassifier, checks
+that both give the same label for every summary and prints the timings.
+
+    python benchmarks/classifier_bench.py [--rows 100000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script_old.classification import ALERT_PATTERNS, AlertClassifier
+
+FRAGMENTS = [
+    'mbt nightly job', 'Team Change Request for VPN', 'change request #42', 'Troubleshooting pods',
+    'Password reset request', 'User provisioning request', 'Terraform failed to generate plan',
+    'Snowflake public key rotation', 'CPU utilization above 90% on host-{n}', 'Outage reporting for svc-{n}',
+    'kube_cluster_name:apps-prod-01', 'kube_cluster_name:ecomm-prod-scus1', 'kube_cluster_name:wiz-finding',
+    'kube_cluster_name:custom-{n}', 'airflow2 cdp', 'staging cdp', 'de-airflow-staging', 'cdp-production',
+    'Automation API heartbeat', 'terraform drift detected', 'Wiz finding critical', 'wizard', 'AWS GuardDuty',
+    'Snyk issue', 'GHA runner', 'GitHub Actions', 'EBS volumes', 'cert-manager', 'airflow-dpi',
+    'simple-machine', 'pepdirect', 'disk full', 'latency', 'team change', 'outage reporting',
+    'CPU utilization above threshold', '[Datadog] Alert', 'submbtx', 'nothing to see',
+]
+
+
+def make_summaries(rows, seed):
+    rnd = random.Random(seed)
+    summaries = []
+    for _ in range(rows):
+        parts = rnd.sample(FRAGMENTS, rnd.randint(1, 3))
+        summaries.append(' '.join(p.format(n=rnd.randint(1, 500)) for p in parts))
+    return pd.Series(summaries)
+
+
+def reference_alert_type(summary):
+    """The original classify_alerts loop: every rule in order through re.search."""
+    summary_lower = str(summary).lower()
+    for pattern, category in ALERT_PATTERNS:
+        match = re.search(pattern, summary_lower)
+        if match:
+            if callable(category):
+                return category(match)
+            else:
+                return category
+    return 'Other'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    summaries = make_summaries(args.rows, args.seed)
+    print(f"{len(summaries)} summaries, {summaries.nunique()} distinct, {len(ALERT_PATTERNS)} rules")
+
+    start = time.perf_counter()
+    expected = summaries.apply(reference_alert_type)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classifier = AlertClassifier(ALERT_PATTERNS)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = classifier.classify_series(summaries)
+    compiled_time = time.perf_counter() - start
+
+    # Same engine without the memo, to show the prefilter on its own
+    start = time.perf_counter()
+    uncached = summaries.map(lambda s: classifier._resolve(str(s).lower()))
+    prefilter_time = time.perf_counter() - start
+
+    mismatches = summaries[(expected != actual) | (expected != uncached)]
+    print(f"reference loop:        {reference_time:8.3f}s")
+    print(f"compiled (prefilter):  {prefilter_time:8.3f}s  x{reference_time / prefilter_time:.1f}")
+    print(f"compiled (+memo):      {compiled_time:8.3f}s  x{reference_time / compiled_time:.1f}"
+          f"  (compile {compile_time * 1000:.1f}ms)")
+    if not mismatches.empty:
+        print(f"PARITY FAILED for {len(mismatches)} summaries, e.g.:")
+        for summary in mismatches.head(10):
+            print(f"  {summary!r}: {reference_alert_type(summary)!r} != {classifier.classify(summary)!r}")
+        sys.exit(1)
+    print("parity OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""
+Local stand-in for the Jira and Confluence REST endpoints the bot uses.
+
+Serves synthetic ISD tickets so report performance can be measured without
+the production tenant:
+
+- GET/POST /rest/api/{2,3}/search   JQL search with startAt/maxResults paging,
+                                    field projection and expand=changelog
+- GET /rest/api/{2,3}/issue/{key}   one issue (with its changelog)
+- GET /rest/api/{2,3}/field         field list (NOC Representative custom field)
+- GET /rest/api/{2,3}/serverInfo    what the jira client asks on connect
+- GET /wiki/rest/api/content/search post-mortem pages for the Confluence section
+
+Every request costs --latency seconds, pages are capped at --max-page issues
+(like Jira Cloud's 100), and changelogs can be left out of search pages to
+force the per-issue fallback. --rate-limit throttles like Jira Cloud: past that
+many requests per second the server answers 429 with Retry-After and
+X-RateLimit-* headers. Run it standalone to point a bot at it:
+
+    python benchmarks/fake_atlassian.py --tickets 10000 --port 8080
+    JIRA_URL=http://127.0.0.1:8080 JIRA_EMAIL=x JIRA_API_TOKEN=x python main.py
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ALERT_SOURCES, CLUSTERS, JIRA_PROJECT, NAMESPACES, NOC_FIELD_NAME
+from jql import JqlQuery
+
+NOC_FIELD_ID = 'customfield_10050'
+JIRA_TIME = '%Y-%m-%dT%H:%M:%S.000+0000'
+
+STATUSES = ['Open', 'In Progress', 'Waiting for support', 'Done', 'Resolved', 'Cancelled', 'Canceled']
+# Priority mix of the ISD board: P1 (Highest) tickets are rare
+PRIORITIES = ['Highest', 'High', 'Medium', 'Low', None]
+PRIORITY_WEIGHTS = [1, 9, 40, 30, 20]
+ISSUE_TYPES = ['Incident', 'Service Request', 'Service Request with Approvals', 'Task']
+ASSIGNEES = [f'engineer.{n}' for n in range(40)] + [None, 'oleg.kolomiets.contractor']
+BOT_AUTHOR = {'accountId': 'automation-for-jira', 'displayName': 'Automation for Jira'}
+# Share of changelog entries that change the priority (the rest are status/assignee edits)
+PRIORITY_CHANGE_RATE = 0.005
+
+
+def _summary(rnd, number):
+    cluster = rnd.choice(CLUSTERS + ['unknown-cluster'])
+    namespace = rnd.choice(NAMESPACES + ['default'])
+    return rnd.choice([
+        f'[Datadog] Triggered on kube_cluster_name:{cluster} kube_namespace:{namespace} pod crashloop',
+        f'[Datadog] High CPU on cluster {cluster} namespace {namespace} host-{number % 900}',
+        f'Troubleshooting request for {cluster}',
+        f'{rnd.choice(ALERT_SOURCES)} alert: {rnd.choice(["high severity finding", "suspicious login", "new vulnerability"])}',
+        'Wiz finding: public bucket',
+        'Password reset request',
+        f'Team Change for engineer.{number % 40}',
+        f'Outage reporting: {rnd.choice(["checkout", "search", "login"])} degraded',
+        f'Disk usage above 90% on host-{number % 900}',
+    ])
+
+
+def _changelog(rnd, created, depth):
+    histories = []
+    priority = rnd.choice(['High', 'Medium', 'Low'])
+    for number in range(rnd.randint(0, 2 * depth)):
+        if rnd.random() < PRIORITY_CHANGE_RATE:
+            new_priority = rnd.choice(['Highest', 'High', 'Medium', 'Low'])
+            item = {'field': 'priority', 'fromString': priority, 'toString': new_priority}
+            priority = new_priority
+        else:
+            item = {'field': rnd.choice(['status', 'assignee']), 'fromString': 'x', 'toString': 'y'}
+        histories.append({
+            'id': str(number),
+            'author': BOT_AUTHOR if rnd.random() < 0.3 else {'accountId': f'acc-{rnd.randint(1, 40)}',
+                                                            'displayName': f'engineer.{rnd.randint(1, 40)}'},
+            'created': (created + timedelta(minutes=5 * (number + 1))).strftime(JIRA_TIME),
+            'items': [item],
+        })
+    return {'startAt': 0, 'maxResults': len(histories), 'total': len(histories), 'histories': histories}
+
+
+def make_issues(count: int, days: int = 7, changelog_depth: int = 3, seed: int = 1, project: str = JIRA_PROJECT):
+    """`count` raw Jira issues created over the last `days` days, newest first."""
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    issues = []
+    for number in range(1, count + 1):
+        created = now - timedelta(seconds=rnd.randint(60, days * 86400))
+        updated = min(now, created + timedelta(minutes=rnd.randint(0, 3000)))
+        status = rnd.choice(STATUSES)
+        priority = rnd.choices(PRIORITIES, PRIORITY_WEIGHTS)[0]
+        assignee = rnd.choice(ASSIGNEES)
+        issues.append({
+            'id': str(100000 + number),
+            'key': f'{project}-{number}',
+            'self': f'/rest/api/2/issue/{100000 + number}',
+            'fields': {
+                'summary': _summary(rnd, number),
+                'description': f'Details: {rnd.choice(CLUSTERS)} {rnd.choice(NAMESPACES)}' if rnd.random() < 0.5 else None,
+                'priority': {'name': priority} if priority else None,
+                'status': {'name': status},
+                'issuetype': {'name': rnd.choice(ISSUE_TYPES)},
+                'created': created.strftime(JIRA_TIME),
+                'updated': updated.strftime(JIRA_TIME),
+                'assignee': {'displayName': assignee} if assignee else None,
+                'resolution': {'name': rnd.choice(["Won't Do", 'Duplicate', 'Cancelled'])}
+                if status in ('Cancelled', 'Canceled') else ({'name': 'Done'} if status in ('Done', 'Resolved') else None),
+                NOC_FIELD_ID: {'displayName': f'noc.{rnd.randint(1, 8)}'} if rnd.random() < 0.7 else None,
+            },
+            'changelog': _changelog(rnd, created, changelog_depth),
+        })
+    issues.sort(key=lambda issue: issue['fields']['created'], reverse=True)
+    return issues
+
+
+# --- Server --------------------------------------------------------------------- #
+
+class FakeAtlassian:
+    """
+    Threaded fake Jira/Confluence server on 127.0.0.1.
+    `requests` counts calls per endpoint ('search', 'issue', 'field', ...).
+    """
+
+    def __init__(self, tickets: int = 1000, days: int = 7, changelog_depth: int = 3, latency: float = 0.0,
+                 max_page: int = 100, inline_changelog: bool = True, postmortems: int = 5, seed: int = 1,
+                 port: int = 0, rate_limit: int = 0):
+        self.issues = make_issues(tickets, days, changelog_depth, seed)
+        self.by_key = {issue['key']: issue for issue in self.issues}
+        self.latency = latency
+        self.max_page = max_page
+        self.inline_changelog = inline_changelog
+        self.postmortems = postmortems
+        self.rate_limit = rate_limit
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.throttled = 0
+        self._window = (0, 0)  # (second, requests admitted in it)
+        self._matches = {}  # JQL -> matching issues in result order
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def start(self) -> 'FakeAtlassian':
+        threading.Thread(target=self._server.serve_forever, name='fake-atlassian', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+            self.bytes_sent = 0
+            self.throttled = 0
+
+    def _count(self, endpoint, size):
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.bytes_sent += size
+
+    def admit(self):
+        """
+        Fixed one-second window rate limit. Returns the X-RateLimit-* headers
+        and whether the request is admitted.
+        """
+        if not self.rate_limit:
+            return {}, True
+        now = time.time()
+        second = int(now)
+        with self._lock:
+            window, used = self._window
+            if window != second:
+                used = 0
+            admitted = used < self.rate_limit
+            if admitted:
+                used += 1
+            else:
+                self.throttled += 1
+            self._window = (second, used)
+        reset = datetime.fromtimestamp(second + 1, timezone.utc).isoformat()
+        headers = {'X-RateLimit-Limit': str(self.rate_limit), 'X-RateLimit-Remaining': str(self.rate_limit - used),
+                   'X-RateLimit-Reset': reset}
+        if used >= self.rate_limit * 0.8:
+            headers['X-RateLimit-NearLimit'] = 'true'
+        if not admitted:
+            headers['Retry-After'] = '1'
+        return headers, admitted
+
+    def search(self, jql):
+        with self._lock:
+            hits = self._matches.get(jql)
+        if hits is None:
+            hits = JqlQuery(jql, {NOC_FIELD_NAME: NOC_FIELD_ID}).select(self.issues)
+            with self._lock:
+                self._matches[jql] = hits
+        return hits
+
+    def search_page(self, jql, start_at, max_results, fields, expand):
+        hits = self.search(jql)
+        max_results = min(max_results, self.max_page)
+        wanted = None if not fields or '*all' in fields or '*navigable' in fields else set(fields)
+        page = []
+        for issue in hits[start_at:start_at + max_results]:
+            raw = {'id': issue['id'], 'key': issue['key'], 'self': issue['self']}
+            raw['fields'] = dict(issue['fields']) if wanted is None else {
+                name: value for name, value in issue['fields'].items() if name in wanted
+            }
+            if 'changelog' in expand and self.inline_changelog:
+                raw['changelog'] = issue['changelog']
+            page.append(raw)
+        return {'startAt': start_at, 'maxResults': max_results, 'total': len(hits), 'issues': page}
+
+    def postmortem_pages(self):
+        now = datetime.now(timezone.utc)
+        return {'results': [
+            {
+                'id': str(9000 + number),
+                'title': f'Post mortem: incident {number}',
+                'history': {'createdDate': (now - timedelta(days=number)).strftime('%Y-%m-%dT%H:%M:%S.000Z')},
+                '_links': {'webui': f'/spaces/ECOMM/pages/{9000 + number}'},
+            }
+            for number in range(self.postmortems)
+        ]}
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, endpoint, payload, status=200):
+                body = json.dumps(payload).encode('utf-8')
+                fake._count(endpoint, len(body))
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in self.rate_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                # Repeated parameters (fields=a&fields=b) are joined like a comma-separated list
+                self._route(url.path, {name: ','.join(values) for name, values in parse_qs(url.query).items()})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                params = {name: ','.join(map(str, value)) if isinstance(value, list) else value
+                          for name, value in body.items()}
+                self._route(urlsplit(self.path).path, params)
+
+            def _route(self, path, params):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                self.rate_headers, admitted = fake.admit()
+                if not admitted:
+                    return self._send('throttled', {'errorMessages': ['Rate limit exceeded']}, 429)
+                path = path.rstrip('/')
+                if path.startswith('/wiki/rest/api/content/search'):
+                    return self._send('content/search', fake.postmortem_pages())
+                if not re.match(r'^/rest/api/[23]/', path):
+                    return self._send('unknown', {'errorMessages': [f'No route {path}']}, 404)
+                resource = path.split('/', 4)[4]
+                if resource == 'serverInfo':
+                    return self._send('serverInfo', {'baseUrl': fake.url, 'version': '1001.0.0',
+                                                     'versionNumbers': [1001, 0, 0], 'deploymentType': 'Cloud'})
+                if resource == 'field':
+                    return self._send('field', [
+                        {'id': NOC_FIELD_ID, 'name': NOC_FIELD_NAME, 'custom': True,
+                         'clauseNames': ['cf[10050]', NOC_FIELD_NAME]},
+                        {'id': 'summary', 'name': 'Summary', 'custom': False, 'clauseNames': ['summary']},
+                    ])
+                if resource == 'search':
+                    try:
+                        payload = fake.search_page(
+                            params.get('jql', ''), int(params.get('startAt', 0)), int(params.get('maxResults', 50)),
+                            [name for name in str(params.get('fields', '')).split(',') if name],
+                            str(params.get('expand', '')),
+                        )
+                    except ValueError as e:
+                        return self._send('search', {'errorMessages': [str(e)]}, 400)
+                    return self._send('search', payload)
+                if resource.startswith('issue/'):
+                    issue = fake.by_key.get(resource.split('/')[1])
+                    if issue is None:
+                        return self._send('issue', {'errorMessages': ['Issue does not exist']}, 404)
+                    return self._send('issue', issue)
+                return self._send('unknown', {'errorMessages': [f'No route {path}']}, 404)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local fake Jira/Confluence server')
+    parser.add_argument('--tickets', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=7, help='tickets are created over this many days')
+    parser.add_argument('--changelog-depth', type=int, default=3, help='average changelog entries per ticket')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every request')
+    parser.add_argument('--max-page', type=int, default=100, help='most issues returned per search page')
+    parser.add_argument('--no-inline-changelog', action='store_true',
+                        help='ignore expand=changelog on searches (forces one issue call per ticket)')
+    parser.add_argument('--rate-limit', type=int, default=0, help='requests per second before 429s (0: unlimited)')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    fake = FakeAtlassian(args.tickets, args.days, args.changelog_depth, args.latency, args.max_page,
+                         not args.no_inline_changelog, port=args.port, rate_limit=args.rate_limit)
+    print(f"Serving {args.tickets} tickets on {fake.url} (Ctrl-C to stop)")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Requests: {dict(fake.requests)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+End-to-end report benchmark against the local fake Jira/Confluence server.
+
+For every size in --sizes this starts benchmarks/fake_atlassian.py with that
+many synthetic tickets and runs one full /jira-report build in a fresh bot
+process (fetch, legacy charts, generate_report), with the persistent caches
+(disk cache, chart cache, PDF reuse) off so nothing carries over between runs.
+It records wall time per stage, the requests the fake server answered and the
+peak RSS of the bot and its render workers.
+
+Results are compared with the baseline file (when there is one) and the script
+exits 1 if a size got slower or bigger by more than --tolerance, or makes
+noticeably more requests. --save writes the results as the new baseline; commit it with the
+change that moved the numbers.
+
+    python benchmarks/report_bench.py [--sizes 1000,10000,50000] [--latency 0.05] [--save]
+
+With --fixture the build replays a recorded Jira fixture instead (JIRA_BACKEND
+'record' writes one from production), so the pipeline can be profiled on real
+data shapes without network access.
+
+    python benchmarks/report_bench.py --fixture data/jira_fixture.jsonl.gz
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'report_baseline.json')
+
+# Bot settings of a benchmark run: nothing persists between runs, no exporters
+RUN_ENV = {
+    'JIRA_EMAIL': 'bench@example.invalid',
+    'JIRA_API_TOKEN': 'bench',
+    'ENABLE_DISK_CACHE': 'false',
+    'ENABLE_CHART_CACHE': 'false',
+    'ENABLE_REPORT_REUSE': 'false',
+    'ENABLE_ISSUE_STORE': 'false',
+    'ENABLE_TRACING': 'false',
+}
+# Where a benchmark run writes (under a temporary directory removed afterwards)
+RUN_DIRS = {
+    'REPORT_DIR': 'reports',
+    'LEGACY_DIR': 'legacy_output',
+    'CHART_DIR': 'charts',
+    'JOB_DIR': 'jobs',
+    'DATA_DIR': 'data',
+    'DISK_CACHE_DIR': os.path.join('cache', 'http'),
+}
+
+
+def _rss_mb(pid='self') -> float:
+    try:
+        with open(f'/proc/{pid}/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return 0.0
+
+
+class PeakSampler:
+    """Samples RSS of this process plus its render workers; `peak` is the largest total seen."""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            total = _rss_mb() + sum(_rss_mb(child.pid) for child in multiprocessing.active_children())
+            self.peak = max(self.peak, total)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_report(out_path: str):
+    """Child process: build one report against JIRA_URL and write the measurements as JSON."""
+    sys.path.insert(0, REPO_DIR)
+    import metrics
+    from jira_handler import JiraHandler
+    from legacy_runner import run_legacy
+    from report_generator import ReportGenerator
+    from report_snapshot import ReportSnapshot
+
+    jira_handler = JiraHandler()
+    report_generator = ReportGenerator()
+    with tempfile.TemporaryDirectory(prefix='report-bench-') as workdir, PeakSampler() as sampler:
+        run = metrics.RunSummary.begin('bench')
+        started = time.perf_counter()
+        jira_handler.begin_report()
+        with metrics.timed_stage('fetch'):
+            snapshot = ReportSnapshot.capture(jira_handler, report_generator.conf_handler)
+        with metrics.timed_stage('legacy'):
+            legacy_art_dir = run_legacy(snapshot.tickets, os.path.join(workdir, 'legacy_output'))
+        with metrics.timed_stage('report'):
+            report_generator.generate_report(jira_handler, os.path.dirname(legacy_art_dir), snapshot=snapshot,
+                                             chart_dir=os.path.join(workdir, 'charts'), build_dir=workdir)
+        seconds = time.perf_counter() - started
+        record = run.finish()
+    report_generator.chart_service.shutdown()
+
+    prefix = 'report_stage_seconds_sum{stage="'
+    stages = {
+        series[len(prefix):-2]: round(value, 3)
+        for series, value in record['counters'].items()
+        if series.startswith(prefix)
+    }
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    with open(out_path, 'w') as handle:
+        json.dump({
+            'seconds': round(seconds, 3),
+            'tickets_in_report': len(snapshot.tickets),
+            'stages': stages,
+            'peak_rss_mb': round(peak_rss, 1),
+            # Sampled, so it can miss a short spike of the bot alone
+            'peak_total_rss_mb': round(max(sampler.peak, peak_rss), 1),
+        }, handle)
+
+
+def _run_dirs(root: str) -> dict:
+    return {name: os.path.join(root, path) for name, path in RUN_DIRS.items()}
+
+
+def _run_child(env: dict) -> dict:
+    with tempfile.TemporaryDirectory(prefix='report-bench-') as root, \
+            tempfile.NamedTemporaryFile(suffix='.json') as out:
+        env = dict(env, **_run_dirs(root))
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', out.name],
+                       env=env, check=True, cwd=REPO_DIR)
+        with open(out.name) as handle:
+            return json.load(handle)
+
+
+def bench_size(tickets: int, args) -> dict:
+    """Serve `tickets` fake tickets and time one report build in a fresh bot process."""
+    from fake_atlassian import FakeAtlassian
+
+    fake = FakeAtlassian(tickets, args.days, args.changelog_depth, args.latency, args.max_page,
+                         not args.no_inline_changelog, rate_limit=args.rate_limit).start()
+    env = dict(os.environ, **RUN_ENV, JIRA_URL=fake.url,
+               LEGACY_IN_PROCESS='false' if args.legacy_subprocess else 'true')
+    try:
+        result = _run_child(env)
+    finally:
+        fake.stop()
+    result['requests'] = sum(fake.requests.values())
+    result['requests_by_endpoint'] = dict(sorted(fake.requests.items()))
+    result['response_mb'] = round(fake.bytes_sent / 2 ** 20, 2)
+    result['throttled'] = fake.throttled
+    return result
+
+
+def bench_fixture(path: str, args) -> dict:
+    """Time one report build replaying a recorded Jira fixture (no server, no network)."""
+    env = dict(os.environ, **RUN_ENV, JIRA_BACKEND='replay', JIRA_FIXTURE_PATH=os.path.abspath(path),
+               LEGACY_IN_PROCESS='false' if args.legacy_subprocess else 'true')
+    env.pop('JIRA_URL', None)
+    return dict(_run_child(env), requests=0, requests_by_endpoint={}, response_mb=0.0)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """Print current vs baseline per size; returns the regressions found."""
+    if baseline['settings'] != current['settings']:
+        print(f"note: baseline settings differ ({baseline['settings']}); deltas are not like for like")
+    regressions = []
+    print(f"\n{'tickets':>8} {'metric':<18} {'baseline':>10} {'current':>10} {'delta':>8}")
+    for size, result in current['results'].items():
+        before = baseline['results'].get(size)
+        if before is None:
+            continue
+        # The adaptive page size makes the request count drift by a page or two
+        for metric, limit in (('seconds', tolerance), ('peak_total_rss_mb', tolerance), ('requests', 0.05)):
+            old, new = before[metric], result[metric]
+            delta = (new - old) / old if old else 0.0
+            flag = ''
+            if delta > limit:
+                flag = '  REGRESSION'
+                regressions.append(f"{size} tickets: {metric} {old} -> {new}")
+            print(f"{size:>8} {metric:<18} {old:>10} {new:>10} {delta:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,50000', help='comma-separated ticket counts')
+    parser.add_argument('--days', type=int, default=7, help='tickets are created over this many days')
+    parser.add_argument('--changelog-depth', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per fake request')
+    parser.add_argument('--max-page', type=int, default=100)
+    parser.add_argument('--no-inline-changelog', action='store_true')
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help='fake server answers 429 past this many requests per second (0: unlimited)')
+    parser.add_argument('--legacy-subprocess', action='store_true',
+                        help='run the legacy charts through the data_loader/main.py subprocesses')
+    parser.add_argument('--fixture', help='replay this recorded Jira fixture instead of the fake server')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown / RSS growth (fraction)')
+    parser.add_argument('--child', metavar='OUT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_report(args.child)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    settings = {
+        'days': args.days, 'changelog_depth': args.changelog_depth, 'latency': args.latency,
+        'max_page': args.max_page, 'inline_changelog': not args.no_inline_changelog,
+        'legacy_subprocess': args.legacy_subprocess, 'rate_limit': args.rate_limit,
+    }
+    if args.fixture:
+        settings = {'fixture': os.path.basename(args.fixture), 'legacy_subprocess': args.legacy_subprocess}
+    current = {
+        'commit': _git_commit(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'settings': settings,
+        'results': {},
+    }
+    runs = [args.fixture] if args.fixture else [int(size) for size in args.sizes.split(',')]
+    # The fake server imports config as well, which creates the report and chart directories
+    with tempfile.TemporaryDirectory(prefix='report-bench-') as root:
+        os.environ.update(_run_dirs(root))
+        for run in runs:
+            label = os.path.basename(run) if args.fixture else f'{run} tickets'
+            print(f"--- {label}")
+            result = bench_fixture(run, args) if args.fixture else bench_size(run, args)
+            current['results'][os.path.basename(run) if args.fixture else str(run)] = result
+            print(f"{label}: {result['seconds']:.1f}s, {result['requests']} requests "
+                  f"({result['response_mb']} MB, {result.get('throttled', 0)} throttled), "
+                  f"peak RSS {result['peak_rss_mb']} MB bot / {result['peak_total_rss_mb']} MB with workers")
+            print('  stages: ' + ', '.join(f"{stage} {seconds:.1f}s" for stage, seconds in sorted(
+                result['stages'].items(), key=lambda item: -item[1]) if seconds >= 0.05))
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        print(f"\nBaseline: {baseline.get('commit') or '?'} recorded {baseline.get('recorded_at')}")
+        regressions = compare(baseline, current, args.tolerance)
+    if args.save:
+        with open(args.baseline, 'w') as handle:
+            json.dump(current, handle, indent=2)
+            handle.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+    if regressions and not args.save:
+        print('\nFAIL: ' + '; '.join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Soak check: build many reports in a row and verify memory stays flat.
+
+The bot lives for weeks and renders every report in the same process (plus
+its chart workers), so any figure, image or DataFrame that survives a report
+shows up as steady memory growth. This builds --reports full reports (legacy
+charts, report charts, PDF) from synthetic snapshots that differ every time,
+with the chart cache and PDF reuse off so each one is really rendered. RSS of
+the bot process and of its render workers is sampled after every report; the
+script exits 1 if either keeps growing by more than --max-growth-mb after the
+warm-up.
+
+    python benchmarks/soak_reports.py [--reports 200] [--tickets 200] [--max-growth-mb 25]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import MappingProxyType
+
+# Render everything, every time; no Jira/Confluence call is made
+os.environ.setdefault('ENABLE_CHART_CACHE', 'false')
+os.environ.setdefault('ENABLE_REPORT_REUSE', 'false')
+os.environ.setdefault('JIRA_URL', 'http://jira.invalid')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_bench import RUN_DIRS
+
+# Reports, legacy charts and caches go to a temporary directory removed afterwards
+RUN_ROOT = tempfile.mkdtemp(prefix='soak-reports-')
+os.environ.update({name: os.path.join(RUN_ROOT, path) for name, path in RUN_DIRS.items()})
+
+import pandas as pd
+
+from config import CLUSTERS, NAMESPACES, ALERT_SOURCES, LEGACY_DIR
+from data_cleaning import apply_ticket_schema
+from legacy_runner import run_legacy
+from report_generator import ReportGenerator
+from report_snapshot import ReportSnapshot
+from ticket_schema_bench import make_records
+
+
+def rss_mb(pid='self') -> float:
+    try:
+        with open(f'/proc/{pid}/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return 0.0
+
+
+def sample() -> tuple:
+    """(RSS of the bot process, RSS of its largest render worker) in MB."""
+    workers = [rss_mb(child.pid) for child in multiprocessing.active_children()]
+    return rss_mb(), max(workers, default=0.0)
+
+
+def make_snapshot(n: int, tickets: int) -> ReportSnapshot:
+    rnd = random.Random(n)
+    frame = apply_ticket_schema(pd.DataFrame(make_records(2, tickets // 2, seed=n)))
+    now = datetime.now()
+    history = {
+        f'ISD-{rnd.randint(1, tickets)}': tuple(
+            {'priority': rnd.choice(['P1', 'P2', 'P3']), 'timestamp': now - timedelta(hours=h)}
+            for h in sorted(rnd.sample(range(1, 160), 3), reverse=True)
+        )
+        for _ in range(rnd.randint(0, 12))
+    }
+    total = rnd.randint(50, 200)
+    untriaged = rnd.randint(0, total)
+    return ReportSnapshot(
+        captured_at=now,
+        tickets=frame,
+        priority_history=MappingProxyType(history),
+        troubleshooting=(total, untriaged, round(untriaged / total * 100, 1)),
+        cluster_counts=MappingProxyType({name: rnd.randint(0, 40) for name in CLUSTERS}),
+        namespace_counts=MappingProxyType({name: rnd.randint(0, 40) for name in NAMESPACES}),
+        source_counts=MappingProxyType({name: rnd.randint(0, 40) for name in ALERT_SOURCES}),
+        postmortems=tuple(
+            {'title': f'Post mortem {n}.{i}', 'link': f'https://example.invalid/pm/{n}/{i}',
+             'created': now.isoformat()}
+            for i in range(rnd.randint(0, 3))
+        ),
+    )
+
+
+def trend_mb(samples) -> float:
+    """Growth over the samples along their least-squares line (robust to per-report noise)."""
+    n = len(samples)
+    if n < 2:
+        return 0.0
+    x_mean = (n - 1) / 2
+    y_mean = sum(samples) / n
+    slope = (sum((x - x_mean) * (y - y_mean) for x, y in enumerate(samples))
+             / sum((x - x_mean) ** 2 for x in range(n)))
+    return slope * (n - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reports', type=int, default=200)
+    parser.add_argument('--tickets', type=int, default=200, help='tickets per report')
+    parser.add_argument('--warmup', type=int, default=20, help='reports before the baseline is taken')
+    parser.add_argument('--max-growth-mb', type=float, default=25.0)
+    args = parser.parse_args()
+    try:
+        soak(args)
+    finally:
+        shutil.rmtree(RUN_ROOT, ignore_errors=True)
+
+
+def soak(args):
+    generator = ReportGenerator()
+    bot_samples, worker_samples = [], []
+    start = time.perf_counter()
+    for n in range(args.reports):
+        snapshot = make_snapshot(n, args.tickets)
+        run_legacy(snapshot.tickets)
+        generator.generate_report(None, LEGACY_DIR, snapshot=snapshot)
+        bot, worker = sample()
+        bot_samples.append(bot)
+        worker_samples.append(worker)
+        if (n + 1) % 10 == 0:
+            print(f"{n + 1:4d} reports  {time.perf_counter() - start:7.1f}s  "
+                  f"bot {bot:7.1f} MB  largest worker {worker:7.1f} MB  "
+                  f"(worker purges: {generator.chart_service.purges})")
+    generator.chart_service.shutdown()
+
+    # The bot process must not grow; workers may (malloc high-water marks) but are
+    # trimmed and purged, so their peak must not keep climbing from one half of the run to the next
+    bot_growth = trend_mb(bot_samples[args.warmup:])
+    measured = worker_samples[args.warmup:]
+    half = len(measured) // 2
+    worker_growth = max(measured[half:], default=0.0) - max(measured[:half], default=0.0) if half else 0.0
+    print(f"bot RSS trend after warm-up: {bot_growth:+.1f} MB, "
+          f"worker peak RSS second half vs first: {worker_growth:+.1f} MB (limit {args.max_growth_mb} MB)")
+    if max(bot_growth, worker_growth) > args.max_growth_mb:
+        print("FAIL: memory keeps growing across reports")
+        sys.exit(1)
+    print("OK: memory is flat")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Memory and parse-time comparison of the ticket DataFrame schema.
+
+Builds a synthetic year of tickets shaped like JiraHandler._to_dataframe output,
+then compares the untyped all-object frame (timestamps inferred by
+pd.to_datetime) with the typed ticket schema from data_cleaning. Use it to size
+the bot container for longer report windows.
+
+    python benchmarks/ticket_schema_bench.py [--days 365] [--per-day 300]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_cleaning import TEXT_DTYPE, apply_ticket_schema, parse_timestamps
+
+CLUSTERS = ['apps-prod-01', 'ecomm-prod01-scus1', 'de-airflow-production', 'airflow-prod-01', 'cdp-staging', 'Unknown']
+NAMESPACES = ['cert-manager', 'airflow-dpi', 'simple-machine', 'pepdirect', 'wiz', 'Unknown']
+STATUSES = ['Open', 'In Progress', 'Done', 'Resolved', 'Cancelled', 'Canceled']
+PRIORITIES = ['P1', 'P2', 'P3', 'Unassigned']
+ASSIGNEES = [f'engineer.{n}' for n in range(40)] + ['Unassigned', 'oleg.kolomiets.contractor']
+RESOLUTIONS = ['', 'Done', "Won't Do", 'Duplicate']
+
+
+def make_records(days, per_day, seed):
+    rnd = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    records = []
+    for number in range(1, days * per_day + 1):
+        created = start + timedelta(seconds=rnd.randint(0, days * 86400))
+        updated = created + timedelta(minutes=rnd.randint(0, 3000))
+        cluster = rnd.choice(CLUSTERS)
+        namespace = rnd.choice(NAMESPACES)
+        records.append({
+            'key': f'ISD-{number}',
+            'summary': f'[Datadog] {rnd.choice(["High CPU", "Pod crashloop", "Disk usage"])} '
+                       f'on cluster {cluster} namespace {namespace} host-{rnd.randint(1, 900)}',
+            'priority': rnd.choice(PRIORITIES),
+            'status': rnd.choice(STATUSES),
+            'created': created.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + '+0000',
+            'updated': updated.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + '+0000',
+            'cluster': cluster,
+            'namespace': namespace,
+            'assignee': rnd.choice(ASSIGNEES),
+            'resolution': rnd.choice(RESOLUTIONS),
+            'cancelled': rnd.random() < 0.2,
+            'alert_type': f'{cluster},namespace:{namespace}' if namespace != 'Unknown' else cluster,
+        })
+    return records
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def megabytes(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--per-day', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    records = make_records(args.days, args.per_day, args.seed)
+    print(f"{len(records)} tickets over {args.days} days; text dtype: {TEXT_DTYPE}")
+
+    untyped = pd.DataFrame(records)
+    _, inferred_time = timed(pd.to_datetime, untyped['created'])
+    _, iso_time = timed(parse_timestamps, untyped['created'])
+
+    typed, schema_time = timed(apply_ticket_schema, pd.DataFrame(records))
+
+    print(f"created parse, inferred:   {inferred_time:8.3f}s")
+    print(f"created parse, ISO format: {iso_time:8.3f}s")
+    print(f"apply_ticket_schema:       {schema_time:8.3f}s")
+    print(f"memory, all object:        {megabytes(untyped):8.1f} MB")
+    print(f"memory, ticket schema:     {megabytes(typed):8.1f} MB  (x{megabytes(untyped) / megabytes(typed):.1f} smaller)")
+    print("per column (MB, object -> typed):")
+    before = untyped.memory_usage(deep=True, index=False)
+    after = typed.memory_usage(deep=True, index=False)
+    for column in untyped.columns:
+        print(f"  {column:<12} {before[column] / 2 ** 20:8.2f} -> {after[column] / 2 ** 20:8.2f}  {typed[column].dtype}")
+
+
+if __name__ == '__main__':
+    main()
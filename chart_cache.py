@@ -0,0 +1,134 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+import matplotlib
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when a drawer changes how it draws, so charts cached by the old code are not reused
+CHART_STYLE_VERSION = 1
+
+
+def _data_digest(data) -> str:
+    """Stable digest of chart input data (DataFrame/Series content, or JSON-able values)."""
+    digest = hashlib.sha256()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+        if isinstance(data, pd.DataFrame):
+            digest.update(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes))]).encode('utf-8'))
+        else:
+            digest.update(str((data.name, data.dtype)).encode('utf-8'))
+    else:
+        # Key order is kept: it is the bar/slice order of the chart
+        digest.update(json.dumps(data, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def chart_key(spec) -> str:
+    """Content hash of a ChartSpec: kind + options + input data + style/matplotlib version."""
+    canonical = json.dumps({
+        'kind': spec.kind,
+        'options': spec.options,
+        'data': _data_digest(spec.data),
+        'style': CHART_STYLE_VERSION,
+        'matplotlib': matplotlib.__version__,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ChartCache:
+    """
+    Rendered PNGs addressed by chart_key, kept in one directory.
+
+    A hit copies the stored PNG to the requested output (or returns its bytes)
+    without touching matplotlib. Hits refresh an entry's mtime; when the
+    directory grows past max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.png')
+
+    def get(self, key: str, out_path: str = None):
+        """
+        On a hit copy the PNG to out_path and return out_path (or return the
+        PNG bytes when out_path is None); return None on a miss.
+        """
+        path = self._path(key)
+        try:
+            if out_path is None:
+                with open(path, 'rb') as handle:
+                    value = handle.read()
+            else:
+                shutil.copyfile(path, out_path)
+                value = out_path
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, rendered):
+        """Store a rendered chart, given as a PNG path or PNG bytes."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                if isinstance(rendered, bytes):
+                    handle.write(rendered)
+                else:
+                    with open(rendered, 'rb') as source:
+                        shutil.copyfileobj(source, handle)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._unlink(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith('.png'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._unlink(path)
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,258 @@
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+from config import (
+    CHART_DIR, CHART_WORKERS, CHART_START_METHOD, CHART_WORKER_MAX_RSS_MB,
+    ENABLE_CHART_CACHE, CHART_CACHE_DIR, CHART_CACHE_MAX_BYTES
+)
+from chart_cache import ChartCache, chart_key
+from memory_utils import rss_bytes, release_memory
+import metrics
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Chart kind -> "module:function" drawing it. Resolved inside the worker, so this
+# module stays import-light; a drawer takes (data, **options) and returns a Figure.
+CHART_KINDS = {
+    'bar': 'visualization:draw_bar',
+    'donut': 'visualization:draw_donut',
+    'pie': 'visualization:draw_pie',
+    'line': 'visualization:draw_line',
+    'priority_changes': 'visualization:draw_priority_changes',
+    'ticket_table': 'visualization:draw_ticket_table',
+    'legacy': 'script_old.main:draw_legacy_chart',
+}
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """
+    Declarative description of one chart: what to draw (kind + options),
+    from which data, and the PNG file name it is saved under.
+    Everything in it must be picklable; it is sent to a render worker.
+    """
+    kind: str
+    name: str
+    data: object
+    options: dict = field(default_factory=dict)
+
+
+# RSS of a pool worker once it was initialized; growth past max_rss triggers a purge
+_worker_base_rss = 0
+
+# pyplot (legacy drawers, plt.close) is not thread-safe; report jobs rendering in
+# this process take turns
+_inprocess_lock = threading.Lock()
+
+
+def _init_worker():
+    """Process pool initializer: select the Agg backend once per worker."""
+    global _worker_base_rss
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot  # noqa: F401  (pay the pyplot import once, not per chart)
+    if not _worker_base_rss:
+        _worker_base_rss = rss_bytes()
+
+
+def _drawer(kind):
+    try:
+        target = CHART_KINDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown chart kind: {kind}") from None
+    module_name, function_name = target.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def render_chart(spec: ChartSpec, out_dir: str = None):
+    """
+    Draw and rasterize one chart. Saves it as out_dir/spec.name and returns the
+    path, or returns the PNG bytes when out_dir is None.
+    """
+    import matplotlib.pyplot as plt
+
+    fig = _drawer(spec.kind)(spec.data, **spec.options)
+    try:
+        if out_dir is None:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', bbox_inches='tight')
+            return buffer.getvalue()
+        path = os.path.join(out_dir, spec.name)
+        fig.savefig(path, bbox_inches='tight')
+        return path
+    finally:
+        # Legacy drawers still go through pyplot, which holds on to a figure until it is closed
+        plt.close(fig)
+        fig.clear()
+
+
+def _render_traced(spec: ChartSpec, out_dir: str = None):
+    with tracing.span('chart', chart=spec.name, kind=spec.kind), _inprocess_lock:
+        return render_chart(spec, out_dir)
+
+
+def _purge_worker():
+    """Drop everything a worker can hold on to between charts and trim its heap."""
+    import gc
+    import matplotlib.pyplot as plt
+    plt.close('all')
+    gc.collect()
+    release_memory()
+
+
+def _render_in_worker(spec: ChartSpec, out_dir: str = None, max_rss: int = 0):
+    """
+    render_chart for a pool worker. The heap is trimmed after every chart, and
+    purged once the worker has grown past max_rss. Also returns the worker's RSS
+    growth, whether it was purged and when it drew the chart (start, end, pid,
+    tid), for the caller's trace.
+    """
+    started = time.time()
+    result = render_chart(spec, out_dir)
+    timing = (started, time.time(), os.getpid(), threading.get_native_id())
+    release_memory()
+    purged = bool(max_rss) and rss_bytes() - _worker_base_rss > max_rss
+    if purged:
+        _purge_worker()
+    return result, rss_bytes() - _worker_base_rss, purged, timing
+
+
+class ChartService:
+    """
+    Renders batches of ChartSpecs concurrently on a process pool.
+
+    Rasterization is CPU-bound and holds the GIL, so charts are drawn in worker
+    processes (Agg backend set once per worker). With a single worker, or once
+    the pool has broken, charts are rendered in the calling process instead,
+    one at a time.
+    Charts whose content hash is in the ChartCache are not rendered at all.
+
+    The workers are forked once, by start() before the bot starts its threads,
+    and live as long as the bot: forking the running bot again (to replace
+    them) could deadlock the child on a lock another thread held, and
+    spawn/forkserver workers would re-import the bot's main module. Instead a
+    worker trims its heap after every chart and is purged (pyplot state,
+    garbage, heap) whenever it has grown by more than max_rss_mb.
+    """
+
+    def __init__(self, max_workers: int = CHART_WORKERS, start_method: str = CHART_START_METHOD,
+                 cache: ChartCache = None, max_rss_mb: int = CHART_WORKER_MAX_RSS_MB):
+        self.max_workers = max(1, max_workers)
+        self.start_method = start_method
+        self.cache = cache
+        self.max_rss = max_rss_mb * 2 ** 20
+        self.purges = 0
+        self._pool = None
+        self._broken = False
+        self._lock = threading.RLock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None and not self._broken:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                )
+            return self._pool
+
+    def start(self):
+        """Start the workers now (call early, before the bot starts its threads)."""
+        if self.max_workers > 1:
+            self._executor().submit(_init_worker).result()
+
+    def _map(self, specs, out_dir):
+        specs = list(specs)
+        with tracing.span('render_charts', charts=len(specs)) as span:
+            if self.cache is None:
+                return self._render_all(specs, out_dir)
+
+            keys = [chart_key(spec) for spec in specs]
+            results = [
+                self.cache.get(key, None if out_dir is None else os.path.join(out_dir, spec.name))
+                for spec, key in zip(specs, keys)
+            ]
+            misses = [i for i, result in enumerate(results) if result is None]
+            span.set(cache_hits=len(specs) - len(misses))
+            rendered = self._render_all([specs[i] for i in misses], out_dir)
+            for i, result in zip(misses, rendered):
+                self.cache.put(keys[i], result)
+                results[i] = result
+            return results
+
+    def _render_all(self, specs, out_dir):
+        if self.max_workers == 1 or not specs:
+            return [_render_traced(spec, out_dir) for spec in specs]
+        try:
+            with self._lock:
+                executor = self._executor()
+                if executor is not None:
+                    futures = [executor.submit(_render_in_worker, spec, out_dir, self.max_rss) for spec in specs]
+            if executor is None:
+                return [_render_traced(spec, out_dir) for spec in specs]
+            outcomes = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            # Not replaced: that would fork the bot with its threads running
+            logger.error(f"Chart render pool broke ({e}); rendering in-process until the bot restarts")
+            with self._lock:
+                self._broken = True
+            self.shutdown()
+            return [_render_traced(spec, out_dir) for spec in specs]
+        for spec, (_, _, _, (started, ended, pid, tid)) in zip(specs, outcomes):
+            tracing.add_span('chart', started, ended, pid, tid, process='chart-worker', chart=spec.name, kind=spec.kind)
+        purged = sum(purged for _, _, purged, _ in outcomes)
+        if purged:
+            with self._lock:
+                self.purges += purged
+            growth = max(growth for _, growth, _, _ in outcomes)
+            logger.info(f"Purged {purged} chart render worker(s) past {self.max_rss / 2 ** 20:.0f} MB "
+                        f"(largest growth now {growth / 2 ** 20:.0f} MB)")
+        return [result for result, _, _, _ in outcomes]
+
+    def render(self, specs, out_dir: str = CHART_DIR) -> dict:
+        """Render specs into out_dir; returns {spec.name: path}."""
+        specs = list(specs)
+        os.makedirs(out_dir, exist_ok=True)
+        return dict(zip((spec.name for spec in specs), self._map(specs, out_dir)))
+
+    def render_bytes(self, specs) -> dict:
+        """Render specs in memory; returns {spec.name: PNG bytes}."""
+        specs = list(specs)
+        return dict(zip((spec.name for spec in specs), self._map(specs, None)))
+
+    def render_one(self, spec: ChartSpec, out_dir: str = CHART_DIR) -> str:
+        return self.render([spec], out_dir)[spec.name]
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_chart_service() -> ChartService:
+    """Process-wide ChartService (its pool is started on first render if start() was not called)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            cache = ChartCache(CHART_CACHE_DIR, CHART_CACHE_MAX_BYTES) if ENABLE_CHART_CACHE else None
+            if cache is not None:
+                metrics.register_cache('charts', cache)
+            _service = ChartService(cache=cache)
+        return _service
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from config import PRIORITY_MAP, EXTRACTION_PATTERNS
 import logging
@@ -5,25 +6,34 @@ import logging
 def assign_alert_type(df: pd.DataFrame) -> pd.DataFrame:
     """
     Adds 'alert_type' column based on cluster/namespace or summary.
+    Rules are evaluated column-wise in order (first match wins); the frame is updated in place.
     """
-    def _type_for_row(row):
-        # If namespace exists
-        if row.get('namespace') and row['namespace'] != 'Unknown':
-            return f"{row['cluster']},namespace:{row['namespace']}"
+    index = df.index
+    cluster = df['cluster'] if 'cluster' in df.columns else pd.Series('Other', index=index, dtype=object)
+    namespace = df['namespace'] if 'namespace' in df.columns else pd.Series('', index=index, dtype=object)
+    summary = df['summary'] if 'summary' in df.columns else pd.Series('', index=index, dtype=object)
+    text = summary.fillna('').astype(str).str.lower()
+
+    # If namespace exists
+    has_namespace = namespace.notna() & (namespace != '') & (namespace != 'Unknown')
+    conditions = [
+        has_namespace.to_numpy(dtype=bool),
         # Otherwise check summary for keywords
-        text = row.get('summary','').lower()
-        if 'troubleshooting' in text:
-            return 'Troubleshooting'
-        if 'outage' in text:
-            return 'Outage Reporting'
-        if 'wiz finding' in text:
-            return 'Wiz findings'
+        text.str.contains('troubleshooting', regex=False).to_numpy(dtype=bool),
+        text.str.contains('outage', regex=False).to_numpy(dtype=bool),
+        text.str.contains('wiz finding', regex=False).to_numpy(dtype=bool),
         # Can be extended for Snyk/GuardDuty etc.
-        # Default - just cluster
-        return row.get('cluster','Other') or 'Other'
+    ]
+    choices = [
+        (cluster.astype(str) + ',namespace:' + namespace.astype(str)).to_numpy(dtype=object),
+        'Troubleshooting',
+        'Outage Reporting',
+        'Wiz findings',
+    ]
+    # Default - just cluster
+    default = cluster.where(cluster.notna() & (cluster != ''), 'Other').to_numpy(dtype=object)
 
-    df = df.copy()
-    df['alert_type'] = df.apply(_type_for_row, axis=1)
+    df['alert_type'] = np.select(conditions, choices, default=default)
     return df
 
 def classify_priorities(df: pd.DataFrame) -> pd.DataFrame:
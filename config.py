@@ -1,14 +1,14 @@
 import os
 from dotenv import load_dotenv
 
+# Load environment variables
+load_dotenv()
+
 # Base directories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-LEGACY_DIR = os.path.join(BASE_DIR, 'legacy_output')
+LEGACY_DIR = os.getenv('LEGACY_DIR', os.path.join(BASE_DIR, 'legacy_output'))
 LEGACY_ART_DIR = os.path.join(LEGACY_DIR, 'artifacts')
 
-# Load environment variables
-load_dotenv()
-
 # === Slack configuration ===
 SLACK_BOT_TOKEN = os.getenv('SLACK_BOT_TOKEN')
 SLACK_APP_TOKEN = os.getenv('SLACK_APP_TOKEN')
@@ -17,11 +17,17 @@ SLACK_APP_TOKEN = os.getenv('SLACK_APP_TOKEN')
 JIRA_URL = os.getenv('JIRA_URL')
 JIRA_EMAIL = os.getenv('JIRA_EMAIL')
 JIRA_API_TOKEN = os.getenv('JIRA_API_TOKEN')
-# Enable API-based data fetching instead of static dumps
-USE_JIRA_API = True
+# Fetch from the Jira API; when off, Jira is replayed from JIRA_FIXTURE_PATH (see JIRA_BACKEND)
+USE_JIRA_API = os.getenv('USE_JIRA_API', 'true').lower() == 'true'
 # Pagination size for Jira API requests
 JIRA_PAGE_SIZE = int(os.getenv('JIRA_PAGE_SIZE', 50))
 JIRA_REQUEST_TIMEOUT = float(os.getenv('JIRA_REQUEST_TIMEOUT', 10))
+# Pages fetched concurrently once the first page reports `total` (1 = sequential)
+JIRA_PARALLEL_PAGES = int(os.getenv('JIRA_PARALLEL_PAGES', 4))
+# Upper bound for the adaptive page size (Jira Cloud caps search at 100)
+JIRA_MAX_PAGE_SIZE = int(os.getenv('JIRA_MAX_PAGE_SIZE', 100))
+# Page latency the adaptive page size aims for, in seconds
+JIRA_TARGET_PAGE_SECONDS = float(os.getenv('JIRA_TARGET_PAGE_SECONDS', 2))
 
 # === Confluence configuration ===
 CONFLUENCE_POSTMORTEM_PARENT = os.getenv('CONFLUENCE_POSTMORTEM_PARENT', '14745973')
@@ -30,6 +36,19 @@ CONFLUENCE_POSTMORTEM_PARENT = os.getenv('CONFLUENCE_POSTMORTEM_PARENT', '147459
 REPORT_TITLE = os.getenv('REPORT_TITLE', "Pepsico Weekly Report")
 JIRA_PROJECT = os.getenv('JIRA_PROJECT', "ISD")
 REPORT_DAYS = int(os.getenv('REPORT_DAYS', 7))
+# Report sections fetched at the same time (Jira + Confluence)
+REPORT_FETCH_CONCURRENCY = int(os.getenv('REPORT_FETCH_CONCURRENCY', 4))
+# Build the legacy charts in-process from the report's tickets instead of re-crawling Jira in subprocesses
+LEGACY_IN_PROCESS = os.getenv('LEGACY_IN_PROCESS', 'true').lower() == 'true'
+# Return the stored PDF when a report's inputs are unchanged since it was built
+ENABLE_REPORT_REUSE = os.getenv('ENABLE_REPORT_REUSE', 'true').lower() == 'true'
+# Reports built at the same time in the background (identical requests share one build)
+REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', 1))
+# Finished reports uploaded at the same time, apart from the build workers
+REPORT_DELIVERY_WORKERS = int(os.getenv('REPORT_DELIVERY_WORKERS', 4))
+
+# Display name of the custom field behind "NOC Representative[User Picker (single user)]"
+NOC_FIELD_NAME = os.getenv('NOC_FIELD_NAME', 'NOC Representative')
 
 # === JQL templates ===
 JQL_TEMPLATES = {
@@ -158,19 +177,95 @@ CHART_COLORS = {
     'P4': '#00FF00',  # green for low
     'Unknown': '#808080'  # grey for unassigned/other
 }
+# Processes rendering charts in parallel (1 renders in the calling process)
+CHART_WORKERS = int(os.getenv('CHART_WORKERS', os.cpu_count() or 1))
+# 'fork' by default: spawn/forkserver workers re-import the bot's main module
+CHART_START_METHOD = os.getenv('CHART_START_METHOD', 'fork')
+# Purge a render worker (pyplot state, garbage, heap) once its RSS has grown by
+# this many MB since it started (0 disables); workers are never re-forked
+CHART_WORKER_MAX_RSS_MB = int(os.getenv('CHART_WORKER_MAX_RSS_MB', 200))
+# Reuse rendered charts whose inputs did not change (content-hash cache under CHART_DIR)
+ENABLE_CHART_CACHE = os.getenv('ENABLE_CHART_CACHE', 'true').lower() == 'true'
+CHART_CACHE_MAX_BYTES = int(os.getenv('CHART_CACHE_MAX_BYTES', 64 * 1024 * 1024))
 
 # === Paths ===
-REPORT_DIR = os.path.join(BASE_DIR, 'reports')
-CHART_DIR = os.path.join(BASE_DIR, 'charts')
+REPORT_DIR = os.getenv('REPORT_DIR', os.path.join(BASE_DIR, 'reports'))
+CHART_DIR = os.getenv('CHART_DIR', os.path.join(BASE_DIR, 'charts'))
+CHART_CACHE_DIR = os.path.join(CHART_DIR, 'cache')
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(BASE_DIR, 'data'))
+# Per-job working directories (charts, legacy artifacts) of queued report builds
+JOB_DIR = os.getenv('JOB_DIR', os.path.join(BASE_DIR, 'jobs'))
 
 # Create directories if not exist (at import time)
 os.makedirs(REPORT_DIR, exist_ok=True)
 os.makedirs(CHART_DIR, exist_ok=True)
 
 # === Other settings ===
-# Whether to cache Jira API responses locally
-ENABLE_CACHING = os.getenv('ENABLE_CACHING', 'false').lower() == 'true'
-CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 3600))
+# Whether to cache Jira search results in memory (LRU, bounded, per-entry TTL)
+ENABLE_CACHING = os.getenv('ENABLE_CACHING', 'true').lower() == 'true'
+CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 300))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Disk cache of complete Jira search results, shared by the bot and legacy subprocesses
+ENABLE_DISK_CACHE = os.getenv('ENABLE_DISK_CACHE', 'true').lower() == 'true'
+DISK_CACHE_DIR = os.getenv('DISK_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'http'))
+DISK_CACHE_TTL_SECONDS = int(os.getenv('DISK_CACHE_TTL_SECONDS', 600))
+DISK_CACHE_MAX_BYTES = int(os.getenv('DISK_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+# 'zlib' (fast) or 'lzma' (smaller)
+DISK_CACHE_COMPRESSION = os.getenv('DISK_CACHE_COMPRESSION', 'zlib')
+
+# === Local issue store ===
+# Persist issues in SQLite and only fetch what changed since the last sync
+ENABLE_ISSUE_STORE = os.getenv('ENABLE_ISSUE_STORE', 'false').lower() == 'true'
+ISSUE_STORE_PATH = os.getenv('ISSUE_STORE_PATH', os.path.join(DATA_DIR, 'issues.sqlite3'))
+# History loaded by the first (full) sync, in days
+ISSUE_STORE_BACKFILL_DAYS = int(os.getenv('ISSUE_STORE_BACKFILL_DAYS', 35))
+# Extra minutes re-fetched before the watermark to absorb clock skew
+ISSUE_STORE_SYNC_OVERLAP_MINUTES = int(os.getenv('ISSUE_STORE_SYNC_OVERLAP_MINUTES', 10))
+# Skip the incremental sync if the store was synced more recently than this
+ISSUE_STORE_SYNC_INTERVAL_SECONDS = int(os.getenv('ISSUE_STORE_SYNC_INTERVAL_SECONDS', 60))
+
+# === Jira backend ===
+# 'live', 'record' (live, also appending every Jira/Confluence response to the fixture)
+# or 'replay' (answer everything from the fixture, no network)
+JIRA_BACKEND = os.getenv('JIRA_BACKEND', 'live' if USE_JIRA_API else 'replay')
+# Recorded responses, gzip-compressed JSON lines
+JIRA_FIXTURE_PATH = os.getenv('JIRA_FIXTURE_PATH', os.path.join(DATA_DIR, 'jira_fixture.jsonl.gz'))
+# Move replayed timestamps forward by the fixture's age, so relative JQL (-7d) still matches
+JIRA_REPLAY_SHIFT_TIME = os.getenv('JIRA_REPLAY_SHIFT_TIME', 'true').lower() == 'true'
+
+# === Request governor ===
+# Every Jira and Confluence request goes through a per-service governor
+# Ceiling on sustained requests per second (0: none) and the burst allowed on top of it;
+# the server's own limit is found through throttling responses
+HTTP_RATE_PER_SECOND = float(os.getenv('HTTP_RATE_PER_SECOND', 25))
+HTTP_BURST = int(os.getenv('HTTP_BURST', 50))
+# Requests in flight: starts at the maximum, halved on throttling, grows back by one per window of successes
+HTTP_MIN_CONCURRENCY = int(os.getenv('HTTP_MIN_CONCURRENCY', 1))
+HTTP_MAX_CONCURRENCY = int(os.getenv('HTTP_MAX_CONCURRENCY', 8))
+# Retries of a throttled (429/503), failing (502/504) or dropped request
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 5))
+# Jittered exponential backoff between retries when the server gives no Retry-After
+HTTP_BACKOFF_BASE_SECONDS = float(os.getenv('HTTP_BACKOFF_BASE_SECONDS', 0.5))
+HTTP_BACKOFF_MAX_SECONDS = float(os.getenv('HTTP_BACKOFF_MAX_SECONDS', 60))
+
+# === Metrics ===
+# Prometheus text endpoint served by the bot on 127.0.0.1 (0 disables)
+METRICS_PORT = int(os.getenv('METRICS_PORT', 9464))
+# Also write the metrics in Prometheus text format to this file after each report (empty disables)
+METRICS_FILE = os.getenv('METRICS_FILE', '')
+# One JSON line per report run with what it added to every counter
+METRICS_RUN_LOG = os.getenv('METRICS_RUN_LOG', os.path.join(DATA_DIR, 'report_runs.jsonl'))
+
+# === Tracing ===
+# Record spans of every /jira-report run and write them as Chrome trace files
+ENABLE_TRACING = os.getenv('ENABLE_TRACING', 'true').lower() == 'true'
+TRACE_DIR = os.getenv('TRACE_DIR', os.path.join(DATA_DIR, 'traces'))
+# Trace files kept in TRACE_DIR (oldest removed first)
+TRACE_KEEP = int(os.getenv('TRACE_KEEP', 50))
+# Spans kept per trace; a runaway trace is truncated beyond this
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', 50000))
 
 # === Access control ===
 ALLOWED_USER_IDS = os.getenv('ALLOWED_USER_IDS', '').split(',') if os.getenv('ALLOWED_USER_IDS') else []
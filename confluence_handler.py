@@ -6,15 +6,23 @@ from config import (
     JIRA_EMAIL,
     JIRA_API_TOKEN,
     REPORT_DAYS,
-    CONFLUENCE_POSTMORTEM_PARENT
+    CONFLUENCE_POSTMORTEM_PARENT,
+    JIRA_BACKEND,
+    JIRA_FIXTURE_PATH
 )
+from jira_backends import read_fixture, write_fixture
+from metrics import http_hook
+from request_governor import govern_session
+import tracing
 
 logger = logging.getLogger(__name__)
 
 class ConfluenceHandler:
     def __init__(self):
-        self.base = JIRA_URL.rstrip('/')
+        self.base = (JIRA_URL or '').rstrip('/')
         self.auth = (JIRA_EMAIL, JIRA_API_TOKEN)
+        # Rate limited and retried by the shared request governor
+        self.session = govern_session(requests.Session(), 'confluence')
 
     def get_recent_postmortems(self):
         # Calculate date N days ago
@@ -35,14 +43,26 @@ class ConfluenceHandler:
             'expand': 'history,body.view'
         }
 
-        try:
-            resp = requests.get(url, auth=self.auth, params=params, timeout=10)
-            resp.raise_for_status()
-        except requests.RequestException as e:
-            logger.error(f'Failed to fetch post-mortem pages: {e}')
-            return []
+        if JIRA_BACKEND == 'replay':
+            # The pages of the most recent recorded search
+            results = []
+            for record in read_fixture(JIRA_FIXTURE_PATH):
+                if record.get('type') == 'confluence':
+                    results = record['results']
+        else:
+            try:
+                with tracing.span('confluence.search', cql=cql) as span:
+                    resp = self.session.get(url, auth=self.auth, params=params, timeout=10,
+                                            hooks={'response': http_hook('confluence')})
+                    span.set(status=resp.status_code)
+                    resp.raise_for_status()
+            except requests.RequestException as e:
+                logger.error(f'Failed to fetch post-mortem pages: {e}')
+                return []
 
-        results = resp.json().get('results', [])
+            results = resp.json().get('results', [])
+            if JIRA_BACKEND == 'record':
+                write_fixture(JIRA_FIXTURE_PATH, {'type': 'confluence', 'cql': cql, 'results': results})
         postmortems = []
         for page in results:
             postmortems.append({
@@ -1,5 +1,86 @@
+import logging
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow  # noqa: F401  (backs the Arrow string dtype)
+    TEXT_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:  # pragma: no cover - fall back to pandas' own string dtype
+    TEXT_DTYPE = pd.StringDtype('python')
+
+logger = logging.getLogger(__name__)
+
+# === Ticket DataFrame schema (applied once at ingest) ===
+# Low-cardinality labels repeated on every row
+CATEGORY_COLUMNS = ['priority', 'status', 'cluster', 'namespace', 'assignee', 'resolution', 'alert_type']
+# Free text
+TEXT_COLUMNS = ['key', 'summary']
+# Jira ISO-8601 timestamps, normalized to UTC
+TIMESTAMP_COLUMNS = ['created', 'updated']
+# Index name for the numeric part of the issue key (ISD-123 -> 123)
+KEY_INDEX_NAME = 'issue_id'
+
+def parse_timestamps(series: pd.Series) -> pd.Series:
+    """
+    Parses Jira timestamps ('2024-05-01T10:00:00.000+0300') into UTC datetimes.
+    The naive ISO part is parsed in one vectorized pass and the few distinct
+    offsets are applied afterwards; pandas' own %z handling is much slower.
+    Anything else goes through the generic ISO8601 parser.
+    """
+    text = series.astype(TEXT_DTYPE)
+    offsets = text.str.slice(-5)
+    valid = offsets.str.fullmatch(r'[+-]\d{4}')
+    if text.isna().all() or not valid.fillna(True).all():
+        return pd.to_datetime(series, format='ISO8601', utc=True)
+
+    local = pd.to_datetime(text.str.slice(0, -5), format='ISO8601')
+    codes, uniques = pd.factorize(offsets)
+    minutes = np.array([
+        (-1 if offset[0] == '-' else 1) * (int(offset[1:3]) * 60 + int(offset[3:5]))
+        for offset in uniques
+    ])
+    shift = pd.to_timedelta(minutes[codes], unit='m')
+    return pd.Series(local.to_numpy() - shift.to_numpy(), index=series.index, name=series.name).dt.tz_localize('UTC')
+
+def _categorical(series: pd.Series) -> pd.Series:
+    # Categories in order of first appearance, so value_counts() ties keep the row order
+    return series.astype(pd.CategoricalDtype(series.dropna().unique()))
+
+def apply_ticket_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts a ticket DataFrame to the compact ticket schema:
+    - label columns become categoricals
+    - key and summary become (Arrow-backed, when available) strings
+    - created/updated become UTC datetimes
+    - the index is the numeric part of the issue key
+    Returns empty DataFrame unchanged.
+    """
+    if df.empty:
+        return df
+
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = _categorical(df[column])
+    for column in TEXT_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(TEXT_DTYPE)
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = parse_timestamps(df[column])
+
+    if 'key' in df.columns:
+        numbers = pd.to_numeric(df['key'].str.extract(r'(\d+)$', expand=False), errors='coerce')
+        if numbers.notna().all() and numbers.is_unique:
+            df.index = pd.Index(numbers.astype('int64'), name=KEY_INDEX_NAME)
+        else:
+            logger.debug("Issue keys are not uniquely numbered; keeping the positional index")
+    return df
+
+def observed_counts(series: pd.Series) -> pd.Series:
+    """value_counts() without the zero rows a categorical reports for unused categories."""
+    counts = series.value_counts()
+    return counts[counts > 0]
+
 def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     Cleans and normalizes the DataFrame:
@@ -11,11 +92,12 @@ def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
 
-    # Convert created to datetime if column exists
-    if 'created' in df.columns:
-        df['created'] = pd.to_datetime(df['created'])
+    # Parse timestamps once, with the known format
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_timestamps(df[column])
     
     # Remove duplicates based on ticket key
     df = df.drop_duplicates(subset=['key'], ignore_index=True)
     
-    return df
\ No newline at end of file
+    return df
@@ -0,0 +1,28 @@
+import re
+import pandas as pd
+from config import EXTRACTION_PATTERNS
+from cancelled import detect_cancelled
+
+# Compiled once; applied column-wise with Series.str.extract
+COMPILED_PATTERNS = {name: re.compile(pattern) for name, pattern in EXTRACTION_PATTERNS.items()}
+
+def extract_fields(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds one column per EXTRACTION_PATTERNS entry (cluster, namespace) holding the
+    first capture from the summary, or 'Unknown' when the pattern does not match.
+    """
+    summary = df['summary']
+    for name, pattern in COMPILED_PATTERNS.items():
+        df[name] = summary.str.extract(pattern, expand=False).fillna('Unknown')
+    return df
+
+def enrich_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Column-wise enrichment of plucked ticket records: extracted fields and the
+    'cancelled' flag. Returns the DataFrame unchanged if it's empty.
+    """
+    if df.empty:
+        return df
+    df = extract_fields(df)
+    df = detect_cancelled(df)
+    return df
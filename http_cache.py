@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import lzma
+import os
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms run without file locks
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_CODECS = {
+    'zlib': (lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+
+def request_key(**request) -> str:
+    """Content address of a request: sha256 of its canonical JSON."""
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@contextmanager
+def _locked(path, exclusive=True, blocking=True):
+    """Hold an flock on `path` (no-op where fcntl is unavailable). Yields False if not acquired."""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, 'a') as handle:
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(handle, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class DiskResponseCache:
+    """
+    Content-addressed, compressed response cache on disk, shared between processes.
+
+    Each entry is one file named by the request hash. Writers hold a per-key
+    file lock while fetching, so a second process asking for the same request
+    waits and then reads the stored response instead of hitting the network.
+    Entries expire after `ttl` seconds; garbage collection keeps the directory
+    under `max_bytes` by removing expired, then least recently written, entries.
+    """
+
+    def __init__(self, directory: str, ttl: float, max_bytes: int, compression: str = 'zlib'):
+        if compression not in _CODECS:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self._compress, self._decompress = _CODECS[compression]
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.{self.compression}')
+
+    def get(self, key: str):
+        """Return the stored response for key, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, 'rb') as handle:
+                payload = handle.read()
+            return json.loads(self._decompress(payload))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error, lzma.LZMAError) as e:
+            logger.warning(f"Dropping unreadable cache entry {path}: {e}")
+            self._unlink(path)
+            return None
+
+    def put(self, key: str, value):
+        """Store a JSON-serializable response (atomic replace)."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = self._compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._unlink(tmp_path)
+            raise
+        self.collect_garbage()
+
+    def get_or_fetch(self, key: str, fetch):
+        """Return the stored response for key, or fetch() it under a cross-process lock and store it."""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        lock_path = self._path(key) + '.lock'
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with _locked(lock_path):
+            # Another process may have stored it while we waited for the lock
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = fetch()
+            self.put(key, value)
+        self._unlink(lock_path)
+        return value
+
+    def collect_garbage(self):
+        """Remove expired entries, then the oldest ones until the cache fits in max_bytes."""
+        with _locked(os.path.join(self.directory, '.gc.lock'), blocking=False) as acquired:
+            if not acquired:
+                return  # another process is collecting
+            now = time.time()
+            entries = []
+            total = 0
+            suffix = f'.{self.compression}'
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if not name.endswith(suffix):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    if now - stat.st_mtime > self.ttl:
+                        self._unlink(path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                self._unlink(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Timestamp format used by Jira for `created` / `updated`
+JIRA_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key        TEXT PRIMARY KEY,
+    project    TEXT NOT NULL,
+    created_ts REAL NOT NULL,
+    updated_ts REAL NOT NULL,
+    raw        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_project_created ON issues (project, created_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project      TEXT PRIMARY KEY,
+    watermark    TEXT NOT NULL,
+    covered_from TEXT NOT NULL
+);
+"""
+
+
+def parse_jira_time(value: str) -> datetime:
+    """Parse a Jira timestamp such as 2024-05-01T10:22:33.000+0000."""
+    return datetime.strptime(value, JIRA_TIME_FORMAT)
+
+
+class IssueStore:
+    """
+    On-disk store of raw Jira issue JSON.
+
+    Keeps one row per issue key plus a per-project sync state:
+    - watermark: when the last successful sync started (UTC)
+    - covered_from: oldest `created` time the store is complete for
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def get_sync_state(self, project: str):
+        """Return {'watermark', 'covered_from'} as UTC datetimes, or None if never synced."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT watermark, covered_from FROM sync_state WHERE project = ?',
+                (project,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'watermark': datetime.fromisoformat(row[0]),
+            'covered_from': datetime.fromisoformat(row[1]),
+        }
+
+    def set_sync_state(self, project: str, watermark: datetime, covered_from: datetime):
+        """Record a completed sync."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO sync_state (project, watermark, covered_from) VALUES (?, ?, ?) '
+                'ON CONFLICT(project) DO UPDATE SET '
+                'watermark = excluded.watermark, covered_from = excluded.covered_from',
+                (project, watermark.isoformat(), covered_from.isoformat())
+            )
+
+    def upsert(self, project: str, raw_issues) -> int:
+        """Insert or replace raw issue dicts; returns the number of rows written."""
+        rows = []
+        for raw in raw_issues:
+            fields = raw.get('fields', {})
+            rows.append((
+                raw['key'],
+                project,
+                parse_jira_time(fields['created']).timestamp(),
+                parse_jira_time(fields['updated']).timestamp(),
+                json.dumps(raw),
+            ))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO issues (key, project, created_ts, updated_ts, raw) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET '
+                'created_ts = excluded.created_ts, updated_ts = excluded.updated_ts, raw = excluded.raw',
+                rows
+            )
+        logger.debug(f"Upserted {len(rows)} issues into {self.path}")
+        return len(rows)
+
+    def load(self, project: str, created_from: datetime, created_to: datetime = None):
+        """Return raw issue dicts created in [created_from, created_to), newest first."""
+        sql = 'SELECT raw FROM issues WHERE project = ? AND created_ts >= ?'
+        params = [project, created_from.timestamp()]
+        if created_to is not None:
+            sql += ' AND created_ts < ?'
+            params.append(created_to.timestamp())
+        sql += ' ORDER BY created_ts DESC'
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
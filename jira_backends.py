@@ -0,0 +1,260 @@
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+import requests
+from jira import JIRA
+from jira.client import ResultList
+from jira.exceptions import JIRAError
+from jira.resources import Issue
+
+from config import (
+    JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN, JIRA_REQUEST_TIMEOUT,
+    JIRA_BACKEND, JIRA_FIXTURE_PATH, JIRA_REPLAY_SHIFT_TIME
+)
+from jql import JqlQuery, parse_jira_time, format_jira_time
+from request_governor import govern_session
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('live', 'record', 'replay')
+
+# Issue timestamps moved by the replay time shift
+_TIME_FIELDS = ('created', 'updated', 'resolutiondate')
+
+_write_lock = threading.Lock()
+
+
+def write_fixture(path: str, record: dict):
+    """
+    Append one record to a gzip-compressed JSON lines fixture.
+    Each record is its own gzip member written with a single O_APPEND write,
+    so the bot and the legacy subprocesses can record into the same file.
+    """
+    record = dict(record, at=datetime.now(timezone.utc).isoformat())
+    data = gzip.compress((json.dumps(record, separators=(',', ':'), default=str) + '\n').encode('utf-8'))
+    with _write_lock:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+
+def read_fixture(path: str):
+    """Records of a fixture, oldest first (nothing if the file does not exist)."""
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, 'rt', encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+class RecordingJira:
+    """
+    Live JIRA client that also appends every search page, issue and field list
+    it receives to a fixture, for ReplayJira. Everything else is delegated.
+    """
+
+    def __init__(self, client: JIRA, path: str = JIRA_FIXTURE_PATH):
+        self._client = client
+        self.path = path
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def search_issues(self, jql_str, startAt=0, maxResults=50, fields=None, expand=None, **kwargs):
+        issues = self._client.search_issues(jql_str=jql_str, startAt=startAt, maxResults=maxResults,
+                                            fields=fields, expand=expand, **kwargs)
+        write_fixture(self.path, {
+            'type': 'search', 'jql': jql_str, 'start_at': startAt, 'max_results': maxResults,
+            'fields': fields, 'expand': expand, 'total': issues.total,
+            'issues': [issue.raw for issue in issues],
+        })
+        return issues
+
+    def issue(self, id, fields=None, expand=None):
+        issue = self._client.issue(id, fields=fields, expand=expand)
+        write_fixture(self.path, {'type': 'issue', 'key': issue.key, 'issue': issue.raw})
+        return issue
+
+    def fields(self):
+        fields = self._client.fields()
+        write_fixture(self.path, {'type': 'fields', 'fields': fields})
+        return fields
+
+
+class ReplayJira:
+    """
+    Answers JiraHandler's Jira calls (search_issues, issue, fields) from a
+    recorded fixture, without any network.
+
+    A search that was recorded is answered as it was recorded: the same
+    total and the same issues in the same order (count searches included,
+    whose recorded page holds nothing to filter on). Every issue seen while
+    recording is also kept (fields merged across the pages it appeared on,
+    newest wins), so any other JQL (per-cluster `text ~`, date ranges) is
+    evaluated locally with JqlQuery; those results are cached until
+    begin_report(), as relative dates (-7d) move with the clock.
+    With shift_time, all timestamps move forward by the fixture's age, so
+    relative and date-range JQL see the data as it was when recorded.
+    """
+
+    def __init__(self, path: str = JIRA_FIXTURE_PATH, shift_time: bool = JIRA_REPLAY_SHIFT_TIME):
+        self.path = path
+        # What Issue resources need from a client
+        self._options = dict(JIRA.DEFAULT_OPTIONS, server=JIRA_URL or 'http://jira.replay.invalid')
+        self._session = requests.Session()
+        self._issues = {}
+        self._fields = []
+        self._recorded = {}  # JQL -> {'total', 'keys': {position: issue key}} of the latest recording
+        self._matches = {}  # JQL -> matching raw issues, in result order (this report)
+        self._lock = threading.Lock()
+        self.recorded_at = self._load()
+        if shift_time and self.recorded_at is not None:
+            self._shift(datetime.now(timezone.utc) - self.recorded_at)
+        self._custom_fields = {field['name']: field['id'] for field in self._fields if field.get('custom')}
+        logger.info(f"Replaying {len(self._issues)} Jira issues from {path}")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            logger.warning(f"Jira fixture {self.path} not found; replaying an empty Jira")
+            return None
+        recorded_at = None
+        for record in read_fixture(self.path):
+            kind = record.get('type')
+            if kind == 'search':
+                for raw in record['issues']:
+                    self._merge(raw)
+                self._record_page(record)
+            elif kind == 'issue':
+                self._merge(record['issue'])
+            elif kind == 'fields':
+                self._fields = record['fields']
+            at = datetime.fromisoformat(record['at'])
+            recorded_at = at if recorded_at is None else max(recorded_at, at)
+        return recorded_at
+
+    def _record_page(self, record):
+        recorded = self._recorded.get(record['jql'])
+        if recorded is None or recorded['total'] != record['total']:
+            # A later recording of the query with other results replaces the earlier one
+            recorded = self._recorded[record['jql']] = {'total': record['total'], 'keys': {}}
+        for position, raw in enumerate(record['issues'], record['start_at']):
+            recorded['keys'][position] = raw['key']
+
+    def _recorded_page(self, jql, start_at, max_results):
+        """(page of raw issues, total) as recorded, or None if that page was not recorded."""
+        recorded = self._recorded.get(jql)
+        if recorded is None or recorded['total'] is None:
+            return None
+        positions = range(start_at, min(start_at + max_results, recorded['total']))
+        if not all(position in recorded['keys'] for position in positions):
+            return None
+        return [self._issues[recorded['keys'][position]] for position in positions], recorded['total']
+
+    def begin_report(self):
+        """Forget the locally evaluated searches, so relative JQL is evaluated anew."""
+        with self._lock:
+            self._matches.clear()
+
+    def _merge(self, raw):
+        issue = self._issues.get(raw['key'])
+        if issue is None:
+            issue = self._issues[raw['key']] = {'id': raw.get('id'), 'key': raw['key'], 'self': raw.get('self'),
+                                                'fields': {}}
+        issue['fields'].update(raw.get('fields') or {})
+        changelog = raw.get('changelog')
+        if changelog is not None and len(changelog.get('histories', ())) >= len(
+                issue.get('changelog', {}).get('histories', ())):
+            issue['changelog'] = changelog
+
+    def _shift(self, delta):
+        def shifted(value):
+            return format_jira_time(parse_jira_time(value) + delta) if value else value
+
+        for issue in self._issues.values():
+            fields = issue['fields']
+            for name in _TIME_FIELDS:
+                if name in fields:
+                    fields[name] = shifted(fields[name])
+            for history in issue.get('changelog', {}).get('histories', ()):
+                history['created'] = shifted(history.get('created'))
+
+    def _search(self, jql):
+        with self._lock:
+            hits = self._matches.get(jql)
+        if hits is None:
+            hits = JqlQuery(jql, self._custom_fields).select(self._issues.values())
+            with self._lock:
+                self._matches[jql] = hits
+        return hits
+
+    def _resource(self, issue, fields=None, expand=None):
+        raw = {'id': issue['id'], 'key': issue['key'], 'self': issue['self']}
+        if isinstance(fields, str):
+            fields = [name for name in fields.split(',') if name]
+        if not fields or '*all' in fields or '*navigable' in fields:
+            raw['fields'] = dict(issue['fields'])
+        else:
+            # Jira returns every requested field, null when it is empty
+            raw['fields'] = {name: issue['fields'].get(name) for name in fields}
+        if expand and 'changelog' in expand and 'changelog' in issue:
+            raw['changelog'] = issue['changelog']
+        return Issue(self._options, self._session, raw=raw)
+
+    def search_issues(self, jql_str, startAt=0, maxResults=50, fields=None, expand=None, **kwargs):
+        recorded = self._recorded_page(jql_str, startAt, maxResults)
+        if recorded is not None:
+            page, total = recorded
+        else:
+            hits = self._search(jql_str)
+            page, total = hits[startAt:startAt + maxResults], len(hits)
+        return ResultList(
+            [self._resource(issue, fields, expand) for issue in page],
+            startAt, maxResults, total, startAt + len(page) >= total,
+        )
+
+    def issue(self, id, fields=None, expand=None):
+        issue = self._issues.get(id)
+        if issue is None:
+            raise JIRAError(status_code=404, text=f"Issue {id} is not in the replay fixture")
+        return self._resource(issue, fields, expand)
+
+    def fields(self):
+        return list(self._fields)
+
+
+def create_jira_client(backend: str = JIRA_BACKEND):
+    """The Jira client for the configured backend: 'live', 'record' or 'replay'."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JIRA_BACKEND {backend!r} (expected one of {', '.join(BACKENDS)})")
+    if backend == 'replay':
+        if not os.path.exists(JIRA_FIXTURE_PATH):
+            raise FileNotFoundError(
+                f"No Jira fixture at {JIRA_FIXTURE_PATH} to replay; record one with JIRA_BACKEND=record "
+                f"(or set USE_JIRA_API=true / JIRA_BACKEND=live)"
+            )
+        return ReplayJira()
+    # Retries, backoff and rate limiting are the request governor's job
+    client = JIRA(
+        server=JIRA_URL,
+        basic_auth=(JIRA_EMAIL, JIRA_API_TOKEN),
+        timeout=JIRA_REQUEST_TIMEOUT,
+        max_retries=0,
+        get_server_info=False
+    )
+    govern_session(client._session, 'jira')
+    # What JIRA() does with get_server_info, but through the governed session
+    server_info = client.server_info()
+    client._version = tuple(server_info['versionNumbers'])
+    client.deploymentType = server_info.get('deploymentType')
+    if backend == 'record':
+        logger.info(f"Recording Jira responses to {JIRA_FIXTURE_PATH}")
+        return RecordingJira(client)
+    return client
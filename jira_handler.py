@@ -1,18 +1,34 @@
 import logging
-import re
-from datetime import datetime, timedelta
-from jira import JIRA
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from jira.resources import Issue
+import numpy as np
 import pandas as pd
 from config import (
-    JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN,
-    USE_JIRA_API, JIRA_PAGE_SIZE, JIRA_REQUEST_TIMEOUT,
+    JIRA_URL, JIRA_EMAIL, JIRA_BACKEND, JIRA_PAGE_SIZE,
+    JIRA_PARALLEL_PAGES, JIRA_MAX_PAGE_SIZE, JIRA_TARGET_PAGE_SECONDS,
     JIRA_PROJECT, REPORT_DAYS, JQL_TEMPLATES,
-    EXTRACTION_PATTERNS, PRIORITY_MAP, CANCELLED_KEYWORDS,
-    ENABLE_CACHING, CACHE_TTL_SECONDS, CLUSTERS, NAMESPACES,
-    ALERT_SOURCES
+    PRIORITY_MAP,
+    ENABLE_CACHING, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES,
+    ENABLE_DISK_CACHE, DISK_CACHE_DIR, DISK_CACHE_TTL_SECONDS,
+    DISK_CACHE_MAX_BYTES, DISK_CACHE_COMPRESSION, CLUSTERS, NAMESPACES,
+    ALERT_SOURCES, ENABLE_ISSUE_STORE, ISSUE_STORE_PATH,
+    ISSUE_STORE_BACKFILL_DAYS, ISSUE_STORE_SYNC_OVERLAP_MINUTES,
+    ISSUE_STORE_SYNC_INTERVAL_SECONDS, NOC_FIELD_NAME
 )
-from data_cleaning import clean_dataframe
+from data_cleaning import clean_dataframe, apply_ticket_schema, observed_counts, parse_timestamps
+from enrichment import enrich_dataframe
 from classification import classify_priorities, assign_alert_type
+from issue_store import IssueStore
+from jira_backends import create_jira_client
+from query_cache import QueryCache, make_key, normalize_jql
+from http_cache import DiskResponseCache, request_key
+from text_index import TextIndex
+import metrics
+import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -22,22 +38,101 @@ IGNORED_PRIORITY_AUTHORS = {
     "Automation for Jira",          # displayName fallback
 }
 
+# Expand changelogs inline on search pages (priority history)
+CHANGELOG_EXPAND = "changelog"
+
+# Issue fields read by _to_dataframe; every search projects to these plus the NOC field
+TICKET_FIELDS = ['summary', 'priority', 'status', 'created', 'updated', 'assignee', 'resolution']
+# Column order of ticket DataFrames (cluster, namespace and cancelled come from enrichment)
+TICKET_COLUMNS = [
+    'key', 'summary', 'priority', 'status', 'created', 'updated',
+    'cluster', 'namespace', 'assignee', 'resolution', 'cancelled',
+]
+# Extra text fields read by the local TextIndex
+TEXT_FIELDS = ['description']
+# Issue fields read by _triaged_index (the key always comes back)
+INDEX_FIELDS = ['summary', 'status', 'assignee', 'updated'] + TEXT_FIELDS
+# Projection for count-only searches: no issue fields at all
+COUNT_FIELDS = ['key']
+# Templates whose issues only feed the TextIndex: INDEX_FIELDS, no changelog
+INDEXED_TEMPLATES = {'isd_board_total'}
+
+# Assignee used to park duplicate tickets; excluded from valid alert counts
+DUPLICATES_ASSIGNEE = "oleg.kolomiets.contractor"
+
+JIRA_CALLS = metrics.counter('jira_calls_total', 'Jira API calls made by JiraHandler, by call', ('call',))
+JIRA_CALL_SECONDS = metrics.histogram('jira_call_seconds', 'Latency of JiraHandler API calls, client retries included', ('call',))
+JIRA_SEARCH_ISSUES = metrics.counter('jira_search_issues_total', 'Issues returned by Jira search pages')
+
+
+def _record_call(call, started):
+    """Count one Jira API call started at `started` (time.monotonic()); returns its duration."""
+    elapsed = time.monotonic() - started
+    JIRA_CALLS.inc(call=call)
+    JIRA_CALL_SECONDS.observe(elapsed, call=call)
+    return elapsed
+
+
+def _issue_text(issue):
+    """Searchable text of an issue (what `text ~` mostly hits: summary and description)."""
+    fields = issue.fields
+    summary = getattr(fields, 'summary', None) or ''
+    description = getattr(fields, 'description', None) or ''
+    return f"{summary}\n{description}"
+
+
+def _raw_priority(raw):
+    priority = raw.get('fields', {}).get('priority')
+    return priority.get('name') if priority else None
+
+
+# Templates the local issue store can answer without Jira: template -> raw issue filter
+STORE_TEMPLATE_FILTERS = {
+    'all_tickets': None,
+    'p1_tickets': lambda raw: _raw_priority(raw) == 'Highest',
+    'unclassified_tickets': lambda raw: _raw_priority(raw) not in (None, 'Highest', 'High', 'Medium'),
+}
+
+def _changelog_truncated(changelog) -> bool:
+    """Whether a search page returned only part of an issue's changelog (Jira caps it per issue)."""
+    total = getattr(changelog, 'total', None)
+    return total is not None and total > len(getattr(changelog, 'histories', None) or [])
+
+
 class JiraHandler:
     def __init__(self):
-        # Initialize Jira client only if API is enabled
-        if USE_JIRA_API:
-            self.jira = JIRA(
-                server=JIRA_URL,
-                basic_auth=(JIRA_EMAIL, JIRA_API_TOKEN),
-                timeout=JIRA_REQUEST_TIMEOUT
-            )
-        else:
-            self.jira = None
-            logger.warning("Jira API is disabled. Using static data only.")
-        # Simple in-memory cache
-        self._cache = {} if ENABLE_CACHING else None
+        # Live, recording or replaying Jira client (JIRA_BACKEND)
+        self.jira = create_jira_client()
+        # Count, size and time every HTTP request the client makes (retries included)
+        self.jira._session.hooks['response'].append(metrics.http_hook('jira'))
+        # Bounded LRU/TTL cache every search page goes through
+        self._query_cache = (
+            QueryCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS)
+            if ENABLE_CACHING else None
+        )
+        # Complete search results on disk, shared with the legacy subprocesses
+        # (live only: a recording must see every response, a replay needs no cache)
+        self._disk_cache = (
+            DiskResponseCache(DISK_CACHE_DIR, DISK_CACHE_TTL_SECONDS, DISK_CACHE_MAX_BYTES, DISK_CACHE_COMPRESSION)
+            if ENABLE_DISK_CACHE and JIRA_BACKEND == 'live' else None
+        )
+        if self._query_cache is not None:
+            metrics.register_cache('jira_query', self._query_cache)
+        if self._disk_cache is not None:
+            metrics.register_cache('jira_disk', self._disk_cache)
+        # Persistent issue store, synced incrementally
+        self._store = IssueStore(ISSUE_STORE_PATH) if ENABLE_ISSUE_STORE and JIRA_BACKEND != 'replay' else None
         # Priority change history
         self._priority_history = {}
+        # (signature, TextIndex) for the last triaged fetch; the lock lets
+        # concurrent report sections share one build
+        self._index_cache = None
+        self._index_lock = threading.Lock()
+        # Resolved custom field id of NOC_FIELD_NAME
+        self._noc_field = None
+        # Adaptive search page size, bounded by what the server grants
+        self._page_size = JIRA_PAGE_SIZE
+        self._max_page_size = max(JIRA_MAX_PAGE_SIZE, JIRA_PAGE_SIZE)
 
     def _track_priority_change(self, issue_key: str, new_priority: str, timestamp: datetime = None):
         """Track priority changes for a ticket."""
@@ -60,49 +155,239 @@ class JiraHandler:
 
     def _fetch_issues(self, template_key):
         """Fetch issues from Jira using JQL template with pagination."""
-        if not USE_JIRA_API:
-            logger.warning(f"Jira API is disabled. Cannot fetch issues for {template_key}")
-            return []
-
         jql_template = JQL_TEMPLATES.get(template_key)
         if not jql_template:
             raise ValueError(f"Unknown JQL template: {template_key}")
         jql = jql_template.format(project=JIRA_PROJECT, days=REPORT_DAYS)
-        # Check cache
-        if ENABLE_CACHING and template_key in self._cache:
-            timestamp, data = self._cache[template_key]
-            age = (datetime.now() - timestamp).total_seconds()
-            if age < CACHE_TTL_SECONDS:
-                logger.debug(f"Using cached data for {template_key}")
-                return data
-
-        start_at = 0
-        all_issues = []
-        while True:
-            issues = self.jira.search_issues(
-                jql_str=jql,
-                startAt=start_at,
-                maxResults=JIRA_PAGE_SIZE
-            )
-            if not issues:
-                break
-            all_issues.extend(issues)
-            if len(issues) < JIRA_PAGE_SIZE:
-                break
-            start_at += JIRA_PAGE_SIZE
-        # Cache result
-        if ENABLE_CACHING:
-            self._cache[template_key] = (datetime.now(), all_issues)
+        if self._store is not None and template_key in STORE_TEMPLATE_FILTERS:
+            all_issues = self._issues_from_store(template_key, REPORT_DAYS)
+        elif template_key in INDEXED_TEMPLATES:
+            all_issues = self._paginate(jql, INDEX_FIELDS, expand=None)
+        else:
+            all_issues = self._paginate(jql, self._search_fields())
         logger.info(f"Fetched {len(all_issues)} issues for '{template_key}'")
         return all_issues
 
-    def _extract_pattern(self, summary, key):
-        """Extract data by regex from summary using configured patterns."""
-        pattern = EXTRACTION_PATTERNS.get(key)
-        if not pattern:
-            return 'Unknown'
-        match = re.search(pattern, summary)
-        return match.group(1) if match else 'Unknown'
+    def _search_fields(self):
+        """Field projection for ticket searches."""
+        return TICKET_FIELDS + [self._noc_field_id()]
+
+    def _search_page(self, jql, start_at, max_results, expand, fields, cached=True):
+        """
+        Fetch one search page through the query cache.
+        Returns (issues, seconds taken), with None seconds when served from the cache.
+        """
+        timing = {}
+
+        def fetch():
+            call = 'count' if list(fields) == COUNT_FIELDS else 'search_page'
+            with tracing.span('jira.search_issues', call=call, start_at=start_at, max_results=max_results) as span:
+                started = time.monotonic()
+                # Changelogs come back inline with each page instead of one
+                # extra request per issue in _to_dataframe
+                issues = self.jira.search_issues(
+                    jql_str=jql,
+                    startAt=start_at,
+                    maxResults=max_results,
+                    fields=list(fields),
+                    expand=expand
+                )
+                timing['elapsed'] = _record_call(call, started)
+                JIRA_SEARCH_ISSUES.inc(len(issues))
+                span.set(issues=len(issues), total=issues.total)
+            return issues
+
+        if self._query_cache is None or not cached:
+            issues = fetch()
+        else:
+            key = make_key(jql, fields, expand, start_at, max_results)
+            issues, _ = self._query_cache.get_or_fetch(key, fetch)
+        return issues, timing.get('elapsed')
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the query cache and the disk cache (empty if caching is off)."""
+        stats = {}
+        if self._query_cache is not None:
+            stats['query'] = self._query_cache.stats()
+        if self._disk_cache is not None:
+            stats['disk'] = self._disk_cache.stats()
+        return stats
+
+    def _count(self, jql) -> int:
+        """Number of issues matching a JQL search, without transferring any fields."""
+        issues, _ = self._search_page(jql, 0, 1, None, COUNT_FIELDS)
+        return issues.total if issues.total is not None else len(issues)
+
+    def _issues_from_raw(self, raws):
+        """Rebuild Issue resources from raw JSON so callers see the same objects as from a live page."""
+        return [Issue(self.jira._options, self.jira._session, raw=raw) for raw in raws]
+
+    def _paginate(self, jql, fields, expand=CHANGELOG_EXPAND, cached=True):
+        """
+        Fetch every issue of a JQL search.
+        Complete results are read through the shared disk cache when enabled;
+        `cached=False` always goes to Jira (used by the issue store sync).
+        """
+        if self._disk_cache is None or not cached:
+            return self._crawl(jql, fields, expand, cached)
+        key = request_key(
+            server=JIRA_URL, user=JIRA_EMAIL, jql=normalize_jql(jql),
+            fields=sorted(fields), expand=expand
+        )
+        raws = self._disk_cache.get_or_fetch(
+            key, lambda: [issue.raw for issue in self._crawl(jql, fields, expand, cached)]
+        )
+        return self._issues_from_raw(raws)
+
+    def _crawl(self, jql, fields, expand, cached=True):
+        """
+        Fetch every page of a JQL search.
+        The first page reports `total`; the remaining offsets are then fetched
+        on a bounded thread pool (JIRA_PARALLEL_PAGES) and joined in offset order.
+        """
+        first, elapsed = self._search_page(jql, 0, self._page_size, expand, fields, cached)
+        if not first:
+            return []
+        # The server may grant fewer results per page than requested
+        step = min(first.maxResults or len(first), self._page_size)
+        total = first.total if first.total is not None else len(first)
+        if step < self._page_size:
+            self._max_page_size = step
+        offsets = list(range(step, total, step))
+
+        latencies = [elapsed]
+        pages = [first]
+        if offsets and JIRA_PARALLEL_PAGES > 1:
+            with ThreadPoolExecutor(max_workers=min(JIRA_PARALLEL_PAGES, len(offsets))) as pool:
+                # map() yields in submission order, so the result order is deterministic;
+                # bind() carries the trace context into the pool threads
+                fetch_page = tracing.bind(lambda off: self._search_page(jql, off, step, expand, fields, cached))
+                for issues, elapsed in pool.map(fetch_page, offsets):
+                    pages.append(issues)
+                    latencies.append(elapsed)
+        else:
+            for offset in offsets:
+                issues, elapsed = self._search_page(jql, offset, step, expand, fields, cached)
+                if not issues:
+                    break
+                pages.append(issues)
+                latencies.append(elapsed)
+        self._tune_page_size(step, latencies)
+
+        # Drop repeats caused by tickets shifting between pages mid-crawl
+        seen = set()
+        all_issues = []
+        for page in pages:
+            for issue in page:
+                if issue.key not in seen:
+                    seen.add(issue.key)
+                    all_issues.append(issue)
+        return all_issues
+
+    def _tune_page_size(self, step, latencies):
+        """Move the page size toward the server maximum while pages stay under the latency target."""
+        # Cache hits (None) say nothing about server latency
+        latencies = [latency for latency in latencies if latency is not None]
+        if not latencies:
+            return
+        slowest = max(latencies)
+        if slowest > JIRA_TARGET_PAGE_SECONDS:
+            self._page_size = max(10, step // 2)
+        elif slowest < JIRA_TARGET_PAGE_SECONDS / 2 and len(latencies) > 1:
+            self._page_size = min(self._max_page_size, step * 2)
+        else:
+            self._page_size = step
+        if self._page_size != step:
+            logger.debug(f"Jira page size {step} -> {self._page_size} (slowest page {slowest:.2f}s)")
+
+    def sync_store(self, days=REPORT_DAYS):
+        """
+        Bring the local issue store up to date.
+        - first run (or a wider window than stored): full `created >=` backfill
+        - afterwards: only issues with `updated` newer than the last watermark
+        """
+        started = datetime.now(timezone.utc)
+        needed_from = started - timedelta(days=days)
+        state = self._store.get_sync_state(JIRA_PROJECT)
+
+        if state is None or state['covered_from'] > needed_from:
+            backfill_days = max(days, ISSUE_STORE_BACKFILL_DAYS)
+            covered_from = started - timedelta(days=backfill_days)
+            jql = (
+                f'project = {JIRA_PROJECT} '
+                f'AND created >= -{backfill_days}d '
+                'ORDER BY updated ASC'
+            )
+        else:
+            age = (started - state['watermark']).total_seconds()
+            if age < ISSUE_STORE_SYNC_INTERVAL_SECONDS:
+                logger.debug(f"Issue store synced {age:.0f}s ago, skipping sync")
+                return 0
+            # Relative JQL keeps the window independent of the Jira user's timezone
+            minutes = math.ceil(age / 60) + ISSUE_STORE_SYNC_OVERLAP_MINUTES
+            covered_from = state['covered_from']
+            jql = (
+                f'project = {JIRA_PROJECT} '
+                f'AND updated >= -{minutes}m '
+                'ORDER BY updated ASC'
+            )
+
+        # Never serve a sync from a cache: the watermark advances either way
+        issues = self._paginate(jql, self._search_fields(), cached=False)
+        count = self._store.upsert(JIRA_PROJECT, [issue.raw for issue in issues])
+        self._store.set_sync_state(JIRA_PROJECT, started, covered_from)
+        logger.info(f"Issue store sync: {count} issues upserted")
+        return count
+
+    def _issues_from_store(self, template_key, days):
+        """Answer a template from the local issue store after an incremental sync."""
+        self.sync_store(days)
+        created_from = datetime.now(timezone.utc) - timedelta(days=days)
+        raws = self._store.load(JIRA_PROJECT, created_from)
+        raw_filter = STORE_TEMPLATE_FILTERS[template_key]
+        if raw_filter is not None:
+            raws = [raw for raw in raws if raw_filter(raw)]
+        return self._issues_from_raw(raws)
+
+    def _count_template(self, template_key) -> int:
+        """Number of issues matching a JQL template."""
+        jql = JQL_TEMPLATES[template_key].format(project=JIRA_PROJECT, days=REPORT_DAYS)
+        return self._count(jql)
+
+    def _fetch_changelog(self, issue_key):
+        """Fetch the changelog of a single issue (fallback when not expanded inline)."""
+        started = time.monotonic()
+        try:
+            with tracing.span('jira.issue', key=issue_key, expand=CHANGELOG_EXPAND):
+                issue_full = self.jira.issue(issue_key, fields=','.join(COUNT_FIELDS), expand=CHANGELOG_EXPAND)
+        except Exception as e:
+            logger.warning(f"Cannot expand changelog for {issue_key}: {e}")
+            return None
+        finally:
+            _record_call('changelog', started)
+        return getattr(issue_full, 'changelog', None)
+
+    def _ingest_changelog(self, issue_key, changelog):
+        """Record the priority items of a changelog, skipping bot authors."""
+        if changelog is None:
+            return
+        # The changelog is the full history: replace what an earlier fetch recorded
+        self._priority_history.pop(issue_key, None)
+        for history in getattr(changelog, 'histories', []):
+            author_id   = getattr(history.author, "accountId", None) or getattr(history.author, "key", "")
+            author_name = history.author.displayName
+
+            # Skip if the author is in the ignore-list (by id OR name)
+            if author_id in IGNORED_PRIORITY_AUTHORS or author_name in IGNORED_PRIORITY_AUTHORS:
+                continue
+
+            for item in history.items:
+                if item.field == "priority":
+                    self._track_priority_change(
+                        issue_key,
+                        f"{item.fromString}->{item.toString}",
+                        datetime.strptime(history.created[:19], "%Y-%m-%dT%H:%M:%S"),
+                    )
 
     def _to_dataframe(self, issues):
         """Convert list of Jira issues to cleaned DataFrame."""
@@ -119,36 +404,13 @@ class JiraHandler:
             resolution = fields.resolution.name if fields.resolution else ''
             
             # --- priority-change history ------------------------------------- #
-            # Pull the full issue with changelog so we can see *who* changed it
-            try:
-                issue_full = self.jira.issue(issue.key, expand="changelog")
-            except Exception as e:
-                logger.warning(f"Cannot expand changelog for {issue.key}: {e}")
-                issue_full = None
-
-            if issue_full and hasattr(issue_full, "changelog"):
-                for history in issue_full.changelog.histories:
-                    author_id   = getattr(history.author, "accountId", None) or getattr(history.author, "key", "")
-                    author_name = history.author.displayName
-
-                    # Skip if the author is in the ignore-list (by id OR name)
-                    if author_id in IGNORED_PRIORITY_AUTHORS or author_name in IGNORED_PRIORITY_AUTHORS:
-                        continue
-
-                    for item in history.items:
-                        if item.field == "priority":
-                            self._track_priority_change(
-                                issue.key,
-                                f"{item.fromString}->{item.toString}",
-                                datetime.strptime(history.created[:19], "%Y-%m-%dT%H:%M:%S"),
-                            )
-            
-            # Extraction
-            cluster = self._extract_pattern(summary, 'cluster')
-            namespace = self._extract_pattern(summary, 'namespace')
-            # Cancelled detection
-            lower_summary = summary.lower()
-            cancelled_flag = any(kw in lower_summary or kw in status.lower() for kw in CANCELLED_KEYWORDS)
+            # Use the changelog expanded inline on the search page; only issues
+            # fetched without it, or whose inline changelog was cut short, cost
+            # an extra request
+            changelog = getattr(issue, 'changelog', None)
+            if changelog is None or _changelog_truncated(changelog):
+                changelog = self._fetch_changelog(issue.key) or changelog
+            self._ingest_changelog(issue.key, changelog)
 
             records.append({
                 'key': issue.key,
@@ -157,25 +419,48 @@ class JiraHandler:
                 'status': status,
                 'created': created,
                 'updated': updated,
-                'cluster': cluster,
-                'namespace': namespace,
                 'assignee': assignee,
                 'resolution': resolution,
-                'cancelled': cancelled_flag
             })
         
-        df = pd.DataFrame(records)
+        # Enriched columns (cluster, namespace, cancelled) are filled in column-wise below
+        df = pd.DataFrame(records, columns=TICKET_COLUMNS) if records else pd.DataFrame()
         # Early return if empty
         if df.empty:
             return df
 
-        # Apply data cleaning and classification pipeline
+        # Apply enrichment, data cleaning and classification pipeline
+        df = enrich_dataframe(df)
         df = clean_dataframe(df)
         df = classify_priorities(df)
         df = assign_alert_type(df)
+        df = apply_ticket_schema(df)
         logger.debug(f"Converted {len(df)} issues to DataFrame")
         return df
 
+    def begin_report(self):
+        """Start of a report build: a replaying client re-evaluates relative JQL from here on."""
+        begin = getattr(self.jira, 'begin_report', None)
+        if begin is not None:
+            begin()
+
+    def get_window_probe(self):
+        """
+        (count, latest `updated` as a UTC Timestamp) of the report window's tickets,
+        from a one-issue search that bypasses the caches: it changes whenever a
+        ticket the report reads is created, edited or leaves the window.
+        """
+        jql = f'project = {JIRA_PROJECT} AND created >= -{REPORT_DAYS}d ORDER BY updated DESC'
+        issues, _ = self._search_page(jql, 0, 1, None, ['updated'], cached=False)
+        latest = getattr(issues[0].fields, 'updated', None) if len(issues) else None
+        if latest is not None:
+            latest = parse_timestamps(pd.Series([latest])).iloc[0]
+        return (issues.total if issues.total is not None else len(issues)), latest
+
+    def get_all_ticket_issues(self):
+        """Return the raw Issue list behind get_all_tickets (read through the caches)."""
+        return self._fetch_issues('all_tickets')
+
     def get_all_tickets(self):
         """Return DataFrame of all tickets."""
         issues = self._fetch_issues('all_tickets')
@@ -194,25 +479,23 @@ class JiraHandler:
     def get_priority_distribution(self):
         """Return Series of priority distribution counts."""
         df = self.get_all_tickets()
-        return df['priority'].value_counts()
+        return observed_counts(df['priority'])
 
     def get_cluster_distribution(self):
         """Return Series of cluster distribution counts."""
         df = self.get_all_tickets()
-        return df['cluster'].value_counts()
+        return observed_counts(df['cluster'])
 
     def get_namespace_distribution(self):
         """Return Series of namespace distribution counts."""
         df = self.get_all_tickets()
-        return df['namespace'].value_counts()
+        return observed_counts(df['namespace'])
 
     def get_initial_troubleshooting_metrics(self):
         """Returns (total, untriaged, percent_triaged)."""
-        total_issues = self._fetch_issues('isd_board_total')
-        untriaged_issues = self._fetch_issues('isd_board_untriaged')
-
-        total = len(total_issues)
-        untriaged = len(untriaged_issues)
+        # Only the totals are needed, so both are count-only searches
+        total = self._count_template('isd_board_total')
+        untriaged = self._count_template('isd_board_untriaged')
 
         # If no tasks or no untriaged - 100%
         if total == 0 or untriaged == 0:
@@ -222,136 +505,182 @@ class JiraHandler:
 
         return total, untriaged, percent
 
-    def get_cluster_alert_counts(self) -> dict[str, int]:
+    def _triaged_index(self) -> TextIndex:
         """
-        For each cluster in CLUSTERS, counts the number of tickets:
-        - using JQL template 'cluster_alerts'
-        - excluding status 'cancelled' and assignee 'oleg.kolomiets.contractor'
+        Inverted index over summary/description of triaged tickets ('isd_board_total'),
+        excluding status 'cancelled' and assignee 'oleg.kolomiets.contractor'.
+        Rebuilt only when the fetched issue list changes.
         """
-        counts: dict[str, int] = {}
-        for cluster in CLUSTERS:
-            jql = JQL_TEMPLATES['cluster_alerts'].format(
-                project=JIRA_PROJECT,
-                cluster=cluster,
-                days=REPORT_DAYS
-            )
-            issues = self.jira.search_issues(jql_str=jql)
-            df = self._to_dataframe(issues)
-            df = clean_dataframe(df)
-
-            # If empty - set 0 and continue
-            if df.empty:
-                counts[cluster] = 0
-                continue
+        with self._index_lock:
+            issues = self._fetch_issues('isd_board_total')
+            # Issues read back from the disk cache are new objects on every call,
+            # so compare what they are, not which objects they are
+            signature = tuple((issue.key, getattr(issue.fields, 'updated', None)) for issue in issues)
+            if self._index_cache is not None and self._index_cache[0] == signature:
+                return self._index_cache[1]
+
+            index = TextIndex()
+            seen = set()
+            for issue in issues:
+                if issue.key in seen:
+                    continue
+                seen.add(issue.key)
+                fields = issue.fields
+                status = fields.status.name if fields.status else 'Unknown'
+                assignee = fields.assignee.displayName if fields.assignee else 'Unassigned'
+                if status.lower() == 'cancelled' or assignee == DUPLICATES_ASSIGNEE:
+                    continue
+                index.add(issue.key, _issue_text(issue))
+            self._index_cache = (signature, index)
+            return index
 
-            # Filter out cancelled
-            if 'status' in df.columns:
-                df = df[~df['status'].str.lower().eq('cancelled')]
-            # Filter out "duplicates" by assignee
-            if 'assignee' in df.columns:
-                df = df[df['assignee'] != 'oleg.kolomiets.contractor']
+    def get_alert_term_counts(self) -> dict[str, dict[str, int]]:
+        """
+        Cluster, namespace and source counts of triaged tickets from one fetch of
+        the triaged tickets (what the three get_*_alert_counts return).
+        """
+        index = self._triaged_index()
+        try:
+            namespace_counts = index.count_terms(NAMESPACES)
+        except Exception as e:
+            logger.error(f"Error getting alerts for namespaces: {str(e)}")
+            namespace_counts = {ns: 0 for ns in NAMESPACES}
+        return {
+            'cluster_counts': index.count_terms(CLUSTERS),
+            'namespace_counts': namespace_counts,
+            'source_counts': index.count_terms(ALERT_SOURCES),
+        }
 
-            counts[cluster] = len(df)
-        return counts
+    def get_cluster_alert_counts(self) -> dict[str, int]:
+        """
+        For each cluster in CLUSTERS, counts the number of triaged tickets mentioning it
+        (same matching as JQL template 'cluster_alerts', answered from the local index).
+        """
+        return self._triaged_index().count_terms(CLUSTERS)
 
     def get_namespace_alert_counts(self) -> dict[str, int]:
         """
-        For each namespace in NAMESPACES, counts the number of tickets:
-        - using JQL template 'namespace_alerts'
-        - excluding status 'cancelled' and assignee 'oleg.kolomiets.contractor'
+        For each namespace in NAMESPACES, counts the number of triaged tickets mentioning it
+        (same matching as JQL template 'namespace_alerts', answered from the local index).
         """
-        counts: dict[str, int] = {}
-        for ns in NAMESPACES:
-            try:
-                jql = JQL_TEMPLATES['namespace_alerts'].format(
-                    project=JIRA_PROJECT,
-                    namespace=ns,
-                    days=REPORT_DAYS
-                )
-                issues = self.jira.search_issues(jql_str=jql)
-                df = self._to_dataframe(issues)
-                df = clean_dataframe(df)
-
-                if df.empty:
-                    counts[ns] = 0
-                    continue
-
-                if 'status' in df.columns:
-                    df = df[~df['status'].str.lower().eq('cancelled')]
-                if 'assignee' in df.columns:
-                    df = df[df['assignee'] != 'oleg.kolomiets.contractor']
-
-                counts[ns] = len(df)
-            except Exception as e:
-                logger.error(f"Error getting alerts for namespace {ns}: {str(e)}")
-                counts[ns] = 0  # Set count to 0 on error
-                continue
-
-        return counts
+        try:
+            return self._triaged_index().count_terms(NAMESPACES)
+        except Exception as e:
+            logger.error(f"Error getting alerts for namespaces: {str(e)}")
+            return {ns: 0 for ns in NAMESPACES}  # Set counts to 0 on error
 
     def get_source_alert_counts(self) -> dict[str, int]:
         """
-        For each term in ALERT_SOURCES counts the number of tickets:
-        - using JQL template 'text_triaged' (NOC Representative != EMPTY)
-        - excluding status 'cancelled' and assignee 'oleg.kolomiets.contractor'
+        For each term in ALERT_SOURCES counts the number of triaged tickets mentioning it
+        (same matching as JQL template 'text_triaged', answered from the local index).
         """
-        counts: dict[str, int] = {}
-        for term in ALERT_SOURCES:
-            jql = JQL_TEMPLATES['text_triaged'].format(
-                project=JIRA_PROJECT,
-                term=term,
-                days=REPORT_DAYS
-            )
-            issues = self.jira.search_issues(jql_str=jql)
-            df = self._to_dataframe(issues)
-            df = clean_dataframe(df)
+        return self._triaged_index().count_terms(ALERT_SOURCES)
+
+    def _noc_field_id(self) -> str:
+        """Resolve the custom field id of the NOC Representative field (once)."""
+        if self._noc_field is None:
+            started = time.monotonic()
+            with tracing.span('jira.fields'):
+                fields = self.jira.fields()
+            _record_call('fields', started)
+            for field in fields:
+                if field.get('name') == NOC_FIELD_NAME:
+                    self._noc_field = field['id']
+                    break
+            else:
+                raise ValueError(f"Jira field not found: {NOC_FIELD_NAME}")
+        return self._noc_field
 
-            if df.empty:
-                counts[term] = 0
-                continue
+    def _week_edges(self, weeks: int, now: datetime = None) -> pd.DatetimeIndex:
+        """Ascending week boundaries (naive UTC): now - 7*weeks days ... now."""
+        now = pd.Timestamp(now or datetime.now(timezone.utc)).tz_convert(None)
+        return pd.DatetimeIndex([now - pd.Timedelta(days=7 * k) for k in range(weeks, -1, -1)])
+
+    def _weekly_frame(self, weeks: int, now: datetime = None):
+        """
+        One fetch of every ticket created in the last `weeks` 7-day windows.
+        Returns (frame, edges, cluster_masks) where frame['week'] is the
+        ascending window index (0 = oldest) and cluster_masks maps each cluster
+        to a boolean array of tickets mentioning it.
+        """
+        edges = self._week_edges(weeks, now)
+        # Relative JQL and the edges both count back from "now", so the windows
+        # do not depend on the Jira user's timezone
+        jql = (
+            f'project = {JIRA_PROJECT} '
+            f'AND created >= -{7 * weeks}d '
+            'ORDER BY createdDate DESC'
+        )
+        noc_field = self._noc_field_id()
+        fields = ['summary', 'status', 'assignee', 'created', noc_field] + TEXT_FIELDS
+        issues = self._paginate(jql, fields, expand=None)
 
-            # Filter out cancelled
-            if 'status' in df.columns:
-                df = df[~df['status'].str.lower().eq('cancelled')]
-            # Filter out duplicates
-            if 'assignee' in df.columns:
-                df = df[df['assignee'] != 'oleg.kolomiets.contractor']
+        records = []
+        index = TextIndex()
+        for issue in issues:
+            fields = issue.fields
+            records.append({
+                'key': issue.key,
+                'created': getattr(fields, 'created', None),
+                'status': fields.status.name if fields.status else 'Unknown',
+                'assignee': fields.assignee.displayName if fields.assignee else 'Unassigned',
+                'triaged': getattr(fields, noc_field, None) is not None,
+            })
+            index.add(issue.key, _issue_text(issue))
+        frame = pd.DataFrame(records, columns=['key', 'created', 'status', 'assignee', 'triaged'])
+        frame = frame.drop_duplicates(subset=['key'], ignore_index=True)
+
+        # Bin created timestamps into the week windows
+        created = parse_timestamps(frame['created']).dt.tz_localize(None)
+        # Jira evaluates -Nd a moment after `now` (and on its own clock): tickets a
+        # few seconds past either end belong to the outermost windows, not nowhere
+        week = np.searchsorted(edges.values, created.values, side='right') - 1
+        frame['week'] = np.clip(week, 0, weeks - 1)
+
+        keys = frame['key']
+        cluster_masks = {
+            cluster: keys.isin(index.lookup(cluster)).to_numpy()
+            for cluster in CLUSTERS
+        }
+        return frame, edges, cluster_masks
+
+    def get_weekly_cluster_matrices(self, weeks: int = 5) -> dict[str, pd.DataFrame]:
+        """
+        Valid, cancelled and total triaged alerts per cluster and week, from one fetch.
+        Each DataFrame is len(CLUSTERS)×weeks, column i = i-th most recent 7-day window.
+        - valid: status != cancelled and assignee != 'oleg.kolomiets.contractor'
+        - cancelled: status = cancelled or assignee = 'oleg.kolomiets.contractor'
+        - total: every triaged ticket
+        """
+        frame, _, cluster_masks = self._weekly_frame(weeks)
+        week = frame['week'].to_numpy()
+        triaged = frame['triaged'].to_numpy()
+        status_cancelled = frame['status'].str.lower().eq('cancelled').to_numpy()
+        valid = triaged & ~status_cancelled & (frame['assignee'] != DUPLICATES_ASSIGNEE).to_numpy()
+        cancelled = triaged & (status_cancelled | frame['assignee'].str.lower().eq(DUPLICATES_ASSIGNEE).to_numpy())
 
-            counts[term] = len(df)
-        return counts
+        # Rename columns to actual week numbers
+        current_week = datetime.utcnow().isocalendar()[1]
+        columns = [f"week {current_week - i - 1}" for i in range(weeks)]
+
+        matrices = {}
+        for name, selected in (('valid', valid), ('cancelled', cancelled), ('total', triaged)):
+            rows = {
+                # bincount is oldest-first; columns are most-recent-first
+                cluster: np.bincount(week[selected & mask], minlength=weeks)[::-1]
+                for cluster, mask in cluster_masks.items()
+            }
+            matrices[name] = pd.DataFrame.from_dict(rows, orient='index', columns=columns)
+        return matrices
 
     def get_weekly_trend(self, weeks=5):
         """Return DataFrame with weekly ticket counts for last n weeks."""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(weeks=weeks)
-        trend = []
-        current = start_date
-        while current < end_date:
-            week_end = current + timedelta(days=7)
-            # Create temporary JQL for trend
-            jql = (
-                f"project = {JIRA_PROJECT} "
-                f"AND created >= \"{current.strftime('%Y-%m-%d')}\" "
-                f"AND created < \"{week_end.strftime('%Y-%m-%d')}\""
-            )
-            # Use pagination to get all issues
-            start_at = 0
-            all_issues = []
-            while True:
-                issues = self.jira.search_issues(
-                    jql_str=jql,
-                    startAt=start_at,
-                    maxResults=JIRA_PAGE_SIZE
-                )
-                if not issues:
-                    break
-                all_issues.extend(issues)
-                if len(issues) < JIRA_PAGE_SIZE:
-                    break
-                start_at += JIRA_PAGE_SIZE
-            trend.append({'week': current.strftime('%Y-%m-%d'), 'count': len(all_issues)})
-            current = week_end
-        df = pd.DataFrame(trend)
+        frame, edges, _ = self._weekly_frame(weeks)
+        counts = np.bincount(frame['week'].to_numpy(), minlength=weeks)
+        df = pd.DataFrame({
+            'week': [edge.strftime('%Y-%m-%d') for edge in edges[:-1]],
+            'count': counts,
+        })
         logger.info("Generated weekly trend data")
         return df
 
@@ -362,48 +691,7 @@ class JiraHandler:
         Week 0: created >= 0-7d ago, week 1: 7-14d ago, etc.
         Only includes tickets where NOC Representative is set (triaged).
         """
-        # Initialize container
-        data = {cluster: [] for cluster in CLUSTERS}
-        
-        # For each week from 0 to weeks-1
-        for i in range(weeks):
-            end = datetime.utcnow() - timedelta(days=7*i)
-            start = end - timedelta(days=7)
-            start_str = start.strftime('%Y-%m-%d')
-            end_str = end.strftime('%Y-%m-%d')
-
-            # For each cluster
-            for cluster in CLUSTERS:
-                jql = (
-                    f'project = {JIRA_PROJECT} '
-                    f'AND text ~ "{cluster}" '
-                    f'AND "NOC Representative[User Picker (single user)]" != EMPTY '
-                    f'AND created >= "{start_str}" '
-                    f'AND created < "{end_str}" '
-                    f'ORDER BY createdDate DESC'
-                )
-                issues = self.jira.search_issues(jql_str=jql, maxResults=JIRA_PAGE_SIZE)
-                df = self._to_dataframe(issues)
-                df = clean_dataframe(df)
-
-                # Apply filters
-                if not df.empty:
-                    if 'status' in df.columns:
-                        df = df[~df['status'].str.lower().eq('cancelled')]
-                    if 'assignee' in df.columns:
-                        df = df[df['assignee'] != 'oleg.kolomiets.contractor']
-                count = len(df) if not df.empty else 0
-                data[cluster].append(count)
-
-        # Create DataFrame with weeks as columns
-        cols = [f'week {-i}' for i in range(weeks-1, -1, -1)]
-        df = pd.DataFrame(data, index=cols).T  # transpose: now index=clusters, cols=weeks
-        
-        # Rename columns to actual week numbers
-        current_week = datetime.utcnow().isocalendar()[1]
-        df.columns = [f"week {current_week - i - 1}" for i in range(weeks)]
-        
-        return df
+        return self.get_weekly_cluster_matrices(weeks)['valid']
 
     def get_weekly_canceled_alerts_by_cluster(self, weeks: int = 5) -> pd.DataFrame:
         """
@@ -412,46 +700,4 @@ class JiraHandler:
           - triaged (NOC != EMPTY)
           - for each of the last `weeks` 7-day intervals.
         """
-        data = {cluster: [] for cluster in CLUSTERS}
-        now = datetime.utcnow()
-
-        for i in range(weeks):
-            end = now - timedelta(days=7 * i)
-            start = end - timedelta(days=7)
-            start_str = start.strftime('%Y-%m-%d')
-            end_str = end.strftime('%Y-%m-%d')
-
-            for cluster in CLUSTERS:
-                # Triaged = NOC != EMPTY
-                jql = (
-                    f'project = {JIRA_PROJECT} '
-                    f'AND text ~ "{cluster}" '
-                    f'AND "NOC Representative[User Picker (single user)]" != EMPTY '
-                    f'AND created >= "{start_str}" '
-                    f'AND created < "{end_str}" '
-                    'ORDER BY createdDate DESC'
-                )
-                issues = self.jira.search_issues(jql_str=jql, maxResults=JIRA_PAGE_SIZE)
-                df = self._to_dataframe(issues)
-                df = clean_dataframe(df)
-
-                if df.empty:
-                    data[cluster].append(0)
-                    continue
-
-                # Keep only cancelled OR assigned to Oleg
-                mask_cancelled = df['status'].str.lower().eq('cancelled')
-                mask_oleg = df['assignee'].str.lower() == 'oleg.kolomiets.contractor'
-                df_canceled = df[mask_cancelled | mask_oleg]
-
-                data[cluster].append(len(df_canceled))
-
-        # Create DataFrame, similar to valid alerts
-        cols = [f'week {-i}' for i in range(weeks - 1, -1, -1)]
-        df = pd.DataFrame(data, index=cols).T
-        
-        # Rename columns to actual week numbers
-        current_week = datetime.utcnow().isocalendar()[1]
-        df.columns = [f"week {current_week - i - 1}" for i in range(weeks)]
-        
-        return df
+        return self.get_weekly_cluster_matrices(weeks)['cancelled']
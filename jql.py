@@ -0,0 +1,231 @@
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+_TOKEN = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|(!=|>=|<=|!~|[=<>~(),])|([^\s"=<>~!(),]+))')
+_RELATIVE = re.compile(r'^-(\d+)([mhdw])$')
+_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+_DATE_FIELDS = {'created': 'created', 'createddate': 'created', 'updated': 'updated', 'updateddate': 'updated'}
+_WORDS = re.compile(r'[a-z0-9]+')
+
+JIRA_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+
+
+@lru_cache(maxsize=200_000)
+def parse_jira_time(value: str) -> datetime:
+    """Parse a Jira timestamp ('2024-05-01T10:00:00.000+0000') into an aware datetime."""
+    return datetime.strptime(value, JIRA_TIME_FORMAT)
+
+
+def format_jira_time(value: datetime) -> str:
+    """Inverse of parse_jira_time (millisecond precision, numeric UTC offset)."""
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f'{value.microsecond // 1000:03d}' + value.strftime('%z')
+
+
+def _tokenize(jql):
+    tokens, position = [], 0
+    jql = jql.strip()
+    while position < len(jql):
+        match = _TOKEN.match(jql, position)
+        if match is None:
+            raise ValueError(f"Cannot parse JQL at: {jql[position:]!r}")
+        quoted, symbol, word = match.groups()
+        tokens.append(('str', quoted) if quoted is not None else ('sym', symbol) if symbol else ('word', word))
+        position = match.end()
+    return tokens
+
+
+def _timestamp(value, now):
+    relative = _RELATIVE.match(value)
+    if relative:
+        return now - timedelta(**{_UNITS[relative.group(2)]: int(relative.group(1))})
+    return datetime.strptime(value[:16], '%Y-%m-%d %H:%M' if len(value) > 10 else '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+
+def _sort_time(value):
+    return parse_jira_time(value) if value else datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _phrase_in(phrase, text):
+    # Jira's text search: the phrase's words appear next to each other, case-insensitive
+    needle = _WORDS.findall(phrase.lower())
+    words = _WORDS.findall((text or '').lower())
+    return bool(needle) and any(words[i:i + len(needle)] == needle for i in range(len(words) - len(needle) + 1))
+
+
+class JqlQuery:
+    """
+    Evaluates the subset of JQL the bot sends against raw issue JSON:
+    AND/OR/NOT/parentheses over =, !=, ~, !~, <, <=, >, >=, IN, NOT IN and
+    IS [NOT] EMPTY on project, key, created, updated, priority, status,
+    resolution, type, assignee, summary, description, text and custom fields
+    (by name), plus ORDER BY created/updated/key.
+    Relative dates (-7d, -90m) count back from `now`.
+    """
+
+    def __init__(self, jql: str, custom_fields: dict = None, now: datetime = None):
+        self.jql = jql
+        # custom field name -> id (the "Name[Type]" clause syntax is reduced to the name)
+        self.custom_fields = {name.lower(): field_id for name, field_id in (custom_fields or {}).items()}
+        self.now = now or datetime.now(timezone.utc)
+        self._tokens = _tokenize(jql)
+        self._position = 0
+        self.order_by = []
+        self.predicate = self._parse_query()
+
+    # parsing
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self._position += 1
+        return token
+
+    def _keyword(self, *words):
+        kind, value = self._peek()
+        return kind == 'word' and value.upper() in words
+
+    def _parse_query(self):
+        predicate = (lambda issue: True) if self._keyword('ORDER') else self._parse_or()
+        if self._keyword('ORDER'):
+            self._next()
+            self._next()  # BY
+            while True:
+                field = self._next()[1].lower()
+                descending = False
+                if self._keyword('ASC', 'DESC'):
+                    descending = self._next()[1].upper() == 'DESC'
+                self.order_by.append((_DATE_FIELDS.get(field, field), descending))
+                if self._peek() != ('sym', ','):
+                    break
+                self._next()
+        if self._peek()[0] is not None:
+            raise ValueError(f"Unexpected JQL token {self._peek()[1]!r} in {self.jql!r}")
+        return predicate
+
+    def _parse_or(self):
+        terms = [self._parse_and()]
+        while self._keyword('OR'):
+            self._next()
+            terms.append(self._parse_and())
+        return terms[0] if len(terms) == 1 else (lambda issue: any(term(issue) for term in terms))
+
+    def _parse_and(self):
+        terms = [self._parse_not()]
+        while self._keyword('AND'):
+            self._next()
+            terms.append(self._parse_not())
+        return terms[0] if len(terms) == 1 else (lambda issue: all(term(issue) for term in terms))
+
+    def _parse_not(self):
+        if self._keyword('NOT'):
+            self._next()
+            term = self._parse_not()
+            return lambda issue: not term(issue)
+        if self._peek() == ('sym', '('):
+            self._next()
+            term = self._parse_or()
+            self._next()  # )
+            return term
+        return self._parse_clause()
+
+    def _values(self):
+        self._next()  # (
+        values = []
+        while self._peek() != ('sym', ')'):
+            kind, value = self._next()
+            if kind != 'sym':
+                values.append(value)
+        self._next()
+        return values
+
+    def _parse_clause(self):
+        field = re.sub(r'\[.*\]$', '', self._next()[1]).strip().lower()
+        if self._keyword('IS'):
+            self._next()
+            negate = self._keyword('NOT')
+            if negate:
+                self._next()
+            self._next()  # EMPTY
+            get = self._getter(field)
+            return (lambda issue: get(issue) is not None) if negate else (lambda issue: get(issue) is None)
+        if self._keyword('NOT', 'IN'):
+            negate = self._next()[1].upper() == 'NOT'
+            if negate:
+                self._next()  # IN
+            values = {value.lower() for value in self._values()}
+            get = self._getter(field)
+            if negate:
+                # Like Jira, NOT IN never matches an empty field
+                return lambda issue: get(issue) is not None and get(issue).lower() not in values
+            return lambda issue: get(issue) is not None and get(issue).lower() in values
+        operator = self._next()[1]
+        kind, value = self._next()
+        if kind == 'word' and value.upper() == 'EMPTY':
+            get = self._getter(field)
+            return (lambda issue: get(issue) is None) if operator == '=' else (lambda issue: get(issue) is not None)
+        if field in _DATE_FIELDS:
+            return self._date_clause(_DATE_FIELDS[field], operator, _timestamp(value, self.now))
+        if operator in ('~', '!~'):
+            getters = [self._getter(name) for name in (['summary', 'description'] if field == 'text' else [field])]
+            matches = lambda issue: any(_phrase_in(value, get(issue)) for get in getters)
+            return matches if operator == '~' else (lambda issue: not matches(issue))
+        get = self._getter(field)
+        if operator == '=':
+            return lambda issue: (get(issue) or '').lower() == value.lower()
+        if operator == '!=':
+            return lambda issue: get(issue) is not None and get(issue).lower() != value.lower()
+        raise ValueError(f"Unsupported JQL operator {operator!r} for {field!r}")
+
+    def _date_clause(self, field, operator, bound):
+        compare = {
+            '>=': lambda when: when >= bound, '>': lambda when: when > bound,
+            '<=': lambda when: when <= bound, '<': lambda when: when < bound,
+            '=': lambda when: when == bound,
+        }[operator]
+
+        def clause(issue):
+            value = issue['fields'].get(field)
+            return value is not None and compare(parse_jira_time(value))
+        return clause
+
+    def _getter(self, field):
+        if field == 'project':
+            return lambda issue: issue['key'].split('-')[0]
+        if field in ('key', 'issuekey'):
+            return lambda issue: issue['key']
+        if field in ('summary', 'description'):
+            return lambda issue: issue['fields'].get(field)
+        if field in ('priority', 'status', 'resolution', 'type', 'issuetype'):
+            name = 'issuetype' if field == 'type' else field
+            return lambda issue: (issue['fields'].get(name) or {}).get('name')
+        if field == 'assignee':
+            return lambda issue: (issue['fields'].get('assignee') or {}).get('displayName')
+        field_id = self.custom_fields.get(field)
+        if field_id is None:
+            raise ValueError(f"Unknown JQL field {field!r}")
+
+        def custom(issue):
+            value = issue['fields'].get(field_id)
+            return value.get('displayName') or value.get('value') or value.get('name') if isinstance(value, dict) else value
+        return custom
+
+    # evaluation
+
+    def matches(self, issue: dict) -> bool:
+        return self.predicate(issue)
+
+    def sort(self, issues: list) -> list:
+        """Sort raw issues in place by the ORDER BY clause; returns them."""
+        for field, descending in reversed(self.order_by):
+            if field in ('created', 'updated'):
+                issues.sort(key=lambda issue: _sort_time(issue['fields'].get(field)), reverse=descending)
+            elif field in ('key', 'issuekey'):
+                issues.sort(key=lambda issue: int(issue['key'].split('-')[1]), reverse=descending)
+        return issues
+
+    def select(self, issues) -> list:
+        """The issues matching the query, in result order."""
+        return self.sort([issue for issue in issues if self.matches(issue)])
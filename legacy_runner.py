@@ -2,19 +2,74 @@ import shutil
 import subprocess
 import os
 import sys
-from config import LEGACY_DIR, LEGACY_ART_DIR
+import pandas as pd
+from config import LEGACY_DIR, LEGACY_ART_DIR, LEGACY_IN_PROCESS, PRIORITY_MAP
+from chart_service import ChartSpec, get_chart_service
+import tracing
 
-def run_legacy():
+def to_legacy_frame(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Runs the legacy report generation process:
+    Adapt a JiraHandler ticket DataFrame to the shape data_loader.py dumps
+    ('Issue key', 'Summary', 'Status', 'Priority', 'Assignee', 'Created', 'Updated').
+    Priorities are mapped back to Jira names (P1 -> Highest) as the legacy code expects.
+    """
+    raw_priority = {normalized: raw for raw, normalized in PRIORITY_MAP.items()}
+    # An empty window may come without any columns
+    df = df.reindex(columns=['key', 'summary', 'status', 'priority', 'assignee', 'created', 'updated'])
+    priority = df['priority'].astype(str)
+    return pd.DataFrame({
+        'Issue key': df['key'].astype(str),
+        'Summary': df['summary'].astype(str),
+        'Status': df['status'].astype(str),
+        'Priority': priority.map(raw_priority).fillna(priority),
+        'Assignee': df['assignee'].astype(str),
+        'Created': df['created'],
+        'Updated': df['updated'],
+    })
+
+def run_legacy_inprocess(df: pd.DataFrame, art_dir: str = LEGACY_ART_DIR) -> str:
+    """
+    Generates the legacy visualizations from an already-fetched ticket DataFrame,
+    without the data_loader crawl, the dump.json round trip or new interpreters.
+    """
+    from script_old import main as legacy
+
+    # Clean old artifacts
+    if os.path.exists(art_dir):
+        shutil.rmtree(art_dir)
+    os.makedirs(art_dir, exist_ok=True)
+
+    # Same steps as script_old/main.py main(), minus the JSON load
+    legacy_df = legacy.align_columns(to_legacy_frame(df))
+    legacy_df = legacy.clean_data(legacy_df)
+    legacy_df = legacy.classify_alerts(legacy_df)
+    legacy_df = legacy.define_priority(legacy_df)
+    # Render the charts in parallel through the chart service
+    specs = [
+        ChartSpec('legacy', filename, legacy_df, {'plot': plot})
+        for filename, plot in legacy.LEGACY_CHARTS.items()
+    ]
+    get_chart_service().render(specs, art_dir)
+    return art_dir
+
+def run_legacy(df: pd.DataFrame = None, out_dir: str = LEGACY_DIR):
+    """
+    Runs the legacy report generation process into out_dir (artifacts in
+    out_dir/artifacts, whose path is returned).
+    With a ticket DataFrame, even an empty one (and LEGACY_IN_PROCESS on), the
+    charts are built in-process from it; otherwise:
     1. Cleans old artifacts
     2. Dumps Jira data using data_loader.py
     3. Generates legacy visualizations using legacy_report.py
     """
+    art_dir = os.path.join(out_dir, 'artifacts')
+    if df is not None and LEGACY_IN_PROCESS:
+        return run_legacy_inprocess(df, art_dir)
+
     # 1) Clean old artifacts
-    if os.path.exists(LEGACY_DIR):
-        shutil.rmtree(LEGACY_DIR)
-    os.makedirs(LEGACY_ART_DIR, exist_ok=True)
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(art_dir, exist_ok=True)
 
     # Get the directory containing this script and the script_old directory
     base = os.path.dirname(__file__)
@@ -25,22 +80,25 @@ def run_legacy():
     if not os.path.exists(loader):
         raise FileNotFoundError(f"Legacy data loader not found: {loader}")
     
-    subprocess.run([
-        sys.executable,
-        loader,
-        '--out', os.path.join(LEGACY_DIR, 'dump.json')
-    ], check=True)
+    # Each subprocess is a span; TRACEPARENT lets it add its own spans under it
+    with tracing.span('legacy.data_loader'):
+        subprocess.run([
+            sys.executable,
+            loader,
+            '--out', os.path.join(out_dir, 'dump.json')
+        ], check=True, env=tracing.subprocess_env())
 
     # 3) Run legacy report generator
     report = os.path.join(script_old_dir, 'main.py')  # Using main.py as the report generator
     if not os.path.exists(report):
         raise FileNotFoundError(f"Legacy report generator not found: {report}")
     
-    subprocess.run([
-        sys.executable,
-        report,
-        '--dump', os.path.join(LEGACY_DIR, 'dump.json'),
-        '--outdir', LEGACY_ART_DIR
-    ], check=True)
-
-    return LEGACY_ART_DIR 
\ No newline at end of file
+    with tracing.span('legacy.report'):
+        subprocess.run([
+            sys.executable,
+            report,
+            '--dump', os.path.join(out_dir, 'dump.json'),
+            '--outdir', art_dir
+        ], check=True, env=tracing.subprocess_env())
+
+    return art_dir 
\ No newline at end of file
@@ -5,10 +5,17 @@ from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from slack_sdk.errors import SlackApiError
 
-from config import SLACK_BOT_TOKEN, SLACK_APP_TOKEN, ALLOWED_USER_IDS
+from config import (
+    SLACK_BOT_TOKEN, SLACK_APP_TOKEN, ALLOWED_USER_IDS, JIRA_PROJECT, REPORT_DAYS,
+    METRICS_PORT, METRICS_FILE, METRICS_RUN_LOG, ENABLE_REPORT_REUSE
+)
 from jira_handler import JiraHandler
 from report_generator import ReportGenerator
 from legacy_runner import run_legacy
+from report_snapshot import ReportSnapshot
+from report_jobs import ReportQueue
+import metrics
+import tracing
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,74 +28,132 @@ app = App(token=SLACK_BOT_TOKEN)
 jira_handler = JiraHandler()
 report_generator = ReportGenerator()
 
+# Stage names posted to Slack while a report is built
+STAGE_MESSAGES = {
+    'started': "🔄 Report generation started, this may take a few minutes...",
+    'fetching': "📥 Fetching Jira and Confluence data...",
+    'legacy': "📊 Drawing the legacy charts...",
+    'pdf': "📄 Building the PDF...",
+}
+
+
+def build_report(job):
+    """Build one queued report (runs on a report queue thread); returns the PDF path."""
+    run = metrics.RunSummary.begin('jira-report')
+    try:
+        jira_handler.begin_report()
+        # Return the stored PDF if a probe of the inputs shows nothing changed
+        if ENABLE_REPORT_REUSE:
+            with metrics.timed_stage('fingerprint'):
+                probe = report_generator.probe_inputs(jira_handler)
+            reused = report_generator.stored_report(probe)
+            if reused:
+                return reused
+        else:
+            probe = None
+
+        # Fetch once; the legacy charts and the report both work from this snapshot
+        job.progress('fetching')
+        with metrics.timed_stage('fetch'):
+            snapshot = ReportSnapshot.capture(jira_handler, report_generator.conf_handler)
+
+        # 0) Run legacy generators, into this job's own directory
+        job.progress('legacy')
+        with metrics.timed_stage('legacy'):
+            legacy_art_dir = run_legacy(snapshot.tickets, os.path.join(job.workdir, 'legacy_output'))
+        legacy_dir = os.path.dirname(legacy_art_dir)  # Get parent directory
+
+        # Generate the report
+        job.progress('pdf')
+        with metrics.timed_stage('report'):
+            return report_generator.generate_report(
+                jira_handler, legacy_dir, snapshot=snapshot, chart_dir=os.path.join(job.workdir, 'charts'),
+                probe=probe, build_dir=job.workdir
+            )
+    finally:
+        run.finish(METRICS_RUN_LOG, job=job.id, params=job.params)
+        if METRICS_FILE:
+            metrics.registry.write(METRICS_FILE)
+
+
+report_queue = ReportQueue(build_report)
+
+
+def _notify(client, channel_id, user_id, text):
+    try:
+        client.chat_postEphemeral(channel=channel_id, user=user_id, text=text)
+    except SlackApiError as e:
+        logger.warning(f"Failed to send notification: {e.response['error']}")
+
+
 @app.command("/jira-report")
 def handle_jira_report(ack, body, client):
-    """Handle the /jira-report command."""
-    # Acknowledge the command immediately
-    ack()
-
+    """Handle the /jira-report command: queue the report and reply with progress."""
     user_id = body.get('user_id')
     channel_id = body.get('channel_id')
 
+    # One trace per request, from the ack to the upload (finished in on_done)
+    trace = tracing.start_trace('/jira-report', user=user_id, channel=channel_id)
+
+    # Acknowledge the command immediately
+    with tracing.activate(trace), tracing.span('ack'):
+        ack()
+
     # Access control: only allow specific users
     if ALLOWED_USER_IDS and user_id not in ALLOWED_USER_IDS:
-        try:
-            client.chat_postEphemeral(
-                channel=channel_id,
-                user=user_id,
-                text="❌ You are not authorized to run this command."
-            )
-        except SlackApiError as e:
-            logger.warning(f"Failed to send unauthorized notification: {e.response['error']}")
+        _notify(client, channel_id, user_id, "❌ You are not authorized to run this command.")
+        tracing.finish_trace(trace)
         return
 
-    # Notify user that the report generation has started
-    try:
-        client.chat_postEphemeral(
-            channel=channel_id,
-            user=user_id,
-            text="🔄 Report generation started, this may take a few minutes..."
-        )
-    except SlackApiError as e:
-        logger.warning(f"Failed to send start notification: {e.response['error']}")
+    # Prepare the title with week number
+    week_number = datetime.now().isocalendar()[1] - 1
+    title = f"Jira Report – Week {week_number}"
 
-    try:
-        # 0) Run legacy generators
-        legacy_art_dir = run_legacy()
-        legacy_dir = os.path.dirname(legacy_art_dir)  # Get parent directory
+    def on_progress(job, stage):
+        if stage in STAGE_MESSAGES:
+            _notify(client, channel_id, user_id, STAGE_MESSAGES[stage])
 
-        # Generate the report (blocking)
-        report_path = report_generator.generate_report(jira_handler, legacy_dir)
-
-        # Prepare the title with week number
-        week_number = datetime.now().isocalendar()[1] - 1
-        title = f"Jira Report – Week {week_number}"
-
-        # Upload the report file to Slack
-        client.files_upload(
-            channels=channel_id,
-            file=report_path,
-            title=title,
-            initial_comment="✅ Report is ready and sent!"
-        )
-        logger.info(f"Report uploaded: {report_path}")
-
-    except Exception as e:
-        # Log exception
-        logger.exception("Error generating or uploading report")
-        # Notify user about the error
+    def on_done(job):
+        if job.error is not None:
+            # Notify user about the error
+            _notify(client, channel_id, user_id, f"❌ Error generating report: {job.error}")
+            tracing.finish_trace(trace)
+            return
         try:
-            client.chat_postEphemeral(
-                channel=channel_id,
-                user=user_id,
-                text=f"❌ Error generating report: {e}"
-            )
-        except SlackApiError:
-            logger.error("Failed to send error notification to user")
+            # Upload the report file to Slack
+            with tracing.activate(trace), metrics.timed_stage('upload'):
+                client.files_upload(
+                    channels=channel_id,
+                    file=job.result,
+                    title=title,
+                    initial_comment=f"✅ <@{user_id}> Report is ready and sent!"
+                )
+            logger.info(f"Report uploaded: {job.result}")
+        except Exception as e:
+            logger.exception("Error uploading report")
+            _notify(client, channel_id, user_id, f"❌ Error uploading report: {e}")
+        finally:
+            tracing.finish_trace(trace)
+
+    # Same week and parameters: join the build that is already queued or running
+    params = {'week': week_number, 'project': JIRA_PROJECT, 'days': REPORT_DAYS}
+    # The job traces its build under this request's span
+    with tracing.activate(trace):
+        job, position, joined = report_queue.submit(params, on_progress, on_done)
+    if trace is not None:
+        trace.set(job=job.id, joined=joined)
+    if joined:
+        _notify(client, channel_id, user_id,
+                f"🔁 This report is already being prepared ({job.stage}); you'll get it when it's ready.")
+    elif position:
+        _notify(client, channel_id, user_id,
+                f"⏳ Report queued: {position} report(s) ahead of yours.")
 
 
 def main():
     """Start the Slack bot in Socket Mode."""
+    if METRICS_PORT:
+        metrics.start_metrics_server(METRICS_PORT)
     handler = SocketModeHandler(app, SLACK_APP_TOKEN)
     handler.start()
 
@@ -0,0 +1,34 @@
+import ctypes
+import os
+
+
+def rss_bytes() -> int:
+    """Resident set size of the current process."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak RSS, KiB on Linux
+
+
+def _load_malloc_trim():
+    try:
+        return ctypes.CDLL(None).malloc_trim
+    except (OSError, AttributeError):
+        return None  # not glibc
+
+
+_malloc_trim = _load_malloc_trim()
+
+
+def release_memory():
+    """
+    Return freed heap memory to the OS.
+
+    glibc keeps memory freed by large, short-lived allocations (chart rasters,
+    PDF images, ticket frames) in its arenas, so a long-running process's RSS
+    ratchets up to its largest report. No-op where malloc_trim is unavailable.
+    """
+    if _malloc_trim is not None:
+        _malloc_trim(0)
@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds: fast cache reads up to multi-minute report sections
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Counter:
+    """Monotonic counter, one value per label combination."""
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """(series name, label text, value) for every label combination seen."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _label_text(self.labels, key), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics), one per label combination."""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label key -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labels)
+        with self._lock:
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                yield f'{self.name}_bucket', _label_text(self.labels + ('le',), key + (f'{bound:g}',)), count
+            yield f'{self.name}_bucket', _label_text(self.labels + ('le',), key + ('+Inf',)), series[-2]
+            yield f'{self.name}_count', _label_text(self.labels, key), series[-2]
+            yield f'{self.name}_sum', _label_text(self.labels, key), series[-1]
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics: counters and histograms created by the instrumented
+    modules, plus the hit/miss counters of registered caches (read from their
+    stats() when the metrics are collected).
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            return metric
+
+    def counter(self, name: str, help_text: str, labels=()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def register_cache(self, name: str, cache):
+        """Export a cache's stats() counters (hits, misses, evictions, ...) under `name`."""
+        with self._lock:
+            self._caches[name] = cache
+
+    def _cache_samples(self):
+        with self._lock:
+            caches = sorted(self._caches.items())
+        for cache_name, cache in caches:
+            for stat, value in sorted(cache.stats().items()):
+                if isinstance(value, (int, float)):
+                    yield stat, _label_text(('cache',), (cache_name,)), value
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(f'{name}{labels} {value:g}' for name, labels, value in metric.samples())
+        by_stat = {}
+        for stat, labels, value in self._cache_samples():
+            by_stat.setdefault(stat, []).append((labels, value))
+        for stat, values in sorted(by_stat.items()):
+            lines.append(f'# HELP cache_{stat} Cache {stat} (from the cache\'s own counters)')
+            lines.append(f'# TYPE cache_{stat} gauge')
+            lines.extend(f'cache_{stat}{labels} {value:g}' for labels, value in values)
+        return '\n'.join(lines) + '\n'
+
+    def totals(self) -> dict:
+        """Current value of every counter series, histogram count/sum and cache stat."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        totals = {}
+        for metric in metrics:
+            for name, labels, value in metric.samples():
+                if not name.endswith('_bucket'):
+                    totals[name + labels] = value
+        for stat, labels, value in self._cache_samples():
+            totals[f'cache_{stat}{labels}'] = value
+        return totals
+
+    def write(self, path: str):
+        """Write the exposition to a file atomically (e.g. for node_exporter's textfile collector)."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            handle.write(self.render())
+        os.replace(tmp_path, path)
+
+
+registry = MetricsRegistry()
+counter = registry.counter
+histogram = registry.histogram
+register_cache = registry.register_cache
+
+# --- HTTP calls (Jira / Confluence) -------------------------------------------- #
+
+HTTP_REQUESTS = counter('http_requests_total', 'HTTP requests to Atlassian, by service, endpoint and status',
+                        ('service', 'endpoint', 'status'))
+HTTP_RESPONSE_BYTES = counter('http_response_bytes_total', 'Response body bytes received', ('service', 'endpoint'))
+HTTP_REQUEST_SECONDS = histogram('http_request_seconds', 'HTTP request latency', ('service', 'endpoint'))
+HTTP_RETRIES = counter('http_retries_total', 'Requests retried by the request governor (throttled, failed or dropped)',
+                       ('service', 'endpoint'))
+
+# Issue keys and numeric ids in URL paths, collapsed so endpoints stay low-cardinality
+_PATH_IDS = [(re.compile(r'/[A-Z][A-Z0-9_]+-\d+(?=/|$)'), '/{key}'), (re.compile(r'/\d+(?=/|$)'), '/{id}')]
+
+
+def endpoint_of(url: str) -> str:
+    """Low-cardinality endpoint name of a request URL ('/rest/api/2/issue/{key}')."""
+    path = urlsplit(url).path.rstrip('/') or '/'
+    for pattern, replacement in _PATH_IDS:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+def http_hook(service: str):
+    """requests response hook recording count, bytes and latency of each call (retried attempts included)."""
+    def record(response, *args, **kwargs):
+        endpoint = endpoint_of(response.url)
+        HTTP_REQUESTS.inc(service=service, endpoint=endpoint, status=response.status_code)
+        length = response.headers.get('Content-Length')
+        HTTP_RESPONSE_BYTES.inc(int(length) if length else len(response.content), service=service, endpoint=endpoint)
+        HTTP_REQUEST_SECONDS.observe(response.elapsed.total_seconds(), service=service, endpoint=endpoint)
+        return response
+    return record
+
+# --- Report stages --------------------------------------------------------------- #
+
+STAGE_SECONDS = histogram('report_stage_seconds', 'Wall time of a report stage', ('stage',))
+STAGE_CPU_SECONDS = histogram('report_stage_cpu_seconds', 'CPU time of the thread running a report stage', ('stage',))
+
+
+@contextmanager
+def timed_stage(stage: str):
+    """Record the wall and (calling-thread) CPU time of a report stage or section, and trace it as a span."""
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        with tracing.span(stage):
+            yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - wall, stage=stage)
+        STAGE_CPU_SECONDS.observe(time.thread_time() - cpu, stage=stage)
+
+
+class RunSummary:
+    """
+    What one report run added to every counter: begin() before the run,
+    finish() after it. Runs that overlap (several report workers) see each
+    other's calls.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._before = registry.totals()
+
+    @classmethod
+    def begin(cls, name: str = 'report') -> 'RunSummary':
+        return cls(name)
+
+    def finish(self, path: str = None, **fields) -> dict:
+        """Compute the deltas, log a one-line summary and append the record to `path` (JSON lines)."""
+        after = registry.totals()
+        deltas = {
+            series: round(value - self._before.get(series, 0), 6)
+            for series, value in sorted(after.items())
+            if value != self._before.get(series, 0)
+        }
+        record = {
+            'run': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self._started, 3),
+            **fields,
+            'counters': deltas,
+        }
+        logger.info(f"Run summary ({self.name}): {self.headline(deltas)}")
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'a') as handle:
+                handle.write(json.dumps(record, default=str) + '\n')
+        return record
+
+    @staticmethod
+    def headline(deltas: dict) -> str:
+        """'1950 HTTP calls: 1800 /rest/api/2/issue/{key}, 150 /rest/api/2/search; ...'"""
+        calls = {}
+        for series, value in deltas.items():
+            if series.startswith('http_requests_total{'):
+                endpoint = re.search(r'endpoint="([^"]*)"', series).group(1)
+                calls[endpoint] = calls.get(endpoint, 0) + value
+        parts = [f"{int(sum(calls.values()))} HTTP calls"]
+        if calls:
+            parts[0] += ': ' + ', '.join(
+                f"{int(count)} {endpoint}" for endpoint, count in sorted(calls.items(), key=lambda item: -item[1])
+            )
+        stages = {
+            re.search(r'stage="([^"]*)"', series).group(1): value
+            for series, value in deltas.items() if series.startswith('report_stage_seconds_sum{')
+        }
+        if stages:
+            parts.append('stages: ' + ', '.join(
+                f"{stage} {seconds:.1f}s" for stage, seconds in sorted(stages.items(), key=lambda item: -item[1])
+            ))
+        return '; '.join(parts)
+
+# --- Exposition ------------------------------------------------------------------ #
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"metrics: {format % args}")
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1'):
+    """Serve /metrics on host:port from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,136 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_jql(jql: str) -> str:
+    """Collapse whitespace so formatting differences map to the same cache key."""
+    return _WHITESPACE_RE.sub(' ', jql).strip()
+
+
+def make_key(jql: str, fields=None, expand=None, start_at=0, max_results=None) -> tuple:
+    """Cache key of one search request: normalized JQL + projection + expansion + pagination."""
+    return (
+        normalize_jql(jql),
+        tuple(sorted(fields)) if fields else None,
+        expand,
+        start_at,
+        max_results,
+    )
+
+
+def estimate_bytes(issues) -> int:
+    """Approximate size of a search page by the length of its raw JSON."""
+    size = 0
+    for issue in issues:
+        raw = getattr(issue, 'raw', None)
+        size += len(json.dumps(raw, default=str)) if raw is not None else 64
+    return size
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache for Jira search results.
+
+    Bounded by entry count and approximate bytes; entries also expire after
+    `ttl` seconds. Counters for hits, misses, evictions and expirations are
+    available through stats().
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # key -> Event for fetches currently running (single-flight)
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size: int):
+        """Store a value; evicts least recently used entries to stay within bounds."""
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {size} byte result (limit {self.max_bytes})")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_fetch(self, key, fetch, sizer=estimate_bytes):
+        """
+        Return (value, fetched) for key; on a miss call fetch() and cache its result.
+        Concurrent misses for the same key wait for the first fetch instead of repeating it.
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value, False
+            with self._lock:
+                waiter = self._in_flight.get(key)
+                if waiter is None:
+                    self._in_flight[key] = threading.Event()
+                    break
+            waiter.wait()
+            # Loop: the value is cached now unless the leader's fetch failed
+
+        try:
+            value = fetch()
+            self.put(key, value, sizer(value))
+            return value, True
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
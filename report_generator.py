@@ -1,8 +1,12 @@
 import os
 import glob
+import hashlib
+import json
+import logging
+import shutil
+import tempfile
 from datetime import datetime
 import pandas as pd
-import matplotlib.pyplot as plt
 from reportlab.lib import colors, utils
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import (
@@ -12,9 +16,15 @@ from reportlab.platypus import (
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
-from config import REPORT_DIR, CHART_DIR, REPORT_TITLE, USE_JIRA_API
+from config import (
+    REPORT_DIR, CHART_DIR, REPORT_TITLE, USE_JIRA_API, ENABLE_REPORT_REUSE, JIRA_PROJECT, REPORT_DAYS
+)
 from jira_handler import JiraHandler
 from confluence_handler import ConfluenceHandler
+from report_snapshot import ReportSnapshot
+from chart_service import ChartSpec, get_chart_service
+from memory_utils import release_memory
+from metrics import timed_stage
 
 # Old visualization utilities
 from visualization import (
@@ -23,9 +33,15 @@ from visualization import (
     plot_namespace_distribution,
     plot_p1_alerts,
     plot_priority_changes,
-    plot_ticket_table
+    plot_ticket_table,
+    priority_changes_spec
 )
 
+logger = logging.getLogger(__name__)
+
+# Bump when the PDF layout changes, so reports stored by older code are rebuilt
+TEMPLATE_VERSION = 1
+
 class ReportGenerator:
     def __init__(self):
         # Prepare styles and directories
@@ -34,6 +50,8 @@ class ReportGenerator:
         os.makedirs(CHART_DIR, exist_ok=True)
         # Initialize handlers
         self.conf_handler = ConfluenceHandler()
+        self.chart_service = get_chart_service()
+        self.chart_service.start()
         
         # Add custom styles
         self.styles.add(ParagraphStyle(
@@ -53,18 +71,11 @@ class ReportGenerator:
         }
 
     def _create_trend_chart(self, trend_data):
-        """Create a simple line chart for weekly trends using pandas built-in"""
-        # Save chart as PNG
-        chart_path = os.path.join(CHART_DIR, 'weekly_trend.png')
-        ax = trend_data.plot(x='week', y='count', legend=False)
-        ax.set_title('Weekly Trend')
-        ax.set_xlabel('Week')
-        ax.set_ylabel('Count')
-        fig = ax.get_figure()
-        fig.tight_layout()
-        fig.savefig(chart_path)
-        fig.clear()
-        return chart_path
+        """Create a simple line chart for weekly trends"""
+        spec = ChartSpec('line', 'weekly_trend.png',
+                         dict(zip(trend_data['week'].astype(str), trend_data['count'].tolist())),
+                         {'title': 'Weekly Trend', 'xlabel': 'Week'})
+        return self.chart_service.render_one(spec, CHART_DIR)
 
     def _make_image(self, path, max_w=6*inch, max_h=4*inch):
         """Create an Image object with preserved aspect ratio"""
@@ -79,61 +90,208 @@ class ReportGenerator:
             style = self.styles['Normal']
         return ListItem(Paragraph(text, style), bulletColor='black')
 
-    def generate_report(self, jira_handler: JiraHandler, legacy_dir: str) -> str:
-        """Generate the complete report as a PDF and return its path."""
-        # Fetch data via API
-        df = jira_handler.get_all_tickets()
+    def generate_report(self, jira_handler: JiraHandler, legacy_dir: str, snapshot: ReportSnapshot = None,
+                        chart_dir: str = CHART_DIR, probe: tuple = None, build_dir: str = None) -> str:
+        """
+        Generate the complete report as a PDF and return its path (charts are drawn into chart_dir).
+        The PDF is written in build_dir (default: REPORT_DIR) and moved into
+        REPORT_DIR once complete, so an upload still reading the previous one
+        never sees a half-written file.
+        The PDF is stored for reuse under probe (probe_inputs()), which must have
+        been taken before the snapshot was captured.
+        """
+        if snapshot is None:
+            if probe is None and ENABLE_REPORT_REUSE:
+                with timed_stage('fingerprint'):
+                    probe = self.probe_inputs(jira_handler)
+                reused = self.stored_report(probe)
+                if reused:
+                    return reused
+            # Fetch everything once; all sections read the same snapshot
+            snapshot = ReportSnapshot.capture(jira_handler, self.conf_handler)
 
         # Build PDF
-        week_number = datetime.now().isocalendar()[1] - 1
-        report_path = os.path.join(REPORT_DIR, f'weekly_report_w{week_number}.pdf')
+        week_number = self._week_number()
+        report_path = self._report_path(week_number)
+        self._store_fingerprint(report_path, None)
+        fd, build_path = tempfile.mkstemp(dir=build_dir or REPORT_DIR, prefix='report-', suffix='.pdf')
+        os.close(fd)
+
         doc = SimpleDocTemplate(
-            report_path,
+            build_path,
             pagesize=self.page_size,
             leftMargin=self.margins['left'],
             rightMargin=self.margins['right'],
             topMargin=self.margins['top'],
             bottomMargin=self.margins['bottom']
         )
+        # Render every chart of the report in one parallel batch
+        with timed_stage('charts'):
+            charts = self.chart_service.render(self._chart_specs(snapshot), chart_dir)
+
+        sections = [
+            ('summary', lambda: self._summary_section(snapshot, week_number)),
+            ('priority_changes', lambda: self._priority_changes_section(charts['priority_changes.png'])),
+            ('postmortems', lambda: self._postmortems_section(snapshot)),
+            ('triage', lambda: self._triage_section(snapshot, charts['isd_initial_troubleshooting.png'])),
+            ('cluster', lambda: self._cluster_section(charts['alerts_by_cluster.png'])),
+            ('namespace', lambda: self._namespace_section(charts['alerts_by_namespace.png'])),
+            ('source', lambda: self._source_section(charts['alerts_by_source.png'])),
+            ('legacy', lambda: self._legacy_section(legacy_dir)),
+            ('ticket_lists', lambda: self._ticket_lists_section(snapshot)),
+        ]
         story = []
+        for name, build_section in sections:
+            with timed_stage(f'section:{name}'):
+                story += build_section()
+
+        # Build the PDF
+        try:
+            with timed_stage('pdf_build'):
+                doc.build(story)
+            self._publish(build_path, report_path)
+        except BaseException:
+            if os.path.exists(build_path):
+                os.remove(build_path)
+            raise
+        if probe is not None:
+            fingerprint, latest_update = probe
+            # The snapshot may have been read from caches filled before the last
+            # change the probe saw; such a PDF must not be reused under the probe
+            if snapshot.latest_update == latest_update:
+                self._store_fingerprint(report_path, fingerprint)
+            else:
+                logger.info("Report data predates the input probe (cached); not storing it for reuse")
+        # The images and flowables are garbage now; hand their memory back
+        del story, doc
+        release_memory()
+        return report_path
+
+    @staticmethod
+    def _week_number() -> int:
+        return datetime.now().isocalendar()[1] - 1
+
+    @staticmethod
+    def _report_path(week_number: int) -> str:
+        return os.path.join(REPORT_DIR, f'weekly_report_w{week_number}.pdf')
+
+    def probe_inputs(self, jira_handler: JiraHandler) -> tuple:
+        """
+        (fingerprint, latest ticket update) of what a report would be built from,
+        taken from cheap probes before anything is fetched. The fingerprint hashes
+        the ticket window's size and latest update (edits, priority changes and
+        triage all bump `updated`), the post-mortems, the window, the template
+        and the week.
+        """
+        total, latest = jira_handler.get_window_probe()
+        postmortems = self.conf_handler.get_recent_postmortems()
+        fingerprint = hashlib.sha256(json.dumps([
+            TEMPLATE_VERSION, REPORT_TITLE, self._week_number(), JIRA_PROJECT, REPORT_DAYS,
+            total, latest, postmortems,
+        ], default=str).encode('utf-8')).hexdigest()
+        return fingerprint, latest
+
+    def stored_report(self, probe: tuple):
+        """Path of the stored PDF built under probe (probe_inputs()), or None if it has to be built."""
+        fingerprint, _ = probe
+        report_path = self._report_path(self._week_number())
+        if ENABLE_REPORT_REUSE and os.path.exists(report_path) and self._stored_fingerprint(report_path) == fingerprint:
+            logger.info(f"Report inputs unchanged, reusing {report_path}")
+            return report_path
+        return None
+
+    @staticmethod
+    def _stored_fingerprint(report_path: str):
+        try:
+            with open(f'{report_path}.fingerprint') as handle:
+                return handle.read().strip()
+        except FileNotFoundError:
+            return None
 
-        # Title and Executive Summary (kept together)
+    @staticmethod
+    def _publish(build_path: str, report_path: str):
+        """Move a finished PDF into place atomically (copied next to it first if on another filesystem)."""
+        try:
+            os.replace(build_path, report_path)
+        except OSError:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(report_path), suffix='.tmp')
+            os.close(fd)
+            shutil.copyfile(build_path, tmp_path)
+            os.replace(tmp_path, report_path)
+            os.remove(build_path)
+
+    @staticmethod
+    def _store_fingerprint(report_path: str, fingerprint):
+        """Record the fingerprint of a finished PDF (None removes it while the PDF is rebuilt)."""
+        path = f'{report_path}.fingerprint'
+        if fingerprint is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            handle.write(fingerprint)
+        os.replace(tmp_path, path)
+
+    def _chart_specs(self, snapshot: ReportSnapshot) -> list:
+        """Charts drawn for the report sections"""
+        total, untriaged, _ = snapshot.troubleshooting
+        return [
+            priority_changes_spec(snapshot.priority_history),
+            ChartSpec('donut', 'isd_initial_troubleshooting.png',
+                      {'Triaged': total - untriaged, 'Untriaged': untriaged}),
+            ChartSpec('bar', 'alerts_by_cluster.png', dict(snapshot.cluster_counts), {
+                'title': 'Alerts by cluster', 'figsize': (8, 4),
+                'rotation': 30, 'ha': 'right', 'tight_layout': True,
+            }),
+            ChartSpec('bar', 'alerts_by_namespace.png', dict(snapshot.namespace_counts), {
+                'title': 'Alerts by Namespace', 'figsize': (8, 4),
+                'rotation': 30, 'ha': 'right', 'tight_layout': True,
+            }),
+            ChartSpec('bar', 'alerts_by_source.png', dict(snapshot.source_counts), {
+                'title': 'Wiz Alerts, AWS GuardDuty, Snyk', 'figsize': (6, 3),
+                'color': ['#4C72B0', '#55A868', '#C44E52'], 'rotation': 0, 'tight_layout': True,
+            }),
+        ]
+
+    def _summary_section(self, snapshot: ReportSnapshot, week_number: int) -> list:
+        """Title and Executive Summary (kept together)"""
         title_style = ParagraphStyle(
             'Title', parent=self.styles['Heading1'], fontSize=24, spaceAfter=20
         )
-        story.append(KeepTogether([
+        return [KeepTogether([
             Paragraph(f"{REPORT_TITLE} - Week {week_number}", title_style),
             Spacer(1, 12),
             Paragraph("<b>Executive Summary</b>", self.styles['Heading2']),
             Paragraph(
-                f"Total Tickets: {len(df)}<br/>"
-                f"P1 Tickets: {len(df[df['priority'] == 'P1'])}<br/>"
-                f"Cancelled/Resolved: {df['status'].str.lower().isin(['cancelled', 'closed', 'resolved']).sum()}",
+                f"Total Tickets: {len(snapshot.tickets)}<br/>"
+                f"P1 Tickets: {len(snapshot.p1_tickets)}<br/>"
+                f"Cancelled/Resolved: {snapshot.closed_count}",
                 self.styles['Normal']
             ),
             Spacer(1, 12)
-        ]))
+        ])]
 
-        # Add Priority Changes section
-        story.append(KeepTogether([
-            Paragraph("Priority Changes", self.styles['Heading2']),
-            Spacer(1, 6)
-        ]))
-        
-        # Generate and add priority changes visualization
-        priority_history = jira_handler.get_priority_history()
-        priority_changes_path = plot_priority_changes(priority_history)
-        story.append(KeepTogether([
-            self._make_image(priority_changes_path),
-            Spacer(1, 12)
-        ]))
+    def _priority_changes_section(self, priority_changes_path: str) -> list:
+        """Priority Changes heading and chart"""
+        return [
+            KeepTogether([
+                Paragraph("Priority Changes", self.styles['Heading2']),
+                Spacer(1, 6)
+            ]),
+            KeepTogether([
+                self._make_image(priority_changes_path),
+                Spacer(1, 12)
+            ])
+        ]
 
-        # Post Mortems section
-        pm = self.conf_handler.get_recent_postmortems()
-        story.append(KeepTogether([
+    def _postmortems_section(self, snapshot: ReportSnapshot) -> list:
+        """Post Mortems section"""
+        pm = snapshot.postmortems
+        story = [KeepTogether([
             Paragraph("P1 — Post Mortems", self.styles['Heading2']),
             Spacer(1, 6)
-        ]))
+        ])]
         if not pm:
             story.append(Paragraph("No Post Mortems created in the last week.", self.styles['Normal']))
         else:
@@ -145,24 +303,16 @@ class ReportGenerator:
                 ))
             story.append(ListFlowable(items, bulletType='bullet', start='-'))
         story.append(Spacer(1, 12))
+        return story
 
-        # ISD Board Initial Troubleshooting
-        total, untriaged, percent = jira_handler.get_initial_troubleshooting_metrics()
-        story.append(KeepTogether([
+    def _triage_section(self, snapshot: ReportSnapshot, chart_path: str) -> list:
+        """ISD Board Initial Troubleshooting"""
+        total, untriaged, percent = snapshot.troubleshooting
+        story = [KeepTogether([
             Paragraph("ISD Board Initial Troubleshooting", self.styles['Heading2']),
             Spacer(1, 6)
-        ]))
-        
-        # Create donut chart
-        labels = ['Triaged', 'Untriaged']
-        values = [total - untriaged, untriaged]
-        fig, ax = plt.subplots()
-        ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, wedgeprops={'width':0.3})
-        ax.axis('equal')
-        chart_path = os.path.join(CHART_DIR, 'isd_initial_troubleshooting.png')
-        fig.savefig(chart_path, bbox_inches='tight')
-        plt.close(fig)
-        
+        ])]
+
         # Add chart and metrics
         story.append(KeepTogether([
             self._make_image(chart_path),
@@ -173,75 +323,41 @@ class ReportGenerator:
             ),
             Spacer(1, 12)
         ]))
+        return story
 
-        # Alerts by cluster
-        counts = jira_handler.get_cluster_alert_counts()
-        series = pd.Series(counts)
-        fig, ax = plt.subplots(figsize=(8, 4))
-        series.plot.bar(ax=ax)
-        ax.set_title('Alerts by cluster')
-        ax.set_xlabel('')
-        ax.set_ylabel('Count')
-        plt.xticks(rotation=30, ha='right')
-        fig.tight_layout()
-        chart_path = os.path.join(CHART_DIR, 'alerts_by_cluster.png')
-        fig.savefig(chart_path, bbox_inches='tight')
-        plt.close(fig)
-
-        story.append(KeepTogether([
+    def _cluster_section(self, chart_path: str) -> list:
+        """Alerts by cluster"""
+        return [KeepTogether([
             Paragraph("Alerts by Cluster", self.styles['Heading2']),
             Spacer(1, 6),
             self._make_image(chart_path),
             Spacer(1, 12)
-        ]))
-
-        # Alerts by namespace
-        namespace_counts = jira_handler.get_namespace_alert_counts()
-        ns_series = pd.Series(namespace_counts)
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ns_series.plot.bar(ax=ax)
-        ax.set_title('Alerts by Namespace')
-        ax.set_xlabel('')
-        ax.set_ylabel('Count')
-        plt.xticks(rotation=30, ha='right')
-        fig.tight_layout()
-        ns_chart = os.path.join(CHART_DIR, 'alerts_by_namespace.png')
-        fig.savefig(ns_chart, bbox_inches='tight')
-        plt.close(fig)
+        ])]
 
-        story.append(KeepTogether([
+    def _namespace_section(self, ns_chart: str) -> list:
+        """Alerts by namespace"""
+        return [KeepTogether([
             Paragraph("Alerts by Namespace", self.styles['Heading2']),
             Spacer(1, 6),
             self._make_image(ns_chart),
             Spacer(1, 12)
-        ]))
+        ])]
 
-        # Wiz Alerts, AWS GuardDuty, Snyk
-        src_counts = jira_handler.get_source_alert_counts()
-        series = pd.Series(src_counts)
-        fig, ax = plt.subplots(figsize=(6, 3))
-        series.plot.bar(ax=ax, color=['#4C72B0', '#55A868', '#C44E52'])
-        ax.set_title('Wiz Alerts, AWS GuardDuty, Snyk')
-        ax.set_xlabel('')
-        ax.set_ylabel('Count')
-        plt.xticks(rotation=0)
-        fig.tight_layout()
-        chart_path = os.path.join(CHART_DIR, 'alerts_by_source.png')
-        fig.savefig(chart_path, bbox_inches='tight')
-        plt.close(fig)
-
-        story.append(KeepTogether([
+    def _source_section(self, chart_path: str) -> list:
+        """Wiz Alerts, AWS GuardDuty, Snyk"""
+        return [KeepTogether([
             Paragraph("Wiz Alerts, AWS GuardDuty, Snyk", self.styles['Heading2']),
             Spacer(1, 6),
             self._make_image(chart_path),
             Spacer(1, 12)
-        ]))
+        ])]
 
-        # Legacy visualizations
-        story.append(KeepTogether([
+    def _legacy_section(self, legacy_dir: str) -> list:
+        """Legacy visualizations"""
+        story = [KeepTogether([
             Paragraph("Legacy Visualizations", self.styles['Heading1']),
             Spacer(1, 12)
-        ]))
+        ])]
 
         artifacts_dir = os.path.join(legacy_dir, 'artifacts')
         title_mapping = {
@@ -276,16 +392,18 @@ class ReportGenerator:
                 self._make_image(img_path),
                 Spacer(1, 12)
             ]))
+        return story
 
-        # Ticket Lists
-        story.append(KeepTogether([
+    def _ticket_lists_section(self, snapshot: ReportSnapshot) -> list:
+        """Ticket Lists"""
+        story = [KeepTogether([
             Paragraph("Ticket Lists", self.styles['Heading1']),
             Spacer(1, 12)
-        ]))
+        ])]
 
         # 1. Duplicate list
         story.append(Paragraph("Duplicate List", self.styles['Heading2']))
-        duplicate_tickets = df[df['assignee'].str.lower().str.contains('oleg.*kolomiets', na=False)]
+        duplicate_tickets = snapshot.duplicate_tickets
         if not duplicate_tickets.empty:
             items = []
             for _, ticket in duplicate_tickets.iterrows():
@@ -300,10 +418,7 @@ class ReportGenerator:
 
         # 2. Canceled list
         story.append(Paragraph("Canceled List", self.styles['Heading2']))
-        canceled_tickets = df[
-            (df['status'].str.lower() == 'canceled') & 
-            (~df['assignee'].str.lower().str.contains('oleg.*kolomiets', na=False))
-        ]
+        canceled_tickets = snapshot.canceled_tickets
         if not canceled_tickets.empty:
             items = []
             for _, ticket in canceled_tickets.iterrows():
@@ -319,7 +434,7 @@ class ReportGenerator:
 
         # 3. Other cancelations
         story.append(Paragraph("Other Cancelations", self.styles['Heading2']))
-        other_tickets = df[df['assignee'].str.lower().str.contains('arthur.*holubov', na=False)]
+        other_tickets = snapshot.other_cancelation_tickets
         if not other_tickets.empty:
             items = []
             for _, ticket in other_tickets.iterrows():
@@ -335,7 +450,4 @@ class ReportGenerator:
         else:
             story.append(Paragraph("No other cancelations found.", self.styles['Normal']))
         story.append(Spacer(1, 12))
-
-        # Build the PDF
-        doc.build(story)
-        return report_path
+        return story
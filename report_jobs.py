@@ -0,0 +1,183 @@
+import itertools
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import JOB_DIR, REPORT_DELIVERY_WORKERS, REPORT_JOB_WORKERS
+import tracing
+
+logger = logging.getLogger(__name__)
+
+
+def job_key(params: dict) -> str:
+    """Identity of a report request: requests with equal params get the same report."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class ReportJob:
+    """
+    One queued report build, shared by everyone who asked for the same report
+    while it was pending. Subscribers are told about every stage it reaches
+    and get the result (or the error) when it finishes.
+    """
+
+    def __init__(self, job_id: int, key: str, params: dict):
+        self.id = job_id
+        self.key = key
+        self.params = params
+        self.workdir = os.path.join(JOB_DIR, f'job-{job_id}')
+        self.stage = 'queued'
+        self.result = None
+        self.error = None
+        self.done = threading.Event()  # set once every subscriber has been told
+        # The build is traced under the span of the request that created the job
+        self.trace = tracing.current()
+        self.created_at = time.time()
+        self._finished = False
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, on_progress=None, on_done=None):
+        """on_progress(job, stage) per stage, on_done(job) once finished (right away if it already is)."""
+        with self._lock:
+            if not self._finished:
+                self._subscribers.append((on_progress, on_done))
+                return
+        if on_done is not None:
+            self._call(on_done, self)
+
+    def progress(self, stage: str):
+        """Record the stage the build has reached and tell the subscribers."""
+        with self._lock:
+            self.stage = stage
+            subscribers = list(self._subscribers)
+        for on_progress, _ in subscribers:
+            if on_progress is not None:
+                self._call(on_progress, self, stage)
+
+    def finish(self, result=None, error: Exception = None, executor=None):
+        """
+        Record the outcome and call every on_done: in turn on this thread, or
+        all at once on executor (done is set when the last one returns).
+        """
+        with self._lock:
+            self.result = result
+            self.error = error
+            self.stage = 'failed' if error is not None else 'done'
+            self._finished = True
+            subscribers, self._subscribers = self._subscribers, []
+        callbacks = [on_done for _, on_done in subscribers if on_done is not None]
+        if executor is None or not callbacks:
+            for on_done in callbacks:
+                self._call(on_done, self)
+            self.done.set()
+            return
+        remaining = [len(callbacks)]
+
+        def deliver(on_done):
+            self._call(on_done, self)
+            with self._lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self.done.set()
+        for on_done in callbacks:
+            executor.submit(deliver, on_done)
+
+    @staticmethod
+    def _call(callback, *args):
+        # A failing notification must not fail the build or the other subscribers
+        try:
+            callback(*args)
+        except Exception:
+            logger.exception("Report job callback failed")
+
+
+class ReportQueue:
+    """
+    Runs report builds on a few background threads, one job at a time each.
+
+    A request whose params match a job that is still queued or running joins
+    that job instead of starting another build. Every job gets its own work
+    directory (job.workdir) for intermediate files, removed when it finishes.
+    Results are delivered to the subscribers on a separate pool, so a slow
+    upload does not hold up the next build.
+    """
+
+    def __init__(self, build, workers: int = REPORT_JOB_WORKERS,
+                 delivery_workers: int = REPORT_DELIVERY_WORKERS):
+        # build(job) -> result; may call job.progress(stage) as it goes
+        self._build = build
+        self.workers = max(1, workers)
+        self._queue = queue.Queue()
+        self._waiting = []
+        self._active = {}
+        self._running = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._delivery = ThreadPoolExecutor(max_workers=max(1, delivery_workers),
+                                            thread_name_prefix='report-delivery')
+        for number in range(self.workers):
+            threading.Thread(target=self._work, name=f'report-job-{number}', daemon=True).start()
+
+    def submit(self, params: dict, on_progress=None, on_done=None):
+        """
+        Queue a report build for params, or join the pending one with equal params.
+        Returns (job, position, joined); position is the number of jobs that
+        start before this one (0: it is running or starts right away).
+        """
+        key = job_key(params)
+        with self._lock:
+            job = self._active.get(key)
+            joined = job is not None
+            if job is None:
+                job = ReportJob(next(self._ids), key, dict(params))
+                self._active[key] = job
+                self._waiting.append(job)
+                self._queue.put(job)
+            # Still under the lock: the job cannot finish between lookup and subscribe
+            job.subscribe(on_progress, on_done)
+            position = self._position(job)
+        logger.info(f"Report job {job.id} {'joined' if joined else 'queued'} (position {position})")
+        return job, position, joined
+
+    def _position(self, job: ReportJob) -> int:
+        if job not in self._waiting:
+            return 0
+        idle = self.workers - self._running
+        return max(0, self._waiting.index(job) + 1 - idle)
+
+    def pending(self) -> int:
+        """Jobs queued or running."""
+        with self._lock:
+            return len(self._active)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._waiting.remove(job)
+                self._running += 1
+            result, error = None, None
+            with tracing.activate(job.trace):
+                tracing.add_span('queued', job.created_at, time.time(), job=job.id)
+                job.progress('started')
+                try:
+                    os.makedirs(job.workdir, exist_ok=True)
+                    with tracing.span('build', job=job.id):
+                        result = self._build(job)
+                except Exception as e:
+                    logger.exception(f"Report job {job.id} failed")
+                    error = e
+                finally:
+                    shutil.rmtree(job.workdir, ignore_errors=True)
+                    # Unregister before notifying, so nobody joins a job that has already delivered
+                    with self._lock:
+                        del self._active[job.key]
+                        self._running -= 1
+            job.finish(result, error, self._delivery)
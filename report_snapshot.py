@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+from types import MappingProxyType
+
+import pandas as pd
+
+from config import PRIORITY_MAP
+from data_cleaning import observed_counts
+from async_data import fetch_report_data
+
+
+@dataclass(frozen=True)
+class ReportSnapshot:
+    """
+    Point-in-time data for one report run.
+
+    Fetched and enriched once, then handed to every report section and
+    visualization so the whole PDF reflects the same data. Derived views are
+    computed on first access and reused; treat `tickets` as read-only.
+    """
+    captured_at: datetime
+    tickets: pd.DataFrame
+    priority_history: MappingProxyType
+    troubleshooting: tuple
+    cluster_counts: MappingProxyType
+    namespace_counts: MappingProxyType
+    source_counts: MappingProxyType
+    postmortems: tuple
+
+    @classmethod
+    def capture(cls, jira_handler, conf_handler) -> 'ReportSnapshot':
+        """Fetch every report input (concurrently) and freeze it."""
+        data = fetch_report_data(jira_handler, conf_handler)
+        # Copy the history: the handler keeps appending to its own dict
+        history = {
+            key: tuple(dict(change) for change in changes)
+            for key, changes in jira_handler.get_priority_history().items()
+        }
+        return cls(
+            captured_at=datetime.now(),
+            tickets=data['tickets'],
+            priority_history=MappingProxyType(history),
+            troubleshooting=tuple(data['troubleshooting']),
+            cluster_counts=MappingProxyType(dict(data['cluster_counts'])),
+            namespace_counts=MappingProxyType(dict(data['namespace_counts'])),
+            source_counts=MappingProxyType(dict(data['source_counts'])),
+            postmortems=tuple(data['postmortems']),
+        )
+
+    def _column(self, name) -> pd.Series:
+        """Column of the ticket frame, or an empty Series if there are no tickets."""
+        if name in self.tickets.columns:
+            return self.tickets[name]
+        return pd.Series([], dtype=object)
+
+    @cached_property
+    def latest_update(self):
+        """Newest `updated` of the tickets (None if there are none)."""
+        updated = self._column('updated')
+        return updated.max() if len(updated) else None
+
+    @cached_property
+    def p1_tickets(self) -> pd.DataFrame:
+        return self.tickets[self._column('priority') == PRIORITY_MAP.get('Highest', 'Highest')]
+
+    @cached_property
+    def priority_distribution(self) -> pd.Series:
+        return observed_counts(self._column('priority'))
+
+    @cached_property
+    def cluster_distribution(self) -> pd.Series:
+        return observed_counts(self._column('cluster'))
+
+    @cached_property
+    def namespace_distribution(self) -> pd.Series:
+        return observed_counts(self._column('namespace'))
+
+    @cached_property
+    def closed_count(self) -> int:
+        """Tickets with a cancelled / closed / resolved status."""
+        return int(self._column('status').str.lower().isin(['cancelled', 'closed', 'resolved']).sum())
+
+    @cached_property
+    def duplicate_tickets(self) -> pd.DataFrame:
+        return self.tickets[self._column('assignee').str.lower().str.contains('oleg.*kolomiets', na=False)]
+
+    @cached_property
+    def canceled_tickets(self) -> pd.DataFrame:
+        assignee = self._column('assignee').str.lower()
+        return self.tickets[
+            (self._column('status').str.lower() == 'canceled') &
+            (~assignee.str.contains('oleg.*kolomiets', na=False))
+        ]
+
+    @cached_property
+    def other_cancelation_tickets(self) -> pd.DataFrame:
+        return self.tickets[self._column('assignee').str.lower().str.contains('arthur.*holubov', na=False)]
@@ -0,0 +1,213 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.hooks import dispatch_hook
+
+from config import (
+    HTTP_RATE_PER_SECOND, HTTP_BURST, HTTP_MIN_CONCURRENCY, HTTP_MAX_CONCURRENCY,
+    HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE_SECONDS, HTTP_BACKOFF_MAX_SECONDS
+)
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Throttling responses: retried, and they halve the concurrency limit
+THROTTLE_STATUSES = {429, 503}
+# Also retried (gateway errors of an overloaded site), without touching the limit
+RETRY_STATUSES = THROTTLE_STATUSES | {502, 504}
+# The bot only reads; POST is retried only for JQL searches
+_IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+HTTP_THROTTLED = metrics.counter('http_throttled_total',
+                                 'Throttling signals received (429/503, X-RateLimit-NearLimit)', ('service',))
+HTTP_WAIT_SECONDS = metrics.histogram('http_governor_wait_seconds',
+                                      'Time a request waited for a token or a concurrency slot', ('service',))
+
+
+def _retry_after(headers, now: float):
+    """Seconds to wait from Retry-After (seconds or HTTP date) or an exhausted X-RateLimit-* budget."""
+    value = headers.get('Retry-After')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    reset = headers.get('X-RateLimit-Reset')
+    if reset and headers.get('X-RateLimit-Remaining') == '0':
+        try:
+            # Jira Cloud sends an ISO 8601 timestamp
+            reset_at = datetime.fromisoformat(reset)
+            if reset_at.tzinfo is None:
+                reset_at = reset_at.replace(tzinfo=timezone.utc)
+            return max(0.0, reset_at.timestamp() - now)
+        except ValueError:
+            pass
+    return None
+
+
+def _retryable(request) -> bool:
+    return request.method in _IDEMPOTENT_METHODS or (
+        request.method == 'POST' and urlsplit(request.url).path.rstrip('/').endswith('/search')
+    )
+
+
+class RequestGovernor:
+    """
+    Shared admission control for the requests of one service (Jira, Confluence).
+
+    - token bucket: at most `rate` requests per second on average, `burst` at once
+    - AIMD concurrency limit: +1 per limit's worth of successful responses,
+      halved on throttling (at most once per round of in-flight requests)
+    - Retry-After / exhausted X-RateLimit-Remaining pause every request of the
+      service until the server's reset time, not just the one that was refused
+    """
+
+    def __init__(self, service: str, rate: float = HTTP_RATE_PER_SECOND, burst: int = HTTP_BURST,
+                 min_concurrency: int = HTTP_MIN_CONCURRENCY, max_concurrency: int = HTTP_MAX_CONCURRENCY,
+                 max_retries: int = HTTP_MAX_RETRIES):
+        self.service = service
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.limit = float(self.max_concurrency)
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> float:
+        """Block until the request may be sent; returns its start time for release()."""
+        requested = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    wait = None  # woken by release() when a slot frees up
+                    if self._in_flight < int(self.limit):
+                        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                        self._refilled = now
+                        # A rate of 0 disables the token bucket
+                        if self.rate <= 0 or self._tokens >= 1:
+                            self._tokens -= 1 if self.rate > 0 else 0
+                            self._in_flight += 1
+                            break
+                        wait = (1 - self._tokens) / self.rate
+                self._cond.wait(wait)
+        HTTP_WAIT_SECONDS.observe(now - requested, service=self.service)
+        return now
+
+    def release(self, started: float, response=None):
+        """
+        Free the request's slot and adapt to the response (None: the request failed).
+        Returns the delay the server asked for before the next request, if any.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            delay = None
+            if response is not None:
+                now = time.monotonic()
+                delay = _retry_after(response.headers, time.time())
+                if delay is not None:
+                    self._paused_until = max(self._paused_until, now + delay)
+                throttled = response.status_code in THROTTLE_STATUSES
+                if throttled or response.headers.get('X-RateLimit-NearLimit', '').lower() == 'true':
+                    HTTP_THROTTLED.inc(service=self.service)
+                    # Requests sent before the last decrease saw the old limit; count them once
+                    if started >= self._last_decrease:
+                        self._decrease(now)
+                elif response.ok:
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+        return delay
+
+    def _decrease(self, now):
+        old = int(self.limit)
+        self.limit = max(self.min_concurrency, self.limit / 2)
+        self._last_decrease = now
+        if int(self.limit) != old:
+            logger.warning(f"{self.service} is throttling requests: concurrency {old} -> {int(self.limit)}")
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry `attempt` (0-based)."""
+        return random.uniform(0, min(HTTP_BACKOFF_MAX_SECONDS, HTTP_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class GovernedAdapter(HTTPAdapter):
+    """
+    Transport adapter sending every request of a session through a
+    RequestGovernor and retrying throttled, failing or dropped requests.
+    Retried responses still go through the session's response hooks, so
+    metrics.http_hook counts every attempt.
+    """
+
+    def __init__(self, governor: RequestGovernor, **kwargs):
+        super().__init__(**kwargs)
+        self.governor = governor
+
+    def send(self, request, **kwargs):
+        retryable = _retryable(request)
+        attempt = 0
+        while True:
+            started = self.governor.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.governor.release(started)
+                if not retryable or attempt >= self.governor.max_retries:
+                    raise
+                delay = self.governor.backoff(attempt)
+                reason = type(e).__name__
+            else:
+                delay = self.governor.release(started, response)
+                if response.status_code not in RETRY_STATUSES or not retryable or attempt >= self.governor.max_retries:
+                    return response
+                if delay is None:
+                    delay = self.governor.backoff(attempt)
+                else:
+                    # Spread the retries of everyone the server paused
+                    delay += random.uniform(0, HTTP_BACKOFF_BASE_SECONDS)
+                reason = response.status_code
+                response.elapsed = timedelta(seconds=time.monotonic() - started)
+                dispatch_hook('response', request.hooks, response, **kwargs)
+                response.close()
+            attempt += 1
+            metrics.HTTP_RETRIES.inc(service=self.governor.service, endpoint=metrics.endpoint_of(request.url))
+            logger.info(f"Retrying {request.method} {metrics.endpoint_of(request.url)} ({reason}) "
+                        f"in {delay:.1f}s [{attempt}/{self.governor.max_retries}]")
+            time.sleep(delay)
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(service: str) -> RequestGovernor:
+    """The process-wide governor of a service."""
+    with _governors_lock:
+        governor = _governors.get(service)
+        if governor is None:
+            governor = _governors[service] = RequestGovernor(service)
+        return governor
+
+
+def govern_session(session: requests.Session, service: str) -> requests.Session:
+    """Route all of a session's requests through the service's governor."""
+    adapter = GovernedAdapter(get_governor(service), pool_maxsize=max(10, HTTP_MAX_CONCURRENCY))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
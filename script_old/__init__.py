@@ -11,5 +11,4 @@ from .data_loader import load_data
 from .data_cleaning import clean_data
 from .classification import classify_alerts, define_priority
 from .visualization import plot_alert_types, plot_priority_levels
-from .utils import *
 
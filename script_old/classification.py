@@ -3,106 +3,202 @@
 import re
 from config import PRIORITY_MAP
 
-def classify_alerts(df):
+# Ordered (pattern, category) rules; the first matching pattern wins.
+# category is a label or a callable building one from the match.
+ALERT_PATTERNS = [
+    # New pattern to classify 'mbt' tickets
+    (r'mbt', 'MBT'),
+    # Combined pattern for 'Change Request' and 'Team Change Request'
+    (r'\b(team )?change request\b', 'Change Request'),
+    # Troubleshooting Requests
+    (r'\btroubleshooting\b.*', 'Troubleshooting'),
+    # Password Reset Requests
+    (r'\bpassword reset request\b.*', 'Password Reset Request'),
+    # User Provisioning Requests
+    (r'\buser provisioning request\b.*', 'User Provisioning Request'),
+    # Terraform Failures
+    (r'\bterraform failed to generate plan\b.*', 'Terraform Plan Failed'),
+    # Snowflake Public Key
+    (r'\bsnowflake public key\b.*', 'Snowflake Public Key'),
+    # High CPU Utilization with dynamic info
+    (r'\bcpu utilization above.*?on (\S+)', lambda m: f"High CPU Utilization on {m.group(1)}"),
+    # Outage Reporting with dynamic info
+    (r'\boutage reporting\b.*?for (\S+)', lambda m: f"Outage Reporting for {m.group(1)}"),
+    # Kubernetes Cluster Names and Hosts
+    (r'kube_cluster_name:(\S+)', lambda m: m.group(1)),
+    # Team Change Requests
+    (r'\bteam change\b', 'Team Change Request'),
+    # Troubleshooting Requests
+    (r'\btroubleshooting\b', 'Troubleshooting'),
+    # Password Reset Requests
+    (r'\bpassword reset request\b', 'Password Reset Request'),
+    # User Provisioning Requests
+    (r'\buser provisioning request\b', 'User Provisioning Request'),
+    # Terraform Failures
+    (r'\bterraform failed to generate plan\b', 'Terraform Plan Failed'),
+    # Snowflake Public Key
+    (r'\bsnowflake public key\b', 'Snowflake Public Key'),
+    # High CPU Utilization
+    (r'\bcpu utilization above\b', 'High CPU Utilization'),
+    # Change Requests
+    (r'\bchange request\b', 'Change Request'),
+    # Outage Reporting
+    (r'\boutage reporting\b', 'Outage Reporting'),
+    # Kubernetes Cluster Names
+    (r'kube_cluster_name:apps-prod-01', 'apps-prod-01'),
+    (r'kube_cluster_name:ecomm-prod01-scus1', 'ecomm-prod01-scus1'),
+    (r'kube_cluster_name:ecomm-prod-scus1', 'ecomm-prod01-scus1'),
+    (r'kube_cluster_name:de-airflow-production', 'de-airflow-production'),
+    (r'kube_cluster_name:de-airflow-staging', 'de-airflow-staging'),
+    (r'kube_cluster_name:airflow-prod-01', 'airflow-prod-01'),
+    (r'kube_cluster_name:cdp-production', 'cdp-production'),
+    (r'kube_cluster_name:cdp-staging', 'cdp-staging'),
+    (r'kube_cluster_name:pepdirect', 'pepdirect'),
+    (r'kube_cluster_name:automation-api-heartbeat', 'Automation API Heartbeat'),
+    (r'kube_cluster_name:terraform-drift', 'terraform drift'),
+    (r'kube_cluster_name:wiz-finding', 'Wiz findings'),
+    (r'kube_cluster_name:wiz', 'wiz'),
+    (r'airflow2 cdp', 'cdp-staging'),
+    # Cluster Names without prefix
+    (r'\bapps-prod-01\b', 'apps-prod-01'),
+    (r'\becomm-prod01-scus1\b', 'ecomm-prod01-scus1'),
+    (r'\becomm-prod-scus1\b', 'ecomm-prod01-scus1'),
+    (r'\bde-airflow-production\b', 'de-airflow-production'),
+    (r'\bde-airflow-staging\b', 'de-airflow-staging'),
+    (r'\bairflow-prod-01\b', 'airflow-prod-01'),
+    (r'\bcdp-production\b', 'cdp-production'),
+    (r'\bcdp-staging\b', 'cdp-staging'),
+    (r'\bstaging cdp\b', 'cdp-staging'),
+    (r'\bpepdirect\b', 'pepdirect'),
+    (r'\bautomation api heartbeat\b', 'Automation API Heartbeat'),
+    # Other Keywords
+    (r'\bterraform drift\b', 'terraform drift'),
+    (r'\bwiz finding\b', 'Wiz findings'),
+    (r'\bwiz\b', 'wiz'),
+    (r'\baws guardduty\b', 'AWS GuardDuty'),
+    (r'\bsnyk\b', 'Snyk'),
+    (r'\bgha\b', 'GHA'),
+    (r'\bgithub actions\b', 'GHA'),
+    (r'\bebs volume\b', 'EBS Volume'),
+    (r'\bebs volumes\b', 'EBS Volume'),
+    (r'\bcert-manager\b', 'cert-manager'),
+    (r'\bairflow-dpi\b', 'airflow-dpi'),
+    (r'\bsimple-machine\b', 'simple-machine'),
+    # Add additional patterns if necessary
+]
+
+# Regex pieces that are not guaranteed literal text in a match
+_OPTIONAL_GROUP_RE = re.compile(r'\([^()]*\)[?*]')
+_NON_LITERAL_RE = re.compile(r'\\[a-zA-Z]|\([^()]*\)|[.^$*+?{}\[\]|()]')
+
+
+def _required_literal(pattern):
+    """Longest piece of plain text that every match of pattern must contain."""
+    text = _OPTIONAL_GROUP_RE.sub('\0', pattern)
+    pieces = _NON_LITERAL_RE.sub('\0', text).split('\0')
+    return max(pieces, key=len)
+
+
+def _trie_regex(words):
+    """Alternation of words factored into a prefix trie; the longest word at a position wins."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return f'(?:{body})?' if len(branches) == 1 else body + '?'
+        return body
+
+    return emit(trie)
+
+
+class AlertClassifier:
     """
-    Function to classify alerts based on patterns in the 'Summary' field.
+    Compiled form of an ordered (pattern, category) rule list.
+
+    One scan with a combined keyword automaton finds which rule keywords occur
+    in a summary; only the rules whose keyword was found are then tried, in
+    their original order, so precedence and dynamic captures are unchanged.
+    Results are memoized per distinct summary (up to max_cache entries).
     """
-    def get_alert_type(summary):
-        summary_lower = str(summary).lower()
-        
-        patterns = [
-            # New pattern to classify 'mbt' tickets
-            (r'mbt', 'MBT'),
-            # Combined pattern for 'Change Request' and 'Team Change Request'
-            (r'\b(team )?change request\b', 'Change Request'),
-            # Troubleshooting Requests
-            (r'\btroubleshooting\b.*', 'Troubleshooting'),
-            # Password Reset Requests
-            (r'\bpassword reset request\b.*', 'Password Reset Request'),
-            # User Provisioning Requests
-            (r'\buser provisioning request\b.*', 'User Provisioning Request'),
-            # Terraform Failures
-            (r'\bterraform failed to generate plan\b.*', 'Terraform Plan Failed'),
-            # Snowflake Public Key
-            (r'\bsnowflake public key\b.*', 'Snowflake Public Key'),
-            # High CPU Utilization with dynamic info
-            (r'\bcpu utilization above.*?on (\S+)', lambda m: f"High CPU Utilization on {m.group(1)}"),
-            # Outage Reporting with dynamic info
-            (r'\boutage reporting\b.*?for (\S+)', lambda m: f"Outage Reporting for {m.group(1)}"),
-            # Kubernetes Cluster Names and Hosts
-            (r'kube_cluster_name:(\S+)', lambda m: m.group(1)),
-            # Team Change Requests
-            (r'\bteam change\b', 'Team Change Request'),
-            # Troubleshooting Requests
-            (r'\btroubleshooting\b', 'Troubleshooting'),
-            # Password Reset Requests
-            (r'\bpassword reset request\b', 'Password Reset Request'),
-            # User Provisioning Requests
-            (r'\buser provisioning request\b', 'User Provisioning Request'),
-            # Terraform Failures
-            (r'\bterraform failed to generate plan\b', 'Terraform Plan Failed'),
-            # Snowflake Public Key
-            (r'\bsnowflake public key\b', 'Snowflake Public Key'),
-            # High CPU Utilization
-            (r'\bcpu utilization above\b', 'High CPU Utilization'),
-            # Change Requests
-            (r'\bchange request\b', 'Change Request'),
-            # Outage Reporting
-            (r'\boutage reporting\b', 'Outage Reporting'),
-            # Kubernetes Cluster Names
-            (r'kube_cluster_name:apps-prod-01', 'apps-prod-01'),
-            (r'kube_cluster_name:ecomm-prod01-scus1', 'ecomm-prod01-scus1'),
-            (r'kube_cluster_name:ecomm-prod-scus1', 'ecomm-prod01-scus1'),
-            (r'kube_cluster_name:de-airflow-production', 'de-airflow-production'),
-            (r'kube_cluster_name:de-airflow-staging', 'de-airflow-staging'),
-            (r'kube_cluster_name:airflow-prod-01', 'airflow-prod-01'),
-            (r'kube_cluster_name:cdp-production', 'cdp-production'),
-            (r'kube_cluster_name:cdp-staging', 'cdp-staging'),
-            (r'kube_cluster_name:pepdirect', 'pepdirect'),
-            (r'kube_cluster_name:automation-api-heartbeat', 'Automation API Heartbeat'),
-            (r'kube_cluster_name:terraform-drift', 'terraform drift'),
-            (r'kube_cluster_name:wiz-finding', 'Wiz findings'),
-            (r'kube_cluster_name:wiz', 'wiz'),
-            (r'airflow2 cdp', 'cdp-staging'),
-            # Cluster Names without prefix
-            (r'\bapps-prod-01\b', 'apps-prod-01'),
-            (r'\becomm-prod01-scus1\b', 'ecomm-prod01-scus1'),
-            (r'\becomm-prod-scus1\b', 'ecomm-prod01-scus1'),
-            (r'\bde-airflow-production\b', 'de-airflow-production'),
-            (r'\bde-airflow-staging\b', 'de-airflow-staging'),
-            (r'\bairflow-prod-01\b', 'airflow-prod-01'),
-            (r'\bcdp-production\b', 'cdp-production'),
-            (r'\bcdp-staging\b', 'cdp-staging'),
-            (r'\bstaging cdp\b', 'cdp-staging'),
-            (r'\bpepdirect\b', 'pepdirect'),
-            (r'\bautomation api heartbeat\b', 'Automation API Heartbeat'),
-            # Other Keywords
-            (r'\bterraform drift\b', 'terraform drift'),
-            (r'\bwiz finding\b', 'Wiz findings'),
-            (r'\bwiz\b', 'wiz'),
-            (r'\baws guardduty\b', 'AWS GuardDuty'),
-            (r'\bsnyk\b', 'Snyk'),
-            (r'\bgha\b', 'GHA'),
-            (r'\bgithub actions\b', 'GHA'),
-            (r'\bebs volume\b', 'EBS Volume'),
-            (r'\bebs volumes\b', 'EBS Volume'),
-            (r'\bcert-manager\b', 'cert-manager'),
-            (r'\bairflow-dpi\b', 'airflow-dpi'),
-            (r'\bsimple-machine\b', 'simple-machine'),
-            # Add additional patterns if necessary
-        ]
-
-        for pattern, category in patterns:
-            match = re.search(pattern, summary_lower)
+
+    def __init__(self, patterns, default='Other', max_cache=100000):
+        self.default = default
+        self.max_cache = max_cache
+        self._rules = [(re.compile(pattern), category) for pattern, category in patterns]
+        keywords = [_required_literal(pattern) for pattern, _ in patterns]
+        if not all(keywords):
+            raise ValueError("Every alert pattern needs a literal keyword for the prefilter")
+        unique = sorted(set(keywords))
+        # Lookahead over a keyword trie reports the longest keyword starting at each
+        # position; shorter keywords contained in a hit are implied instead of rescanned
+        self._scanner = re.compile(f'(?=({_trie_regex(unique)}))')
+        self._implied = {kw: frozenset(k for k in unique if k in kw) for kw in unique}
+        self._rules_by_keyword = {kw: [] for kw in unique}
+        for position, keyword in enumerate(keywords):
+            self._rules_by_keyword[keyword].append(position)
+        self._candidates = {}  # frozenset of scanner hits -> rule positions
+        self._cache = {}
+
+    def candidates(self, text):
+        """Positions of the rules that can match the lowercased text, in precedence order."""
+        hits = frozenset(self._scanner.findall(text))
+        positions = self._candidates.get(hits)
+        if positions is None:
+            found = set()
+            for hit in hits:
+                found |= self._implied[hit]
+            positions = self._candidates[hits] = tuple(sorted(
+                position for keyword in found for position in self._rules_by_keyword[keyword]
+            ))
+        return positions
+
+    def classify(self, summary):
+        text = str(summary).lower()
+        label = self._cache.get(text)
+        if label is None:
+            if len(self._cache) >= self.max_cache:
+                self._cache.clear()
+            label = self._cache[text] = self._resolve(text)
+        return label
+
+    def _resolve(self, text):
+        for position in self.candidates(text):
+            pattern, category = self._rules[position]
+            match = pattern.search(text)
             if match:
-                if callable(category):
-                    return category(match)
-                else:
-                    return category
+                return category(match) if callable(category) else category
+        return self.default
+
+    def classify_series(self, summaries):
+        """Classify a Series of summaries, resolving each distinct value once."""
+        return summaries.map(self.classify)
+
+
+_classifier = None
 
-        return 'Other'
 
-    df['Alert Type'] = df['Summary'].apply(get_alert_type)
+def get_alert_classifier():
+    """Shared AlertClassifier for ALERT_PATTERNS (compiled on first use)."""
+    global _classifier
+    if _classifier is None:
+        _classifier = AlertClassifier(ALERT_PATTERNS)
+    return _classifier
+
+
+def classify_alerts(df):
+    """
+    Function to classify alerts based on patterns in the 'Summary' field.
+    """
+    df['Alert Type'] = get_alert_classifier().classify_series(df['Summary'])
 
     # Вывод тикетов из категории 'Other' для анализа
     others = df[df['Alert Type'] == 'Other']
@@ -4,11 +4,10 @@ import os
 import sys
 import pandas as pd
 import argparse
-from jira import JIRA
 
 # Add parent directory to Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN, JIRA_PROJECT, REPORT_DAYS
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PARENT_DIR)
 
 def load_data(file_path):
     """
@@ -24,14 +23,16 @@ def load_data(file_path):
 def fetch_jira_data():
     """
     Fetch data from Jira API.
+    Reads through JiraHandler (same query and projection as the bot's
+    'all_tickets'), so the shared disk cache answers it when the bot already fetched it.
     """
-    jira = JIRA(
-        server=JIRA_URL,
-        basic_auth=(JIRA_EMAIL, JIRA_API_TOKEN)
-    )
-    
-    jql = f'project = {JIRA_PROJECT} AND created >= -{REPORT_DAYS}d ORDER BY createdDate DESC'
-    issues = jira.search_issues(jql_str=jql, maxResults=False)
+    # jira_handler imports modules that share names with script_old ones
+    # (data_cleaning, classification), so the parent directory must win here
+    if sys.path[0] != PARENT_DIR:
+        sys.path.insert(0, PARENT_DIR)
+    from jira_handler import JiraHandler
+
+    issues = JiraHandler().get_all_ticket_issues()
     
     records = []
     for issue in issues:
@@ -52,12 +53,16 @@ def main():
     parser = argparse.ArgumentParser(description='Fetch and save Jira data')
     parser.add_argument('--out', required=True, help='Output JSON file path')
     args = parser.parse_args()
-    
-    # Fetch data from Jira
-    df = fetch_jira_data()
-    
-    # Save to JSON
-    df.to_json(args.out, orient='records', date_format='iso')
+
+    # Part of the bot's trace when run by legacy_runner
+    import tracing
+    with tracing.trace_from_env('legacy data_loader'):
+        # Fetch data from Jira
+        df = fetch_jira_data()
+
+        # Save to JSON
+        with tracing.span('write_dump'):
+            df.to_json(args.out, orient='records', date_format='iso')
     print(f"Data saved to {args.out}")
 
 if __name__ == '__main__':
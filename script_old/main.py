@@ -8,17 +8,33 @@ import matplotlib.pyplot as plt
 
 # Add parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from data_loader import load_data
-from data_cleaning import clean_data
-from classification import classify_alerts, define_priority
-from visualization import (
-    plot_priority_levels,
-    plot_priority_pie,
-    plot_alert_types_with_priority,
-    plot_user_requests_by_priority,
-    plot_p1_alerts,
-    plot_cancellation_reasons
-)
+try:
+    # Imported as script_old.main (in-process legacy mode)
+    from .data_loader import load_data
+    from .data_cleaning import clean_data
+    from .classification import classify_alerts, define_priority
+    from .visualization import (
+        plot_priority_levels,
+        plot_priority_pie,
+        plot_alert_types_with_priority,
+        plot_user_requests_by_priority,
+        plot_p1_alerts,
+        plot_cancellation_reasons
+    )
+except ImportError:
+    # Run as a script: siblings are top-level modules
+    from data_loader import load_data
+    from data_cleaning import clean_data
+    from classification import classify_alerts, define_priority
+    from visualization import (
+        plot_priority_levels,
+        plot_priority_pie,
+        plot_alert_types_with_priority,
+        plot_user_requests_by_priority,
+        plot_p1_alerts,
+        plot_cancellation_reasons
+    )
+import tracing
 
 def generate_cancellation_file(df, output_file):
     """
@@ -132,48 +148,56 @@ def define_priority(df):
     # if you need to filter P1 tickets
     return df
 
+# Legacy charts: output file -> visualization function drawing it
+LEGACY_CHARTS = {
+    'priority_distribution.png': 'plot_priority_levels',
+    'cluster_distribution.png': 'plot_alert_types_with_priority',
+    'namespace_distribution.png': 'plot_user_requests_by_priority',
+    'weekly_trend.png': 'plot_priority_pie',
+    'p1_alerts.png': 'plot_p1_alerts',
+}
+
+def draw_legacy_chart(df, plot):
+    """
+    Draw one legacy chart (a LEGACY_CHARTS function name) and return its figure.
+    Also used as the chart service's 'legacy' drawer.
+    """
+    plot_functions = {
+        'plot_priority_levels': plot_priority_levels,
+        'plot_alert_types_with_priority': plot_alert_types_with_priority,
+        'plot_user_requests_by_priority': plot_user_requests_by_priority,
+        'plot_priority_pie': plot_priority_pie,
+        'plot_p1_alerts': plot_p1_alerts,
+    }
+    if df.empty:
+        # An empty window: the plots cannot draw nothing (the pie fails on it)
+        return _message_figure('No tickets in the current period')
+    fig = plot_functions[plot](df)
+    if fig is None:
+        # Only P1 alerts can be empty: create an empty figure with a message
+        fig = _message_figure('No P1 alerts in the current period')
+    return fig
+
+def _message_figure(message):
+    fig = plt.figure(figsize=(8, 4))
+    plt.axis('off')
+    plt.text(0.5, 0.5, message,
+            horizontalalignment='center',
+            verticalalignment='center',
+            transform=plt.gca().transAxes,
+            fontsize=14)
+    plt.tight_layout()
+    return fig
+
 def generate_report(df, outdir):
     """
     Generate all report visualizations and save them to the output directory.
     """
     os.makedirs(outdir, exist_ok=True)
     
-    # Priority Distribution
-    fig = plot_priority_levels(df)
-    fig.savefig(os.path.join(outdir, 'priority_distribution.png'), bbox_inches='tight')
-    plt.close(fig)
-    
-    # Cluster Distribution
-    fig = plot_alert_types_with_priority(df)
-    fig.savefig(os.path.join(outdir, 'cluster_distribution.png'), bbox_inches='tight')
-    plt.close(fig)
-    
-    # Namespace Distribution
-    fig = plot_user_requests_by_priority(df)
-    fig.savefig(os.path.join(outdir, 'namespace_distribution.png'), bbox_inches='tight')
-    plt.close(fig)
-    
-    # Weekly Trend
-    fig = plot_priority_pie(df)
-    fig.savefig(os.path.join(outdir, 'weekly_trend.png'), bbox_inches='tight')
-    plt.close(fig)
-    
-    # P1 Alerts
-    fig = plot_p1_alerts(df)
-    if fig is not None:  # Only save if we have P1 alerts
-        fig.savefig(os.path.join(outdir, 'p1_alerts.png'), bbox_inches='tight')
-        plt.close(fig)
-    else:
-        # Create an empty figure with a message
-        fig = plt.figure(figsize=(8, 4))
-        plt.axis('off')
-        plt.text(0.5, 0.5, 'No P1 alerts in the current period', 
-                horizontalalignment='center',
-                verticalalignment='center',
-                transform=plt.gca().transAxes,
-                fontsize=14)
-        plt.tight_layout()
-        fig.savefig(os.path.join(outdir, 'p1_alerts.png'), bbox_inches='tight')
+    for filename, plot in LEGACY_CHARTS.items():
+        fig = draw_legacy_chart(df, plot)
+        fig.savefig(os.path.join(outdir, filename), bbox_inches='tight')
         plt.close(fig)
 
 def main():
@@ -181,23 +205,28 @@ def main():
     parser.add_argument('--dump', required=True, help='Input JSON file path')
     parser.add_argument('--outdir', required=True, help='Output directory for visualizations')
     args = parser.parse_args()
-    
-    # Load data
-    df = pd.read_json(args.dump)
-    df = align_columns(df)
-    
-    # Process data
-    df = clean_data(df)
-    df = classify_alerts(df)
-    df = define_priority(df)
-    
-    # Print some debug information
-    print("\nDataFrame columns:", df.columns.tolist())
-    print("\nUnique Alert Types:", df['alert type'].unique())
-    print("\nUnique Priority Levels:", df['Priority Level'].unique())
-    
-    # Generate visualizations
-    generate_report(df, args.outdir)
+
+    # Part of the bot's trace when run by legacy_runner
+    with tracing.trace_from_env('legacy report'):
+        # Load data
+        with tracing.span('load_dump'):
+            df = pd.read_json(args.dump)
+        df = align_columns(df)
+
+        # Process data
+        with tracing.span('classify'):
+            df = clean_data(df)
+            df = classify_alerts(df)
+            df = define_priority(df)
+
+        # Print some debug information
+        print("\nDataFrame columns:", df.columns.tolist())
+        print("\nUnique Alert Types:", df['alert type'].unique())
+        print("\nUnique Priority Levels:", df['Priority Level'].unique())
+
+        # Generate visualizations
+        with tracing.span('charts'):
+            generate_report(df, args.outdir)
     print(f"Visualizations saved to {args.outdir}")
 
 if __name__ == '__main__':
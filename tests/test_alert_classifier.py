@@ -0,0 +1,54 @@
+import re
+
+import pandas as pd
+import pytest
+
+from benchmarks.classifier_bench import make_summaries
+from script_old.classification import ALERT_PATTERNS, AlertClassifier, classify_alerts
+
+
+def reference_alert_type(summary):
+    """The rule list applied the original way: every rule in order through re.search."""
+    summary_lower = str(summary).lower()
+    for pattern, category in ALERT_PATTERNS:
+        match = re.search(pattern, summary_lower)
+        if match:
+            return category(match) if callable(category) else category
+    return 'Other'
+
+
+@pytest.mark.parametrize('summary', [
+    'MBT nightly job failed',
+    'submbtx',  # keyword inside a word: the unanchored 'mbt' rule still wins
+    'Team change request for VPN',
+    'team change',
+    'CPU utilization above 90% on host-7 and more',
+    'CPU utilization above threshold',
+    'Outage reporting for checkout-api',
+    'kube_cluster_name:custom-cluster restarted',
+    'kube_cluster_name:wiz-finding',
+    'wizard',  # contains 'wiz' but not the word
+    'Wiz finding critical',
+    'EBS volumes low',
+    'staging cdp and de-airflow-staging',
+    '[Datadog] latency',
+    '',
+    None,
+])
+def test_rule_precedence_and_captures_match_the_rule_loop(summary):
+    assert AlertClassifier(ALERT_PATTERNS).classify(summary) == reference_alert_type(summary)
+
+
+def test_synthetic_summaries_match_the_rule_loop():
+    summaries = make_summaries(20000, seed=11)
+    expected = summaries.map(reference_alert_type)
+    classifier = AlertClassifier(ALERT_PATTERNS)
+    pd.testing.assert_series_equal(classifier.classify_series(summaries), expected)
+    # Memoized labels are the same as freshly resolved ones
+    pd.testing.assert_series_equal(classifier.classify_series(summaries), expected)
+
+
+def test_classify_alerts_labels_the_summary_column(capsys):
+    df = pd.DataFrame({'Issue key': ['ISD-1', 'ISD-2'], 'Summary': ['snyk issue', 'disk full']})
+    assert classify_alerts(df)['Alert Type'].tolist() == ['Snyk', 'Other']
+    assert 'ISD-2' in capsys.readouterr().out
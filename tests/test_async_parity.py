@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+import confluence_handler
+import jira_backends
+import jira_handler
+from async_data import fetch_report_data
+from benchmarks.fake_atlassian import FakeAtlassian
+from confluence_handler import ConfluenceHandler
+from jira_handler import JiraHandler
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeAtlassian(tickets=300).start()
+    for module in (jira_backends, confluence_handler):
+        monkeypatch.setattr(module, 'JIRA_URL', fake.url)
+        monkeypatch.setattr(module, 'JIRA_EMAIL', 'test@example.invalid')
+        monkeypatch.setattr(module, 'JIRA_API_TOKEN', 'test')
+        monkeypatch.setattr(module, 'JIRA_BACKEND', 'live')
+    # Each handler fetches from the server: nothing shared on disk
+    monkeypatch.setattr(jira_handler, 'ENABLE_DISK_CACHE', False)
+    monkeypatch.setattr(jira_handler, 'ENABLE_ISSUE_STORE', False)
+    yield fake
+    fake.stop()
+
+
+def _handlers():
+    return JiraHandler(), ConfluenceHandler()
+
+
+def test_concurrent_sections_match_sequential_calls(fake):
+    jira, confluence = _handlers()
+    counts = jira.get_alert_term_counts()
+    expected = {
+        'tickets': jira.get_all_tickets(),
+        'troubleshooting': jira.get_initial_troubleshooting_metrics(),
+        'cluster_counts': counts['cluster_counts'],
+        'namespace_counts': counts['namespace_counts'],
+        'source_counts': counts['source_counts'],
+        'postmortems': confluence.get_recent_postmortems(),
+    }
+
+    data = fetch_report_data(*_handlers(), concurrency=4)
+
+    assert data.keys() == expected.keys()
+    pd.testing.assert_frame_equal(data.pop('tickets'), expected.pop('tickets'))
+    assert data == expected
+    assert expected['postmortems'] and any(expected['cluster_counts'].values())
@@ -0,0 +1,65 @@
+from jira import JIRA
+from jira.resources import Issue
+
+from jira_handler import JiraHandler
+
+OPTIONS = dict(JIRA.DEFAULT_OPTIONS, server='http://jira.invalid')
+
+
+def _history(number):
+    return {
+        'id': str(number), 'created': f'2026-10-{number:02d}T10:00:00.000+0000',
+        'author': {'accountId': 'u1', 'displayName': 'Operator'},
+        'items': [{'field': 'priority', 'fromString': f'P{number}', 'toString': f'P{number + 1}'}],
+    }
+
+
+def _issue(histories, total):
+    raw = {
+        'id': '1', 'key': 'ISD-1', 'self': '',
+        'fields': {
+            'summary': 'alert', 'description': '', 'priority': {'name': 'High'}, 'status': {'name': 'Open'},
+            'assignee': None, 'resolution': None,
+            'created': '2026-10-01T09:00:00.000+0000', 'updated': '2026-10-05T09:00:00.000+0000',
+        },
+        'changelog': {'startAt': 0, 'maxResults': len(histories), 'total': total, 'histories': histories},
+    }
+    return Issue(OPTIONS, None, raw=raw)
+
+
+def _handler(full_changelog):
+    handler = JiraHandler.__new__(JiraHandler)
+    handler._priority_history = {}
+    handler.fetched = []
+
+    def fetch(issue_key):
+        handler.fetched.append(issue_key)
+        return full_changelog
+    handler._fetch_changelog = fetch
+    return handler
+
+
+def test_truncated_inline_changelog_is_fetched_in_full():
+    full = _issue([_history(n) for n in range(1, 5)], total=4)
+    handler = _handler(full.changelog)
+    handler._to_dataframe([_issue([_history(n) for n in range(1, 3)], total=4)])
+
+    assert handler.fetched == ['ISD-1']
+    assert [change['priority'] for change in handler.get_priority_history('ISD-1')] == \
+        ['P1->P2', 'P2->P3', 'P3->P4', 'P4->P5']
+
+
+def test_complete_inline_changelog_costs_no_request():
+    handler = _handler(None)
+    handler._to_dataframe([_issue([_history(n) for n in range(1, 3)], total=2)])
+
+    assert handler.fetched == []
+    assert len(handler.get_priority_history('ISD-1')) == 2
+
+
+def test_failed_fetch_keeps_the_inline_changelog():
+    handler = _handler(None)
+    handler._to_dataframe([_issue([_history(1)], total=3)])
+
+    assert handler.fetched == ['ISD-1']
+    assert len(handler.get_priority_history('ISD-1')) == 1
@@ -0,0 +1,29 @@
+import threading
+
+from jira import JIRA
+from jira.resources import Issue
+
+from jira_handler import INDEX_FIELDS, JiraHandler
+
+
+def test_triaged_index_fetches_only_what_it_reads():
+    handler = JiraHandler.__new__(JiraHandler)
+    handler._store = None
+    handler._index_cache = None
+    handler._index_lock = threading.Lock()
+    searches = []
+
+    def paginate(jql, fields, expand='changelog', cached=True):
+        searches.append((fields, expand))
+        raw = {'id': '1', 'key': 'ISD-1', 'self': '', 'fields': {
+            'summary': 'apps-prod-01 down', 'description': 'cdp-staging', 'status': {'name': 'Open'},
+            'assignee': None, 'updated': '2026-10-14T09:00:00.000+0000',
+        }}
+        return [Issue(dict(JIRA.DEFAULT_OPTIONS, server='http://jira.invalid'), None, raw=raw)]
+    handler._paginate = paginate
+
+    index = handler._triaged_index()
+
+    assert searches == [(INDEX_FIELDS, None)]
+    assert sorted(INDEX_FIELDS) == ['assignee', 'description', 'status', 'summary', 'updated']
+    assert index.count_terms(['apps-prod-01', 'cdp-staging', 'wiz']) == {'apps-prod-01': 1, 'cdp-staging': 1, 'wiz': 0}
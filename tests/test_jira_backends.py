@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+import jira_backends
+import jira_handler
+from benchmarks.fake_atlassian import FakeAtlassian
+from jira_backends import RecordingJira, ReplayJira
+from jira_handler import JiraHandler
+
+# Every public JiraHandler query, with its arguments
+QUERIES = [
+    ('get_window_probe', ()),
+    ('get_all_ticket_issues', ()),
+    ('get_all_tickets', ()),
+    ('get_p1_tickets', ()),
+    ('get_unclassified_tickets', ()),
+    ('get_priority_distribution', ()),
+    ('get_cluster_distribution', ()),
+    ('get_namespace_distribution', ()),
+    ('get_initial_troubleshooting_metrics', ()),
+    ('get_alert_term_counts', ()),
+    ('get_cluster_alert_counts', ()),
+    ('get_namespace_alert_counts', ()),
+    ('get_source_alert_counts', ()),
+    ('get_weekly_trend', (5,)),
+    ('get_weekly_cluster_matrices', (5,)),
+    ('get_weekly_valid_alerts_by_cluster', (5,)),
+    ('get_weekly_canceled_alerts_by_cluster', (5,)),
+    ('get_priority_history', ()),
+]
+
+
+def test_replay_without_fixture_fails_fast(tmp_path, monkeypatch):
+    missing = str(tmp_path / 'jira_fixture.jsonl.gz')
+    monkeypatch.setattr(jira_backends, 'JIRA_FIXTURE_PATH', missing)
+    with pytest.raises(FileNotFoundError, match='JIRA_BACKEND=record'):
+        jira_backends.create_jira_client('replay')
+
+
+def _comparable(value):
+    if isinstance(value, list) and value and hasattr(value[0], 'key'):
+        return [issue.key for issue in value]
+    return value
+
+
+def _assert_same(name, recorded, replayed):
+    if isinstance(recorded, dict):
+        assert recorded.keys() == replayed.keys(), name
+        for key in recorded:
+            _assert_same(f'{name}[{key}]', recorded[key], replayed[key])
+    elif isinstance(recorded, pd.DataFrame):
+        pd.testing.assert_frame_equal(recorded, replayed, obj=name)
+    elif isinstance(recorded, pd.Series):
+        pd.testing.assert_series_equal(recorded, replayed, obj=name)
+    else:
+        assert _comparable(recorded) == _comparable(replayed), name
+
+
+def test_replay_answers_every_query_like_the_recorded_server(tmp_path, monkeypatch):
+    path = str(tmp_path / 'jira_fixture.jsonl.gz')
+    # Tickets well inside the report window, so the seconds between recording
+    # and replaying cannot move one across a window or week edge
+    fake = FakeAtlassian(tickets=300, days=6).start()
+    monkeypatch.setattr(jira_backends, 'JIRA_URL', fake.url)
+    monkeypatch.setattr(jira_backends, 'JIRA_EMAIL', 'test@example.invalid')
+    monkeypatch.setattr(jira_backends, 'JIRA_API_TOKEN', 'test')
+    monkeypatch.setattr(jira_handler, 'ENABLE_DISK_CACHE', False)
+    monkeypatch.setattr(jira_handler, 'ENABLE_ISSUE_STORE', False)
+    try:
+        monkeypatch.setattr(jira_handler, 'create_jira_client',
+                            lambda: RecordingJira(jira_backends.create_jira_client('live'), path))
+        recording = JiraHandler()
+        recorded = {name: getattr(recording, name)(*args) for name, args in QUERIES}
+    finally:
+        fake.stop()
+
+    monkeypatch.setattr(jira_handler, 'create_jira_client', lambda: ReplayJira(path, shift_time=False))
+    replaying = JiraHandler()
+    replayed = {name: getattr(replaying, name)(*args) for name, args in QUERIES}
+
+    # The fixture exercises the filters: some tickets are untriaged, some P1
+    total, untriaged, _ = recorded['get_initial_troubleshooting_metrics']
+    assert 0 < untriaged < total and len(recorded['get_p1_tickets'])
+    for name, _ in QUERIES:
+        _assert_same(name, recorded[name], replayed[name])
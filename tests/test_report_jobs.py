@@ -0,0 +1,28 @@
+import threading
+
+import report_jobs
+from report_jobs import ReportQueue
+
+
+def test_slow_delivery_does_not_hold_up_the_next_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_jobs, 'JOB_DIR', str(tmp_path))
+    release = threading.Event()
+    built = []
+
+    def build(job):
+        built.append(job.params['week'])
+        return f"report-{job.params['week']}.pdf"
+
+    def slow_upload(job):
+        release.wait(5)
+
+    queue = ReportQueue(build, workers=1, delivery_workers=2)
+    first, _, _ = queue.submit({'week': 1}, on_done=slow_upload)
+    second, _, _ = queue.submit({'week': 2})
+
+    # The second build runs while the upload of the first is still going
+    assert second.done.wait(5) and second.result == 'report-2.pdf'
+    assert not first.done.is_set() and first.stage == 'done'
+    release.set()
+    assert first.done.wait(5) and first.result == 'report-1.pdf'
+    assert built == [1, 2]
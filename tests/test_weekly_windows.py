@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jira import JIRA
+from jira.resources import Issue
+
+from jira_handler import JiraHandler
+
+NOW = datetime(2026, 10, 14, 9, 30, tzinfo=timezone.utc)
+NOC_FIELD = 'customfield_10050'
+WEEKS = 5
+
+
+def _issue(number, created):
+    raw = {
+        'id': str(number), 'key': f'ISD-{number}', 'self': '',
+        'fields': {
+            'summary': 'alert', 'description': '', 'status': {'name': 'Open'}, 'assignee': None,
+            # A non-UTC Jira user: timestamps carry the user's offset
+            'created': created.astimezone(timezone(timedelta(hours=-5))).strftime('%Y-%m-%dT%H:%M:%S.000%z'),
+            NOC_FIELD: {'displayName': 'noc'},
+        },
+    }
+    return Issue(dict(JIRA.DEFAULT_OPTIONS, server='http://jira.invalid'), None, raw=raw)
+
+
+@pytest.fixture
+def handler():
+    handler = JiraHandler.__new__(JiraHandler)
+    handler._noc_field = NOC_FIELD
+    return handler
+
+
+def _weeks_of(handler, created_times):
+    issues = [_issue(number, created) for number, created in enumerate(created_times, 1)]
+    handler._paginate = lambda jql, fields, expand=None: issues
+    frame, edges, _ = handler._weekly_frame(WEEKS, NOW)
+    return dict(zip(frame['key'], frame['week'])), edges
+
+
+def test_weekly_jql_counts_back_from_now(handler):
+    seen = {}
+
+    def paginate(jql, fields, expand=None):
+        seen['jql'] = jql
+        return []
+    handler._paginate = paginate
+    handler._weekly_frame(WEEKS, NOW)
+    assert f'created >= -{7 * WEEKS}d' in seen['jql']
+    assert '"' not in seen['jql']  # no absolute dates, which Jira reads in the user's timezone
+
+
+def test_tickets_next_to_each_edge_land_in_adjacent_weeks(handler):
+    second = timedelta(seconds=1)
+    boundaries = [NOW - timedelta(days=7 * k) for k in range(WEEKS, -1, -1)]
+    times = []
+    for boundary in boundaries:
+        times += [boundary - second, boundary + second]
+    weeks, edges = _weeks_of(handler, times)
+
+    assert [edge.to_pydatetime() for edge in edges] == [b.replace(tzinfo=None) for b in boundaries]
+    expected = []
+    for k in range(WEEKS + 1):
+        # just before edge k is week k-1, just after it week k; beyond either end
+        # (Jira's clock / query time) the ticket counts in the outermost week
+        expected += [min(max(k - 1, 0), WEEKS - 1), min(k, WEEKS - 1)]
+    assert [weeks[f'ISD-{number}'] for number in range(1, len(times) + 1)] == expected
+
+
+def test_no_ticket_is_dropped(handler):
+    times = [NOW - timedelta(days=days, minutes=1) for days in range(7 * WEEKS)]
+    weeks, _ = _weeks_of(handler, times)
+    assert len(weeks) == len(times)
+    assert sorted(set(weeks.values())) == list(range(WEEKS))
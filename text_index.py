@@ -0,0 +1,56 @@
+import re
+from collections import defaultdict
+
+# Jira's text search splits on anything that is not a letter or digit
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase text and split it into alphanumeric tokens."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class TextIndex:
+    """
+    Positional inverted index over ticket text.
+
+    Answers `text ~ "term"` style lookups in-process: a term matches a document
+    when its tokens appear consecutively, so "apps-prod-01" matches
+    "... apps-prod-01 ..." but not "apps ... prod".
+    """
+
+    def __init__(self):
+        # token -> {doc_id: [positions]}
+        self._postings = defaultdict(dict)
+
+    def add(self, doc_id, text: str):
+        """Index one document."""
+        for pos, token in enumerate(tokenize(text)):
+            self._postings[token].setdefault(doc_id, []).append(pos)
+
+    def lookup(self, term: str) -> set:
+        """Return ids of documents containing the term as a phrase."""
+        tokens = tokenize(term)
+        if not tokens or tokens[0] not in self._postings:
+            return set()
+        first = self._postings[tokens[0]]
+        if len(tokens) == 1:
+            return set(first)
+
+        docs = set(first)
+        for token in tokens[1:]:
+            docs &= self._postings.get(token, {}).keys()
+        matched = set()
+        for doc in docs:
+            starts = set(first[doc])
+            for offset, token in enumerate(tokens[1:], start=1):
+                starts &= {pos - offset for pos in self._postings[token][doc]}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc)
+        return matched
+
+    def count_terms(self, terms) -> dict[str, int]:
+        """Number of matching documents for each term."""
+        return {term: len(self.lookup(term)) for term in terms}
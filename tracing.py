@@ -0,0 +1,299 @@
+import contextvars
+import glob
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import ENABLE_TRACING, TRACE_DIR, TRACE_KEEP, TRACE_MAX_SPANS
+
+logger = logging.getLogger(__name__)
+
+# Environment variable carrying the trace context into subprocesses (W3C traceparent format)
+TRACEPARENT_ENV = 'TRACEPARENT'
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+_current = contextvars.ContextVar('tracing_span', default=None)
+# Process label shown in the trace viewer (subprocesses name themselves in trace_from_env)
+_process = 'pep-bot'
+
+
+class Span:
+    """One timed operation of a trace; parent_id links it to the span it ran under."""
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start', 'end', 'attrs',
+                 'pid', 'tid', 'thread', 'process')
+
+    def __init__(self, name: str, trace_id: str, parent_id: str = None, attrs: dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end = None
+        self.attrs = dict(attrs or {})
+        self.pid = os.getpid()
+        self.tid = threading.get_native_id()
+        self.thread = threading.current_thread().name
+        self.process = _process
+
+    def set(self, **attrs):
+        """Attach attributes (issue counts, cache hits, ...) to the span."""
+        self.attrs.update(attrs)
+
+    @property
+    def traceparent(self) -> str:
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _NoopSpan:
+    """Stands in for a span outside of any trace, so callers never check for None."""
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Trace:
+    def __init__(self):
+        self.spans = []
+        self.dropped = 0
+
+
+# trace id -> finished spans of the traces collected by this process
+_traces = {}
+_lock = threading.Lock()
+
+
+def _record(span: dict):
+    with _lock:
+        trace = _traces.get(span['trace_id'])
+        if trace is None:
+            return  # already exported, or collected by another process
+        if len(trace.spans) < TRACE_MAX_SPANS:
+            trace.spans.append(span)
+        else:
+            trace.dropped += 1
+
+
+def current() -> Span:
+    """Span the calling code runs under (None outside of a trace)."""
+    return _current.get()
+
+
+@contextmanager
+def activate(span: Span):
+    """Run a block under `span` (e.g. a job's trace on a worker thread); None runs it untraced."""
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+def start_trace(name: str, **attrs) -> Span:
+    """
+    Open the root span of a new trace and start collecting its spans.
+    Returns None when tracing is off; finish_trace() ends and exports it.
+    """
+    if not ENABLE_TRACING:
+        return None
+    root = Span(name, secrets.token_hex(16), attrs=attrs)
+    with _lock:
+        _traces[root.trace_id] = _Trace()
+    return root
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a block as a child of the current span. Outside of a trace this does
+    nothing (and yields a span whose set() is a no-op).
+    """
+    parent = _current.get()
+    if parent is None:
+        yield _NOOP
+        return
+    child = Span(name, parent.trace_id, parent.span_id, attrs)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attrs['error'] = repr(e)
+        raise
+    finally:
+        _current.reset(token)
+        child.end = time.time()
+        _record(child.to_dict())
+
+
+def add_span(name: str, start: float, end: float, pid: int = None, tid: int = None,
+             process: str = None, **attrs):
+    """
+    Record an already finished operation (time.time() bounds) under the current
+    span, e.g. work a pool process timed and reported back.
+    """
+    parent = _current.get()
+    if parent is None:
+        return
+    child = Span(name, parent.trace_id, parent.span_id, attrs)
+    child.start, child.end = start, end
+    if pid is not None:
+        child.pid, child.tid = pid, tid if tid is not None else pid
+        child.thread = process or child.thread
+        child.process = process or child.process
+    _record(child.to_dict())
+
+
+def bind(fn):
+    """Wrap fn to run in (a copy of) the caller's context, for thread pools that do not copy it."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A Context can only be entered by one thread at a time; give each call its own copy
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def subprocess_env(env: dict = None) -> dict:
+    """Environment for a subprocess, with the current span as its TRACEPARENT."""
+    env = dict(os.environ if env is None else env)
+    parent = _current.get()
+    if parent is not None:
+        env[TRACEPARENT_ENV] = parent.traceparent
+    else:
+        env.pop(TRACEPARENT_ENV, None)
+    return env
+
+
+def _part_pattern(trace_id: str) -> str:
+    return os.path.join(TRACE_DIR, f'.{trace_id}.*.part')
+
+
+@contextmanager
+def trace_from_env(name: str, **attrs):
+    """
+    Continue the parent's trace in a subprocess (legacy scripts): the block
+    becomes a span under the TRACEPARENT span, and the spans recorded here are
+    left in TRACE_DIR for the parent to merge into its trace file.
+    """
+    global _process
+    match = _TRACEPARENT.match(os.environ.get(TRACEPARENT_ENV, ''))
+    if not ENABLE_TRACING or match is None:
+        yield _NOOP
+        return
+    _process = name
+    trace_id, parent_id = match.groups()
+    with _lock:
+        _traces[trace_id] = _Trace()
+    root = Span(name, trace_id, parent_id, attrs)
+    try:
+        with activate(root):
+            yield root
+    finally:
+        root.end = time.time()
+        _record(root.to_dict())
+        with _lock:
+            trace = _traces.pop(trace_id)
+        try:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            with open(_part_pattern(trace_id).replace('*', str(os.getpid())), 'w') as handle:
+                json.dump(trace.spans, handle, default=str)
+        except OSError as e:
+            logger.warning(f"Cannot write trace spans: {e}")
+
+
+def chrome_trace(spans, name: str = '', dropped: int = 0) -> dict:
+    """
+    Spans in the Chrome trace event format (chrome://tracing, Perfetto,
+    speedscope): one complete ('X') event per span, one row per process/thread.
+    """
+    origin = min((span['start'] for span in spans), default=0)
+    events = []
+    processes, threads = {}, {}
+    for span in sorted(spans, key=lambda span: span['start']):
+        processes.setdefault(span['pid'], span['process'])
+        threads.setdefault((span['pid'], span['tid']), span['thread'])
+        end = span['end'] if span['end'] is not None else span['start']
+        events.append({
+            'name': span['name'],
+            'cat': span['process'],
+            'ph': 'X',
+            'ts': round((span['start'] - origin) * 1e6, 1),
+            'dur': round((end - span['start']) * 1e6, 1),
+            'pid': span['pid'],
+            'tid': span['tid'],
+            'args': {**span['attrs'], 'span_id': span['span_id'], 'parent_id': span['parent_id']},
+        })
+    for pid, process in processes.items():
+        events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f'{process} ({pid})'}})
+    for (pid, tid), thread in threads.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread}})
+    return {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'otherData': {
+            'trace_id': spans[0]['trace_id'] if spans else '',
+            'name': name,
+            'started_at': datetime.fromtimestamp(origin).isoformat(timespec='milliseconds') if spans else '',
+            'dropped_spans': dropped,
+        },
+    }
+
+
+def _prune(keep: int):
+    files = sorted(glob.glob(os.path.join(TRACE_DIR, '*.json')), key=os.path.getmtime)
+    for path in files[:max(0, len(files) - keep)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def finish_trace(root: Span) -> str:
+    """
+    End a trace started with start_trace(): merge the spans its subprocesses
+    left behind and write everything to TRACE_DIR as a Chrome trace file.
+    Returns the file path (None if tracing is off or the trace was already finished).
+    """
+    if root is None:
+        return None
+    root.end = time.time()
+    _record(root.to_dict())
+    with _lock:
+        trace = _traces.pop(root.trace_id, None)
+    if trace is None:
+        return None
+    spans = trace.spans
+    for part in glob.glob(_part_pattern(root.trace_id)):
+        try:
+            with open(part) as handle:
+                spans.extend(json.load(handle))
+            os.remove(part)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot merge trace spans from {part}: {e}")
+
+    stamp = datetime.fromtimestamp(root.start).strftime('%Y%m%d-%H%M%S')
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '-', root.name).strip('-') or 'trace'
+    path = os.path.join(TRACE_DIR, f'{stamp}-{slug}-{root.trace_id[:8]}.json')
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as handle:
+            json.dump(chrome_trace(spans, root.name, trace.dropped), handle, default=str)
+        os.replace(tmp_path, path)
+        _prune(TRACE_KEEP)
+    except OSError as e:
+        logger.warning(f"Cannot write trace file: {e}")
+        return None
+    logger.info(f"Trace of {root.name} ({len(spans)} spans, {root.end - root.start:.1f}s) written to {path}")
+    return path
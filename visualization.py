@@ -1,111 +1,87 @@
 import matplotlib
-matplotlib.use('Agg')  # Must be called before importing pyplot
-import matplotlib.pyplot as plt
+matplotlib.use('Agg')  # Must be called before importing pyplot (the legacy drawers still use it)
+from matplotlib.artist import setp
+from matplotlib.figure import Figure
 import pandas as pd
-import os
 from config import CHART_DIR
+from data_cleaning import observed_counts
+from chart_service import ChartSpec, get_chart_service
 
-def plot_priority_levels(df: pd.DataFrame) -> str:
-    """
-    Creates a pie chart for priorities and saves it to CHART_DIR,
-    returns the path to the PNG file.
-    """
-    series = df['priority'].value_counts()
-    fig, ax = plt.subplots()
+# --- Drawers: (data, **options) -> Figure, run by the chart service ---------- #
+# Drawers build plain Figures rather than going through pyplot, so nothing keeps
+# a reference to a chart once the service has saved it.
+
+def draw_bar(data: dict, title: str = None, xlabel: str = '', ylabel: str = 'Count',
+             figsize=None, rotation=None, ha='center', color=None, tight_layout=False):
+    """Bar chart of a {label: count} mapping."""
+    series = pd.Series(dict(data))
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    series.plot.bar(ax=ax, color=color)
+    if title:
+        ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    if rotation is not None:
+        setp(ax.get_xticklabels(), rotation=rotation, ha=ha)
+    if tight_layout:
+        fig.tight_layout()
+    return fig
+
+def draw_donut(data: dict):
+    """Donut chart of a {label: value} mapping."""
+    fig = Figure()
+    ax = fig.subplots()
+    ax.pie(list(data.values()), labels=list(data.keys()), autopct='%1.1f%%', startangle=90, wedgeprops={'width':0.3})
+    ax.axis('equal')
+    return fig
+
+def draw_pie(data: dict):
+    """Pie chart of a {label: count} mapping."""
+    series = pd.Series(dict(data))
+    fig = Figure()
+    ax = fig.subplots()
     series.plot.pie(
         autopct='%1.1f%%',
         labels=series.index,
         ax=ax
     )
     ax.set_ylabel('')
-    path = os.path.join(CHART_DIR, 'priority_distribution.png')
-    fig.savefig(path, bbox_inches='tight')
-    plt.close(fig)
-    return path
-
-def plot_alert_types(df: pd.DataFrame, column: str = 'cluster') -> str:
-    """
-    Creates a bar chart for the specified column (cluster or namespace),
-    returns the path to the PNG file.
-    """
-    series = df[column].value_counts()
-    fig, ax = plt.subplots()
-    series.plot.bar(ax=ax)
-    ax.set_xlabel(column.capitalize())
-    ax.set_ylabel('Count')
-    path = os.path.join(CHART_DIR, f'{column}_distribution.png')
-    fig.savefig(path, bbox_inches='tight')
-    plt.close(fig)
-    return path
-
-def plot_cluster_distribution(df: pd.DataFrame) -> str:
-    """Creates a bar chart for clusters."""
-    return plot_alert_types(df, column='cluster')
-
-def plot_namespace_distribution(df: pd.DataFrame) -> str:
-    """Creates a bar chart for namespaces."""
-    return plot_alert_types(df, column='namespace')
-
-def plot_ticket_table(df: pd.DataFrame, priority: str = None, status: str = None, filename: str = 'tickets.png') -> str:
-    """
-    Creates a table of tickets filtered by priority or status as an image.
-    If there are no matching tickets, creates an image with a message.
-    """
-    if priority:
-        filtered = df[df['priority'] == priority][['key', 'summary', 'status', 'assignee']]
-        label = priority
-    elif status:
-        filtered = df[df['status'].str.lower() == status.lower()][['key', 'summary', 'status', 'assignee']]
-        label = status.capitalize()
-    else:
-        filtered = df[['key', 'summary', 'status', 'assignee']]
-        label = 'Tickets'
+    return fig
 
-    fig, ax = plt.subplots(figsize=(8, 4))
+def draw_ticket_table(data: dict):
+    """Table of ticket rows ({'rows', 'columns', 'label'}), or a message if there are none."""
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
     ax.axis('off')
 
-    if filtered.empty:
-        ax.text(0.5, 0.5, f'No {label} tickets',
+    if not data['rows']:
+        ax.text(0.5, 0.5, f"No {data['label']} tickets",
                 horizontalalignment='center',
                 verticalalignment='center',
                 transform=ax.transAxes,
                 fontsize=14)
     else:
         table = ax.table(
-            cellText=filtered.values,
-            colLabels=filtered.columns,
+            cellText=data['rows'],
+            colLabels=data['columns'],
             cellLoc='center',
             loc='center'
         )
         # Adjust figure size based on content
-        fig.set_figheight(min(0.5 + 0.25 * len(filtered), 6))
+        fig.set_figheight(min(0.5 + 0.25 * len(data['rows']), 6))
 
-    path = os.path.join(CHART_DIR, filename)
     fig.tight_layout()
-    fig.savefig(path, bbox_inches='tight')
-    plt.close(fig)
-    return path
+    return fig
 
-def plot_priority_changes(priority_history: dict) -> str:
-    """
-    Creates a visualization of priority changes over time for tickets.
-    Returns the path to the saved image.
-    """
-    # Convert history to DataFrame
-    records = []
-    for ticket_key, changes in priority_history.items():
-        for change in changes:
-            records.append({
-                'ticket': ticket_key,
-                'priority': change['priority'],
-                'timestamp': change['timestamp']
-            })
-    
+def draw_priority_changes(records: list):
+    """Priority over time per ticket, from [{'ticket', 'priority', 'timestamp'}] records."""
     if not records:
         # Create empty plot with message
-        fig, ax = plt.subplots(figsize=(8, 4))
+        fig = Figure(figsize=(8, 4))
+        ax = fig.subplots()
         ax.axis('off')
-        ax.text(0.5, 0.5, 'No priority changes recorded', 
+        ax.text(0.5, 0.5, 'No priority changes recorded',
                 horizontalalignment='center',
                 verticalalignment='center',
                 transform=ax.transAxes,
@@ -113,30 +89,112 @@ def plot_priority_changes(priority_history: dict) -> str:
     else:
         df = pd.DataFrame(records)
         df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
+
         # Create figure
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
+
         # Plot each ticket's priority changes
         for ticket in df['ticket'].unique():
             ticket_data = df[df['ticket'] == ticket]
-            ax.plot(ticket_data['timestamp'], ticket_data['priority'], 
+            ax.plot(ticket_data['timestamp'], ticket_data['priority'],
                    marker='o', label=ticket, linestyle='-')
-        
+
         # Customize plot
         ax.set_title('Ticket Priority Changes Over Time')
         ax.set_xlabel('Time')
         ax.set_ylabel('Priority')
-        plt.xticks(rotation=45)
-        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.tight_layout()
-    
-    # Save the plot
-    path = os.path.join(CHART_DIR, 'priority_changes.png')
-    fig.savefig(path, bbox_inches='tight')
-    plt.close(fig)
-    return path
+        setp(ax.get_xticklabels(), rotation=45)
+        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+        fig.tight_layout()
+    return fig
+
+def draw_line(data: dict, title: str = None, xlabel: str = '', ylabel: str = 'Count'):
+    """Line chart of a {label: value} mapping (e.g. weekly ticket counts)."""
+    series = pd.Series(dict(data))
+    fig = Figure()
+    ax = fig.subplots()
+    series.plot(ax=ax, legend=False)
+    if title:
+        ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    return fig
+
+# --- Specs ---------------------------------------------------------------------- #
+
+def ticket_table_spec(df: pd.DataFrame, priority: str = None, status: str = None, filename: str = 'tickets.png') -> ChartSpec:
+    """Spec for a table of tickets filtered by priority or status."""
+    if priority:
+        filtered = df[df['priority'] == priority][['key', 'summary', 'status', 'assignee']]
+        label = priority
+    elif status:
+        filtered = df[df['status'].str.lower() == status.lower()][['key', 'summary', 'status', 'assignee']]
+        label = status.capitalize()
+    else:
+        filtered = df[['key', 'summary', 'status', 'assignee']]
+        label = 'Tickets'
+    data = {'rows': filtered.astype(object).values.tolist(), 'columns': list(filtered.columns), 'label': label}
+    return ChartSpec('ticket_table', filename, data)
+
+def priority_changes_spec(priority_history: dict) -> ChartSpec:
+    """Spec for the priority changes chart."""
+    # Convert history to records
+    records = []
+    for ticket_key, changes in priority_history.items():
+        for change in changes:
+            records.append({
+                'ticket': ticket_key,
+                'priority': change['priority'],
+                'timestamp': change['timestamp']
+            })
+    return ChartSpec('priority_changes', 'priority_changes.png', records)
+
+# --- Chart functions (render through the chart service into CHART_DIR) ---------- #
+
+def plot_priority_levels(df: pd.DataFrame) -> str:
+    """
+    Creates a pie chart for priorities and saves it to CHART_DIR,
+    returns the path to the PNG file.
+    """
+    counts = observed_counts(df['priority'])
+    spec = ChartSpec('pie', 'priority_distribution.png', dict(zip(counts.index.astype(str), counts.tolist())))
+    return get_chart_service().render_one(spec, CHART_DIR)
+
+def plot_alert_types(df: pd.DataFrame, column: str = 'cluster') -> str:
+    """
+    Creates a bar chart for the specified column (cluster or namespace),
+    returns the path to the PNG file.
+    """
+    counts = observed_counts(df[column])
+    spec = ChartSpec('bar', f'{column}_distribution.png',
+                     dict(zip(counts.index.astype(str), counts.tolist())),
+                     {'xlabel': column.capitalize()})
+    return get_chart_service().render_one(spec, CHART_DIR)
+
+def plot_cluster_distribution(df: pd.DataFrame) -> str:
+    """Creates a bar chart for clusters."""
+    return plot_alert_types(df, column='cluster')
+
+def plot_namespace_distribution(df: pd.DataFrame) -> str:
+    """Creates a bar chart for namespaces."""
+    return plot_alert_types(df, column='namespace')
+
+def plot_ticket_table(df: pd.DataFrame, priority: str = None, status: str = None, filename: str = 'tickets.png') -> str:
+    """
+    Creates a table of tickets filtered by priority or status as an image.
+    If there are no matching tickets, creates an image with a message.
+    """
+    return get_chart_service().render_one(ticket_table_spec(df, priority, status, filename), CHART_DIR)
+
+def plot_priority_changes(priority_history: dict) -> str:
+    """
+    Creates a visualization of priority changes over time for tickets.
+    Returns the path to the saved image.
+    """
+    return get_chart_service().render_one(priority_changes_spec(priority_history), CHART_DIR)
 
 # Backward compatibility for P1 alerts
 def plot_p1_alerts(df: pd.DataFrame) -> str:
-    return plot_ticket_table(df, priority='P1', filename='p1_alerts.png')
\ No newline at end of file
+    return plot_ticket_table(df, priority='P1', filename='p1_alerts.png')